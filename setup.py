@@ -54,7 +54,7 @@ extras['catboost'] = ['catboost>=0.21']
 extras['scikit-learn'] = ['scikit-learn>=0.23.0']
 extras['category_encoders'] = ['category_encoders>=2.2.2']
 extras['acv'] = ['acv-exp==1.1.2']
-extras['lime'] = ['lime']
+extras['lime'] = ['lime>=0.2.0.1,<0.3']
 
 setup_requirements = ['pytest-runner', ]
 
@@ -18,6 +18,8 @@ class AcvBackend(BaseBackend):
     # Coalitions should be grouped using one column value only and not the sum like shap
     column_aggregation = 'first'
     name = 'acv'
+    # The explainer is fitted on the whole dataset when no background data is given
+    support_batches = False
     supported_cases = ['classification']
 
     def __init__(
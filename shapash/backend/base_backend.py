@@ -1,3 +1,5 @@
+import numbers
+import os
 from abc import ABC, abstractmethod
 from typing import Any, List, Optional, Union
 import pandas as pd
@@ -25,6 +27,9 @@ class BaseBackend(ABC):
     # construct the backend from it.
     name = 'base'
     support_groups = True
+    # `support_batches` tells if the explainer can be run on successive batches of rows
+    # of the same dataset and still give the same local contributions.
+    support_batches = True
     supported_cases = ['classification', 'regression']
 
     def __init__(self, model: Any, preprocessing: Optional[Any] = None):
@@ -197,3 +202,17 @@ def _needs_preprocessing(result_cols, x, preprocessing):
         if col in cols_after_preprocessing and col not in mapping.keys():
             return True
     return False
+
+
+def _get_n_jobs(n_jobs, n_rows):
+    """
+    Number of processes used to compute contributions of n_rows observations.
+    None means 1 and -1 uses all the CPUs. Any other value must be a positive integer.
+    """
+    if n_jobs is None:
+        return 1
+    if not isinstance(n_jobs, numbers.Integral) or isinstance(n_jobs, bool) or (n_jobs <= 0 and n_jobs != -1):
+        raise ValueError(f"n_jobs must be None, -1 or a positive integer, got {n_jobs!r}.")
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    return min(n_jobs, max(n_rows, 1))
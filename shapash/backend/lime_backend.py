@@ -4,27 +4,36 @@ try:
 except ImportError:
     is_lime_available = False
 
+from concurrent.futures import ProcessPoolExecutor
 from typing import Any, Optional, List, Union
 
+import numpy as np
 import pandas as pd
+from sklearn.metrics import pairwise_distances
 
-from shapash.backend.base_backend import BaseBackend
+from shapash.backend.base_backend import BaseBackend, _get_n_jobs
 
 
 class LimeBackend(BaseBackend):
     column_aggregation = 'sum'
     name = 'lime'
     support_groups = False
+    # The explainer is fitted on the whole dataset when no background data is given
+    support_batches = False
 
-    def __init__(self, model, preprocessing=None, data=None):
+    def __init__(self, model, preprocessing=None, data=None, n_jobs=None):
         super(LimeBackend, self).__init__(model, preprocessing)
         self.explainer = None
         self.data = data
+        self.n_jobs = n_jobs
 
     def run_explainer(self, x: pd.DataFrame):
         """
         Computes local contributions using Lime explainer
 
+        Each row is explained once for all the labels. If n_jobs is greater than 1 (or -1),
+        the rows of x are split into n_jobs blocks explained in a pool of processes.
+
         Parameters
         ----------
         x : pd.DataFrame
@@ -36,56 +45,129 @@ class LimeBackend(BaseBackend):
             dict containing local contributions
         """
         data = self.data if self.data is not None else x
-        explainer = lime_tabular.LimeTabularExplainer(
-            data.values,
-            feature_names=x.columns,
+        explainer_args = dict(
+            training_data=np.asarray(data),
+            feature_names=list(x.columns),
             mode=self._case
         )
 
-        lime_contrib = []
-        for i in x.index:
-            if self._case == "classification":
-                num_classes = len(self._classes)
-
-                if num_classes <= 2:
-                    exp = explainer.explain_instance(x.loc[i], self.model.predict_proba, num_features=x.shape[1])
-                    lime_contrib.append(
-                        dict([[_transform_name(var_name[0], x), var_name[1]] for var_name in exp.as_list()]))
-
-                elif num_classes > 2:
-                    contribution = []
-                    for j in range(num_classes):
-                        list_contrib = []
-                        df_contrib = pd.DataFrame()
-                        for i in x.index:
-                            exp = explainer.explain_instance(
-                                x.loc[i], self.model.predict_proba, top_labels=num_classes,
-                                num_features=x.shape[1])
-                            list_contrib.append(
-                                dict([[_transform_name(var_name[0], x), var_name[1]] for var_name in
-                                      exp.as_list(j)]))
-                            df_contrib = pd.DataFrame(list_contrib)
-                            df_contrib = df_contrib[list(x.columns)]
-                        contribution.append(df_contrib.values)
-                    return contribution
-
-            else:
-                exp = explainer.explain_instance(x.loc[i], self.model.predict, num_features=x.shape[1])
-                lime_contrib.append(
-                    dict([[_transform_name(var_name[0], x), var_name[1]] for var_name in exp.as_list()]))
-
-        contributions = pd.DataFrame(lime_contrib, index=x.index)
-        contributions = contributions[list(x.columns)]
+        if self._case == "classification":
+            predict_fn = self.model.predict_proba
+            # Binary classification : contributions of the positive class only
+            labels = list(range(len(self._classes))) if len(self._classes) > 2 else [1]
+        else:
+            predict_fn = self.model.predict
+            # Lime stores regression explanations under the label 1
+            labels = [1]
+
+        n_jobs = _get_n_jobs(self.n_jobs, x.shape[0])
+        if n_jobs > 1:
+            list_x_values = np.array_split(x.values, n_jobs)
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                list_contributions = list(executor.map(
+                    _explain_rows,
+                    [explainer_args] * n_jobs,
+                    [predict_fn] * n_jobs,
+                    list_x_values,
+                    [labels] * n_jobs
+                ))
+            contributions = np.concatenate(list_contributions, axis=1)
+        else:
+            contributions = _explain_rows(explainer_args, predict_fn, x.values, labels)
+
+        if len(labels) > 1:
+            contributions = [pd.DataFrame(contrib, columns=x.columns, index=x.index) for contrib in contributions]
+        else:
+            contributions = pd.DataFrame(contributions[0], columns=x.columns, index=x.index)
 
         explain_data = dict(contributions=contributions)
 
         return explain_data
 
 
-def _transform_name(var_name, x_df):
-    """Function for transform name of LIME contribution shape to a comprehensive name
+def _explain_rows(explainer_args, predict_fn, x_values, labels, batch_size=20):
+    """
+    Explain each row of x_values once for all the labels.
+    Defined at module level so that it can be sent to a pool of processes. The Lime
+    explainer is built here as it cannot be pickled.
+
+    The perturbations of batch_size rows are generated first and predicted with a single
+    call to predict_fn, instead of one call per row.
+
+    Parameters
+    ----------
+    explainer_args : dict
+        Arguments used to build the Lime explainer.
+    predict_fn : function
+        predict_proba (classification) or predict (regression) method of the model.
+    x_values : np.ndarray
+        Observations to explain.
+    labels : list
+        Labels to explain.
+    batch_size : int (default: 20)
+        Number of rows whose perturbations are predicted together.
+
+    Returns
+    -------
+    np.ndarray
+        Contributions of shape (#labels, #observations, #features)
+    """
+    explainer = lime_tabular.LimeTabularExplainer(**explainer_args)
+    contributions = np.zeros((len(labels), x_values.shape[0], x_values.shape[1]))
+    for start in range(0, x_values.shape[0], batch_size):
+        rows = x_values[start:start + batch_size]
+        for i, local_exp in enumerate(_explain_batch(explainer, rows, predict_fn, labels), start=start):
+            for j, label in enumerate(labels):
+                features_ids, weights = zip(*local_exp[label])
+                contributions[j, i, list(features_ids)] = weights
+    return contributions
+
+
+def _explain_batch(explainer, rows, predict_fn, labels, num_samples=5000):
+    """
+    Explain rows with a single call to predict_fn, as LimeTabularExplainer.explain_instance
+    would do row by row.
+
+    The neighborhood of each row is generated with the sampling of Lime, which is the only
+    private method of Lime used here (the supported versions of Lime are pinned in setup.py).
+    The local models are then fitted with the public LimeBase.explain_instance_with_data.
+
+    Parameters
+    ----------
+    explainer : lime_tabular.LimeTabularExplainer
+        Lime explainer.
+    rows : np.ndarray
+        Observations to explain.
+    predict_fn : function
+        predict_proba (classification) or predict (regression) method of the model.
+    labels : list
+        Labels to explain.
+    num_samples : int (default: 5000)
+        Size of the neighborhood of each row.
+
+    Returns
+    -------
+    list
+        For each row, dict giving for each label a list of (feature position, contribution).
     """
-    for colname in list(x_df.columns):
-        if f' {colname} ' in f' {var_name} ':
-            col_rename = colname
-    return col_rename
+    neighborhoods = [explainer._LimeTabularExplainer__data_inverse(row, num_samples) for row in rows]
+    predictions = predict_fn(np.concatenate([inverse for _, inverse in neighborhoods]))
+    if explainer.mode == "regression":
+        # Lime fits the predictions of a regression under the label 0 and reports them under the label 1
+        predictions = np.asarray(predictions).reshape(-1, 1)
+        fitted_labels = {label: 0 for label in labels}
+    else:
+        fitted_labels = {label: label for label in labels}
+    list_local_exp = list()
+    for i, (data, _) in enumerate(neighborhoods):
+        yss = predictions[i * num_samples:(i + 1) * num_samples]
+        scaled_data = (data - explainer.scaler.mean_) / explainer.scaler.scale_
+        distances = pairwise_distances(scaled_data, scaled_data[0].reshape(1, -1), metric='euclidean').ravel()
+        local_exp = dict()
+        for label, fitted_label in fitted_labels.items():
+            _, local_exp[label], _, _ = explainer.base.explain_instance_with_data(
+                scaled_data, yss, distances, fitted_label, rows.shape[1],
+                feature_selection=explainer.feature_selection
+            )
+        list_local_exp.append(local_exp)
+    return list_local_exp
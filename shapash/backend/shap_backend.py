@@ -1,8 +1,13 @@
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
 import shap
 
-from shapash.backend.base_backend import BaseBackend
+from shapash.backend.base_backend import BaseBackend, _get_n_jobs
+
+# Number of rows explained at once, independent of n_jobs
+_BLOCK_SIZE = 100
 
 
 class ShapBackend(BaseBackend):
@@ -11,16 +16,30 @@ class ShapBackend(BaseBackend):
     column_aggregation = 'sum'
     name = 'shap'
 
-    def __init__(self, model, preprocessing=None, explainer_args=None, explainer_compute_args=None):
+    def __init__(
+            self,
+            model,
+            preprocessing=None,
+            explainer_args=None,
+            explainer_compute_args=None,
+            n_jobs=None
+    ):
         super(ShapBackend, self).__init__(model, preprocessing)
         self.explainer_args = explainer_args if explainer_args else {}
         self.explainer_compute_args = explainer_compute_args if explainer_compute_args else {}
         self.explainer = shap.Explainer(model=model, **self.explainer_args)
+        self.n_jobs = n_jobs
 
     def run_explainer(self, x: pd.DataFrame) -> dict:
         """
         Computes and returns local contributions using Shap explainer
 
+        The rows of x are explained by blocks of _BLOCK_SIZE rows. The global numpy random
+        state is seeded before each block with a seed drawn once from it and the position of
+        the block, so that sampling explainers (Kernel, Permutation) give the same results
+        whatever the value of n_jobs. If n_jobs is greater than 1 (or -1), the blocks are
+        explained in a pool of processes and reassembled in the order of x.
+
         Parameters
         ----------
         x : pd.DataFrame
@@ -31,11 +50,43 @@ class ShapBackend(BaseBackend):
         explain_data : pd.DataFrame or list of pd.DataFrame
             local contributions
         """
-        contributions = self.explainer(x, **self.explainer_compute_args)
-        explain_data = dict(contributions=contributions.values)
+        starts = range(0, max(x.shape[0], 1), _BLOCK_SIZE)
+        list_x = [x.iloc[start:start + _BLOCK_SIZE] for start in starts]
+        seeds = [int(seed) for seed in np.random.randint(2 ** 31 - len(starts)) + np.arange(len(starts))]
+        n_jobs = _get_n_jobs(self.n_jobs, len(list_x))
+        if n_jobs > 1:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                list_contributions = list(executor.map(
+                    _compute_shap_values,
+                    [self.explainer] * len(list_x),
+                    list_x,
+                    [self.explainer_compute_args] * len(list_x),
+                    seeds
+                ))
+        else:
+            # The random state of the user is left as if a single number had been drawn
+            random_state = np.random.get_state()
+            list_contributions = [
+                _compute_shap_values(self.explainer, x_block, self.explainer_compute_args, seed)
+                for x_block, seed in zip(list_x, seeds)
+            ]
+            np.random.set_state(random_state)
+        contributions = np.concatenate(list_contributions, axis=0)
+        explain_data = dict(contributions=contributions)
         return explain_data
 
 
+def _compute_shap_values(explainer, x, explainer_compute_args, seed=None):
+    """
+    Compute shap values of x with the given explainer, after seeding the global numpy
+    random state with seed if it is not None.
+    Defined at module level so that it can be sent to a pool of processes.
+    """
+    if seed is not None:
+        np.random.seed(seed)
+    return explainer(x, **explainer_compute_args).values
+
+
 def get_shap_interaction_values(x_df, explainer):
     """
     Compute the shap interaction values for a given dataframe.
@@ -2,6 +2,7 @@
 Contributions
 """
 
+import numbers
 import pandas as pd
 import numpy as np
 from shapash.utils.transform import preprocessing_tolist
@@ -53,17 +54,19 @@ def inverse_transform_contributions(contributions, preprocessing=None, agg_colum
         # check supported inverse
         use_ct, use_ce = check_transformers(list_encoding)
 
-        # Apply Inverse Transform
-        x_contrib_invers = contributions.copy()
+        # Apply Inverse Transform : each aggregation builds a new dataframe
+        x_contrib_invers = contributions
         if use_ct:
             for encoding in list_encoding:
                 x_contrib_invers = calc_inv_contrib_ct(x_contrib_invers, encoding, agg_columns)
         else:
             for encoding in list_encoding:
                 x_contrib_invers = calc_inv_contrib_ce(x_contrib_invers, encoding, agg_columns)
+        if x_contrib_invers is contributions:
+            x_contrib_invers = contributions.copy()
         return x_contrib_invers
 
-def rank_contributions(s_df, x_df):
+def rank_contributions(s_df, x_df, chunk_size=None, top_k=None):
     """
     Function to sort contributions and input features
     by decreasing contribution absolute values
@@ -74,6 +77,13 @@ def rank_contributions(s_df, x_df):
         Local contributions dataframe.
     x_df: pandas.DataFrame
         Input features.
+    chunk_size: int, optional (default: None)
+        Number of rows sorted at once. If None, all the rows are sorted at once.
+        Using chunks bounds the size of the temporary arrays built during the sort.
+    top_k: int, optional (default: None)
+        If not None, only the top_k largest contributions (in absolute value) of each row are
+        selected with np.argpartition, sorted and returned, and the other contributions are
+        summed in a fourth dataframe. If None, all the contributions are sorted.
 
     Returns
     -------
@@ -84,18 +94,72 @@ def rank_contributions(s_df, x_df):
     pandas.DataFrame
         Input features names sorted for each observation
         by decreasing contributions absolute values.
+    pandas.DataFrame
+        Only if top_k is not None : sums of the negative ('masked_neg') and positive ('masked_pos')
+        contributions which are not in the top_k of each observation.
     """
-    argsort = np.argsort(-np.abs(s_df.values), axis=1)
-    sorted_contrib = np.take_along_axis(s_df.values, argsort, axis=1)
-    sorted_features = np.take_along_axis(x_df.values, argsort, axis=1)
-
-    contrib_col = ['contribution_' + str(i) for i in range(s_df.shape[1])]
-    col = ['feature_' + str(i) for i in range(s_df.shape[1])]
+    if top_k is not None and (not isinstance(top_k, numbers.Integral) or top_k <= 0):
+        raise ValueError("top_k must be a positive integer.")
+    if chunk_size is not None and (not isinstance(chunk_size, numbers.Integral) or chunk_size <= 0):
+        raise ValueError("chunk_size must be a positive integer.")
+    n_rows, n_cols = s_df.shape
+    k = n_cols if top_k is None else min(top_k, n_cols)
+    if chunk_size is None or chunk_size >= n_rows:
+        argsort, sorted_contrib, sorted_features, rest = _rank_block(s_df.values, x_df.values, k)
+    else:
+        argsort = np.empty((n_rows, k), dtype=np.intp)
+        sorted_contrib = np.empty((n_rows, k), dtype=s_df.iloc[:0].values.dtype)
+        sorted_features = np.empty((n_rows, k), dtype=x_df.iloc[:0].values.dtype)
+        rest = np.empty((n_rows, 2), dtype=s_df.iloc[:0].values.dtype)
+        for start in range(0, n_rows, chunk_size):
+            stop = min(start + chunk_size, n_rows)
+            argsort[start:stop], sorted_contrib[start:stop], sorted_features[start:stop], rest[start:stop] = \
+                _rank_block(s_df.iloc[start:stop].values, x_df.iloc[start:stop].values, k)
+
+    contrib_col = ['contribution_' + str(i) for i in range(k)]
+    col = ['feature_' + str(i) for i in range(k)]
 
     s_dict = pd.DataFrame(data=argsort, columns=col, index=x_df.index)
     s_ord = pd.DataFrame(data=sorted_contrib, columns=contrib_col, index=x_df.index)
     x_ord = pd.DataFrame(data=sorted_features, columns=col, index=x_df.index)
-    return [s_ord, x_ord, s_dict]
+    if top_k is None:
+        return [s_ord, x_ord, s_dict]
+    s_rest = pd.DataFrame(data=rest, columns=['masked_neg', 'masked_pos'], index=x_df.index)
+    return [s_ord, x_ord, s_dict, s_rest]
+
+def _rank_block(s_values, x_values, k):
+    """
+    Sort the k largest contributions (in absolute value) of each row of a block.
+
+    Parameters
+    ----------
+    s_values: np.ndarray
+        Local contributions.
+    x_values: np.ndarray
+        Input features.
+    k: int
+        Number of contributions kept for each row.
+
+    Returns
+    -------
+    tuple
+        positions of the features, sorted contributions, sorted features and sums
+        of the negative and positive contributions that are not kept.
+    """
+    abs_values = -np.abs(s_values)
+    if k < s_values.shape[1]:
+        # Only the k winners are sorted
+        part = np.argpartition(abs_values, k - 1, axis=1)[:, :k]
+        argsort = np.take_along_axis(part, np.argsort(np.take_along_axis(abs_values, part, axis=1), axis=1), axis=1)
+        rest_values = s_values.copy()
+        np.put_along_axis(rest_values, argsort, 0, axis=1)
+        rest = np.column_stack([np.minimum(rest_values, 0).sum(axis=1), np.maximum(rest_values, 0).sum(axis=1)])
+    else:
+        argsort = np.argsort(abs_values, axis=1)
+        rest = np.zeros((s_values.shape[0], 2), dtype=s_values.dtype)
+    sorted_contrib = np.take_along_axis(s_values, argsort, axis=1)
+    sorted_features = np.take_along_axis(x_values, argsort, axis=1)
+    return argsort, sorted_contrib, sorted_features, rest
 
 def assign_contributions(ranked):
     """
@@ -114,15 +178,50 @@ def assign_contributions(ranked):
     Raises
     ------
     ValueError
-        The output of rank_contributions should always be of length three.
+        The output of rank_contributions should always be of length three or four.
     """
-    if len(ranked) != 3:
+    if len(ranked) not in (3, 4):
         raise ValueError(
-            'Expected lenght : 3, observed lenght : {},'
+            'Expected lenght : 3 or 4, observed lenght : {},'
             'please check the outputs of rank_contributions.'.format(len(ranked))
         )
-    return {
+    data = {
         'contrib_sorted': ranked[0],
         'x_sorted': ranked[1],
         'var_dict': ranked[2]
     }
+    if len(ranked) == 4:
+        data['contrib_rest'] = ranked[3]
+    return data
+
+def sparsify_contributions(contributions, threshold=0.0):
+    """
+    Store contributions as a sparse dataframe : the contributions whose absolute value
+    is lower than or equal to threshold are set to 0 and are not stored.
+    The result is still a pandas.DataFrame (each column has a pandas SparseDtype) and
+    can be used wherever dense contributions are.
+
+    Parameters
+    ----------
+    contributions : pandas.DataFrame
+        Local contributions.
+    threshold : float (default: 0.0)
+        Contributions with an absolute value lower than or equal to threshold are dropped.
+        With the default value, only the exact zeros are dropped and no information is lost.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Sparse local contributions.
+    """
+    if not isinstance(threshold, (int, float)) or threshold < 0:
+        raise ValueError('threshold must be a positive number.')
+    columns = dict()
+    for i in range(contributions.shape[1]):
+        values = contributions.iloc[:, i].to_numpy(dtype=float)
+        if threshold > 0:
+            values = np.where(np.abs(values) <= threshold, 0.0, values)
+        columns[i] = pd.arrays.SparseArray(values, fill_value=0.0)
+    sparse_contributions = pd.DataFrame(columns, index=contributions.index)
+    sparse_contributions.columns = contributions.columns
+    return sparse_contributions
@@ -132,12 +132,12 @@ class MultiDecorator:
         Returns
         -------
         dict
-            Dictionary containing three keys, and whose values are the successive results.
+            Dictionary containing three (or four) keys, and whose values are the successive results.
 
         Raises
         ------
         ValueError
-            The output of a single call to rank_contributions should always be of length three.
+            The output of a single call to rank_contributions should always be of length three or four.
         """
         dicts = self.delegate('assign_contributions', ranked)
         keys = list(dicts[0].keys())
@@ -180,6 +180,28 @@ class MultiDecorator:
         transposed_masks = list(map(list, zip(*masks)))
         return self.delegate('combine_masks', transposed_masks)
 
+    def filter_mask(self, var_dicts, s_contribs, **kwargs):
+        """
+        Override filter_mask. Compute the mask of a filter for each pair of
+        features indexes and contributions matrices.
+
+        Parameters
+        ----------
+        var_dicts : list
+            List of features indexes ordered by contribution (pandas.DataFrames).
+        s_contribs : list
+            List of sorted local contributions matrices (pandas.DataFrames, same order).
+        kwargs : dict
+            Parameters of the filter, shared by all the matrices.
+
+        Returns
+        -------
+        list
+            List of masks (pandas.DataFrames).
+        """
+        arg_tup = list(zip(var_dicts, s_contribs))
+        return self.delegate('filter_mask', arg_tup, **kwargs)
+
     def compute_masked_contributions(self, s_contrib, masks):
         """
         Override compute_masked_contributions. Apply a list of masks to a list of
@@ -3,6 +3,7 @@ Smart explainer module
 """
 import logging
 import copy
+import numbers
 import tempfile
 import shutil
 import numpy as np
@@ -22,7 +23,8 @@ from shapash.manipulation.summarize import create_grouped_features_values
 from .smart_plotter import SmartPlotter
 import shapash.explainer.smart_predictor
 from shapash.utils.model import predict_proba, predict
-from shapash.utils.explanation_metrics import find_neighbors, shap_neighbors, get_min_nb_features, get_distance
+from shapash.utils.explanation_metrics import find_neighbors, shap_neighbors, get_min_nb_features, get_distance, \
+    build_neighbors_tree, batch_shap_neighbors, _get_radius
 from shapash.style.style_utils import colors_loading, select_palette
 
 logging.basicConfig(level=logging.INFO)
@@ -227,11 +229,14 @@ class SmartExplainer:
         self.local_neighbors = None
         self.features_stability = None
         self.features_compacity = None
+        self._neighbors_tree = None
+        self._neighbors_radius = None
         self.contributions = None
         self.explain_data = None
         self.features_imp = None
 
-    def compile(self, x, contributions=None, y_pred=None):
+    def compile(self, x, contributions=None, y_pred=None, batch_size=None, vectorized_inverse=False,
+                sparse_threshold=None, top_k=None):
         """
         The compile method is the first step to understand model and prediction. It performs the sorting
         of contributions, the reverse preprocessing steps and performs all the calculations necessary for
@@ -254,17 +259,42 @@ class SmartExplainer:
             The index must be identical to the index of x_init.
             This is an interesting parameter for more explicit outputs. Shapash lets users define their own predict,
             as they may wish to set their own threshold (classification)
+        batch_size : int, optional (default: None)
+            Backend batch size : number of rows given at once to the backend when computing the
+            contributions, and number of rows sorted at once when ranking them. This bounds the
+            temporary memory used by the explainer and by the sort. The prediction set, the
+            contributions and the ranked contributions are still stored in full.
+            If None, all the rows are processed at once.
+        vectorized_inverse : bool, optional (default: False)
+            If True, the preprocessing is reversed with the vectorized engine of inverse_transform,
+            which avoids a full copy of x and is faster with many encoded columns.
+        sparse_threshold : float, optional (default: None)
+            If not None, the contributions and the sorted contributions are stored as sparse dataframes
+            (pandas SparseDtype) : the contributions whose absolute value is lower than or equal to
+            sparse_threshold are set to 0 and not stored. Use 0 to only drop the exact zeros.
+            This reduces the memory used by models with many encoded features and few non-zero
+            contributions per row. The sorted features values (x_sorted) and names (var_dict) are
+            still stored as dense dataframes of the same shape : the saving is at most the size of
+            the contributions and of the sorted contributions. Use top_k to also reduce them.
+        top_k : int, optional (default: None)
+            If not None, only the top_k largest contributions (in absolute value) of each observation
+            are sorted and stored in data, and the other contributions are summed. This speeds up the
+            ranking and reduces the memory used with many features. The filters (max_contrib, threshold,
+            positive, features_to_hide) are then applied to the top_k contributions only : the summaries
+            and local plots show at most top_k contributions.
 
         Example
         --------
         >>> xpl.compile(x=x_test)
 
         """
+        if batch_size is not None and (not isinstance(batch_size, numbers.Integral) or batch_size <= 0):
+            raise ValueError("batch_size must be a positive integer.")
         self.x_encoded = x
-        self.x_init = inverse_transform(self.x_encoded, self.preprocessing)
+        self.x_init = inverse_transform(self.x_encoded, self.preprocessing, vectorized=vectorized_inverse)
         self.y_pred = check_ypred(self.x_init, y_pred)
 
-        self._get_contributions_from_backend_or_user(x, contributions)
+        self._get_contributions_from_backend_or_user(x, contributions, batch_size)
         self.check_contributions()
 
         self.columns_dict = {i: col for i, col in enumerate(self.x_init.columns)}
@@ -275,16 +305,25 @@ class SmartExplainer:
         self.data = self.state.assign_contributions(
             self.state.rank_contributions(
                 self.contributions,
-                self.x_init
+                self.x_init,
+                chunk_size=batch_size,
+                top_k=top_k
             )
         )
+        if sparse_threshold is not None:
+            self.contributions = self.state.sparsify_contributions(self.contributions, sparse_threshold)
+            self.data['contrib_sorted'] = self.state.sparsify_contributions(
+                self.data['contrib_sorted'], sparse_threshold)
         self.features_desc = dict(self.x_init.nunique())
         if self.features_groups is not None:
             self._compile_features_groups(self.features_groups)
 
-    def _get_contributions_from_backend_or_user(self, x, contributions):
+    def _get_contributions_from_backend_or_user(self, x, contributions, batch_size=None):
         # Computing contributions using backend
-        if contributions is None:
+        if contributions is None and batch_size is not None and batch_size < x.shape[0]:
+            self.explain_data = None
+            self.contributions = self._get_contributions_by_batches(x, batch_size)
+        elif contributions is None:
             self.explain_data = self.backend.run_explainer(x=x)
             self.contributions = self.backend.get_local_contributions(x=x, explain_data=self.explain_data)
         else:
@@ -295,13 +334,46 @@ class SmartExplainer:
             )
         self.state = self.backend.state
 
+    def _get_contributions_by_batches(self, x, batch_size):
+        """
+        Computes local contributions with the backend on successive batches of rows of x.
+        Only the aggregated contributions of each batch are kept, the raw explainer
+        outputs are released after each batch.
+
+        Parameters
+        ----------
+        x : pandas.DataFrame
+            Prediction set.
+        batch_size : int
+            Number of rows given to the backend at once.
+
+        Returns
+        -------
+        pandas.DataFrame (regression) or list of pandas.DataFrame (classification)
+            Local contributions of the whole prediction set.
+        """
+        if self.backend.support_batches is False:
+            raise AssertionError(
+                f'Selected backend ({self.backend.name}) '
+                f'does not support computing contributions by batches.'
+            )
+        list_contributions = []
+        for start in range(0, x.shape[0], batch_size):
+            x_batch = x.iloc[start:start + batch_size]
+            explain_data = self.backend.run_explainer(x=x_batch)
+            list_contributions.append(self.backend.get_local_contributions(x=x_batch, explain_data=explain_data))
+        if isinstance(list_contributions[0], list):
+            return [pd.concat(list(contrib_class), axis=0) for contrib_class in zip(*list_contributions)]
+        return pd.concat(list_contributions, axis=0)
+
     def _apply_all_postprocessing_modifications(self):
         postprocessing = self.modify_postprocessing(self.postprocessing)
         check_postprocessing(self.x_init, postprocessing)
         self.postprocessing_modifications = self.check_postprocessing_modif_strings(postprocessing)
         self.postprocessing = postprocessing
         if self.postprocessing_modifications:
-            self.x_contrib_plot = copy.deepcopy(self.x_init)
+            # apply_postprocessing returns a new dataframe : x_init before postprocessing can be kept as is
+            self.x_contrib_plot = self.x_init
         self.x_init = self.apply_postprocessing(postprocessing)
 
     def _compile_features_groups(self, features_groups):
@@ -662,35 +734,27 @@ class SmartExplainer:
             data = self.data_groups
         else:
             data = self.data
-        mask = [self.state.init_mask(data['contrib_sorted'], True)]
-        if features_to_hide:
-            mask.append(
-                self.state.hide_contributions(
-                    data['var_dict'],
-                    features_list=self.check_features_name(features_to_hide, use_groups=display_groups)
-                )
-            )
-        if threshold:
-            mask.append(
-                self.state.cap_contributions(
-                    data['contrib_sorted'],
-                    threshold=threshold
-                )
-            )
-        if positive is not None:
-            mask.append(
-                self.state.sign_contributions(
-                    data['contrib_sorted'],
-                    positive=positive
-                )
-            )
-        self.mask = self.state.combine_masks(mask)
-        if max_contrib:
-            self.mask = self.state.cutoff_contributions(self.mask, max_contrib=max_contrib)
+        self.mask = self.state.filter_mask(
+            data['var_dict'],
+            data['contrib_sorted'],
+            features_list=self.check_features_name(features_to_hide, use_groups=display_groups)
+            if features_to_hide else None,
+            threshold=threshold if threshold else None,
+            positive=positive,
+            max_contrib=max_contrib if max_contrib else None
+        )
         self.masked_contributions = self.state.compute_masked_contributions(
             data['contrib_sorted'],
             self.mask
         )
+        if 'contrib_rest' in data:
+            # Contributions which are not in the top_k are hidden
+            if isinstance(self.masked_contributions, list):
+                self.masked_contributions = [
+                    masked + rest for masked, rest in zip(self.masked_contributions, data['contrib_rest'])
+                ]
+            else:
+                self.masked_contributions = self.masked_contributions + data['contrib_rest']
         self.mask_params = {
             'features_to_hide': features_to_hide,
             'threshold': threshold,
@@ -897,7 +961,7 @@ class SmartExplainer:
         if self.features_groups is not None and self.features_imp_groups is None:
             self.features_imp_groups = self.state.compute_features_import(self.contributions_groups)
 
-    def compute_features_stability(self, selection):
+    def compute_features_stability(self, selection, use_tree=False):
         """
         For a selection of instances, compute features stability metrics used in
         methods `local_neighbors_plot` and `local_stability_plot`.
@@ -910,6 +974,9 @@ class SmartExplainer:
         ----------
         selection: list
             Indices of rows to be displayed on the stability plot
+        use_tree: bool (default: False)
+            Whether or not to search neighbors with a tree index of x_encoded instead of a brute force search.
+            The tree is built once and reused as long as x_encoded is unchanged.
 
         Returns
         -------
@@ -919,23 +986,43 @@ class SmartExplainer:
         if (self._case == "classification") and (len(self._classes) > 2):
             raise AssertionError("Multi-class classification is not supported")
 
-        all_neighbors = find_neighbors(selection, self.x_encoded, self.model, self._case)
+        tree = self._get_neighbors_tree() if use_tree else None
+        all_neighbors, all_positions = find_neighbors(selection, self.x_encoded, self.model, self._case,
+                                                      tree=tree, radius=self._get_neighbors_radius(),
+                                                      return_positions=True)
 
         # Check if entry is a single instance or not
         if len(selection) == 1:
             # Compute explanations for instance and neighbors
-            norm_shap, _, _ = shap_neighbors(all_neighbors[0], self.x_encoded, self.contributions, self._case)
+            norm_shap, _, _ = shap_neighbors(all_neighbors[0], self.x_encoded, self.contributions, self._case,
+                                             positions=all_positions[0])
             self.local_neighbors = {"norm_shap": norm_shap}
         else:
-            numb_expl = len(selection)
-            amplitude = np.zeros((numb_expl, self.x_init.shape[1]))
-            variability = np.zeros((numb_expl, self.x_init.shape[1]))
-            # For each instance (+ neighbors), compute explanation
-            for i in range(numb_expl):
-                (_, variability[i, :], amplitude[i, :],) = shap_neighbors(all_neighbors[i], self.x_encoded, self.contributions, self._case)
+            # Compute explanations of all instances (+ neighbors) at once
+            variability, amplitude = batch_shap_neighbors(all_positions, self.contributions, self._case)
             self.features_stability = {"variability": variability, "amplitude": amplitude}
 
-    def compute_features_compacity(self, selection, distance, nb_features):
+    def _get_neighbors_tree(self):
+        """
+        Returns the tree index used to search neighbors in x_encoded, built at the first call
+        and rebuilt only if x_encoded has changed.
+        """
+        if self._neighbors_tree is None or self._neighbors_tree[0] is not self.x_encoded:
+            self._neighbors_tree = (self.x_encoded, build_neighbors_tree(self.x_encoded.values))
+        return self._neighbors_tree[1]
+
+    def _get_neighbors_radius(self, n_neighbors=10):
+        """
+        Returns the distance threshold used to filter neighbors in x_encoded, computed
+        with a fixed seed at the first call and computed again only if x_encoded has changed.
+        """
+        if self._neighbors_radius is None or self._neighbors_radius[0] is not self.x_encoded \
+                or self._neighbors_radius[1] != n_neighbors:
+            radius = _get_radius(self.x_encoded.values, n_neighbors, random_state=0)
+            self._neighbors_radius = (self.x_encoded, n_neighbors, radius)
+        return self._neighbors_radius[2]
+
+    def compute_features_compacity(self, selection, distance, nb_features, chunk_size=None):
         """
         For a selection of instances, compute features compacity metrics used in method `compacity_plot`.
 
@@ -951,18 +1038,20 @@ class SmartExplainer:
             How close we want to be from model with all features
         nb_features : int
             Number of features used
+        chunk_size : int, optional
+            Number of instances processed at once to bound the memory used, by default None (all instances)
         """
         if (self._case == "classification") and (len(self._classes) > 2):
             raise AssertionError("Multi-class classification is not supported")
 
-        features_needed = get_min_nb_features(selection, self.contributions, self._case, distance)
-        distance_reached = get_distance(selection, self.contributions, self._case, nb_features)
+        features_needed = get_min_nb_features(selection, self.contributions, self._case, distance, chunk_size)
+        distance_reached = get_distance(selection, self.contributions, self._case, nb_features, chunk_size)
         # We clip large approximations to 100%
         distance_reached = np.clip(distance_reached, 0, 1)
 
         self.features_compacity = {"features_needed": features_needed, "distance_reached": distance_reached}
 
-    def init_app(self, settings: dict = None):
+    def init_app(self, settings: dict = None, session_store=None):
         """
         Simple init of SmartApp in case of host smartapp by another way
         
@@ -972,8 +1061,11 @@ class SmartExplainer:
             A dict describing the default webapp settings values to be used
             Possible settings (dict keys) are 'rows', 'points', 'violin', 'features'
             Values should be positive ints
+        session_store : BaseSessionStore or str (default: None)
+            Store of the state of the browser sessions. A str is the path of a SQLite file
+            shared by several worker processes. If None, the state is kept in memory.
         """
-        self.smartapp = SmartApp(self, settings)
+        self.smartapp = SmartApp(self, settings, session_store=session_store)
 
     def run_app(self, port: int = None, host: str = None, title_story: str = None, settings: dict = None) -> CustomThread:
         """
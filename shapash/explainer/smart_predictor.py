@@ -5,23 +5,23 @@ from shapash.utils.check import check_consistency_model_features, check_consiste
 from shapash.utils.check import check_model, check_preprocessing, check_preprocessing_options
 from shapash.utils.check import check_label_dict, check_mask_params, check_ypred, check_contribution_object,\
                                 check_features_name
+import numpy as np
 import pandas as pd
 from shapash.utils.transform import adapt_contributions
 from shapash.manipulation.select_lines import keep_right_contributions
 from shapash.utils.model import predict_proba
 from shapash.utils.io import save_pickle
-from shapash.utils.transform import apply_preprocessing, apply_postprocessing, preprocessing_tolist
-from shapash.manipulation.filters import hide_contributions
-from shapash.manipulation.filters import cap_contributions
-from shapash.manipulation.filters import sign_contributions
-from shapash.manipulation.filters import cutoff_contributions
-from shapash.manipulation.filters import combine_masks
-from shapash.manipulation.mask import init_mask
+from shapash.utils.transform import apply_postprocessing, preprocessing_tolist
+from shapash.utils.transform import compile_preprocessing, apply_compiled_preprocessing
+from shapash.manipulation.filters import filter_mask
 from shapash.manipulation.mask import compute_masked_contributions
 from shapash.manipulation.summarize import summarize, create_grouped_features_values, group_contributions
 from shapash.decomposition.contributions import rank_contributions, assign_contributions
 from shapash.utils.columntransformer_backend import columntransformer
+from shapash.utils.batcher import Batcher, _to_builtin
+import asyncio
 import copy
+import functools
 import shapash.explainer.smart_explainer
 
 class SmartPredictor :
@@ -120,12 +120,13 @@ class SmartPredictor :
         self.backend = backend
         self.preprocessing = preprocessing
         self.check_preprocessing()
+        self._preprocessing_plan = (self.preprocessing, compile_preprocessing(self.preprocessing))
         self.features_dict = features_dict
         self.features_types = features_types
         self.label_dict = label_dict
         self.check_label_dict()
         self.columns_dict = columns_dict
-        self.mask_params = mask_params
+        self.mask_params = copy.copy(mask_params)
         self.check_mask_params()
         self.postprocessing = postprocessing
         self.features_groups = features_groups
@@ -155,6 +156,27 @@ class SmartPredictor :
         """
         return check_preprocessing(self.preprocessing)
 
+    def _apply_preprocessing(self, x):
+        """
+        Apply the preprocessing on x with the plan compiled from the preprocessing attribute.
+        The plan is compiled again if the preprocessing attribute is modified.
+
+        Parameters
+        ----------
+        x: pandas.DataFrame
+            Raw dataset used by the model to perform the prediction (not preprocessed).
+
+        Returns
+        -------
+        pandas.DataFrame
+            The dataset preprocessed.
+        """
+        plan = getattr(self, "_preprocessing_plan", None)
+        if plan is None or plan[0] is not self.preprocessing:
+            plan = (self.preprocessing, compile_preprocessing(self.preprocessing))
+            self._preprocessing_plan = plan
+        return apply_compiled_preprocessing(x, self.model, plan[1])
+
     def check_label_dict(self):
         """
         Check if label_dict and model _classes match
@@ -197,17 +219,7 @@ class SmartPredictor :
             local contributions aggregated if the preprocessing part requires it (e.g. one-hot encoding).
         """
         if x is not None:
-            x = self.check_dataset_features(self.check_dataset_type(x))
-            self.data = self.clean_data(x)
-            self.data["x_postprocessed"] = self.apply_postprocessing()
-            try :
-                self.data["x_preprocessed"] = self.apply_preprocessing()
-            except BaseException :
-                raise ValueError(
-                    """
-                    Preprocessing has failed. The preprocessing specified or the dataset doesn't match.
-                    """
-                )
+            self.data = self._init_data(x)
         else:
             if not hasattr(self,"data"):
                 raise ValueError ("No dataset x specified.")
@@ -215,34 +227,109 @@ class SmartPredictor :
         if ypred is not None:
             self.data["ypred_init"] = self.check_ypred(ypred)
 
-        if contributions is not None:
-            self.data["ypred"], self.data["contributions"] = self.compute_contributions(
-                contributions=contributions,
-                use_groups=False
-            )
-        else:
-            self.data["ypred"], self.data["contributions"] = self.compute_contributions(use_groups=False)
+        self.data["ypred"], self.data["contributions"] = self.compute_contributions(
+            contributions=contributions,
+            use_groups=False
+        )
 
         if self.features_groups is not None:
             self._add_groups_input()
 
+    def _init_data(self, x, ypred=None):
+        """
+        Check the dataset x and apply the postprocessing and the preprocessing.
+        The data is returned and not stored : this method can be used by several threads at once.
+
+        Parameters
+        ----------
+        x: dict, pandas.DataFrame
+            Raw dataset used by the model to perform the prediction (not preprocessed).
+        ypred: pandas.DataFrame (optional)
+            User-specified prediction values.
+
+        Returns
+        -------
+        dict
+            data with the same keys as the data attribute
+        """
+        x = self.check_dataset_features(self.check_dataset_type(x))
+        data = self.clean_data(x)
+        data["x_postprocessed"] = apply_postprocessing(x, self.postprocessing) if self.postprocessing else x
+        try :
+            data["x_preprocessed"] = self._apply_preprocessing(x)
+        except BaseException :
+            raise ValueError(
+                """
+                Preprocessing has failed. The preprocessing specified or the dataset doesn't match.
+                """
+            )
+        if ypred is not None:
+            data["ypred_init"] = check_ypred(x, ypred)
+        return data
+
+    def _build_data(self, x, ypred=None, contributions=None):
+        """
+        Compute the same data as add_input, without storing it.
+
+        Parameters
+        ----------
+        x: dict, pandas.DataFrame
+            Raw dataset used by the model to perform the prediction (not preprocessed).
+        ypred: pandas.DataFrame (optional)
+            User-specified prediction values.
+        contributions: pandas.DataFrame (regression) or list (classification) (optional)
+            local contributions aggregated if the preprocessing part requires it (e.g. one-hot encoding).
+
+        Returns
+        -------
+        dict
+            data with the same keys as the data attribute
+        dict or None
+            data of the groups of features if features_groups is declared, None otherwise
+        """
+        data = self._init_data(x, ypred)
+        data["ypred"], data["contributions"] = self._compute_contributions(
+            data,
+            contributions=contributions,
+            use_groups=False
+        )
+        data_groups = self._get_groups_data(data) if self.features_groups is not None else None
+        return data, data_groups
+
     def _add_groups_input(self):
         """
         Compute groups of features values, contributions the same way as add_input method
         and stores it in data_groups attribute
         """
-        self.data_groups = dict()
-        self.data_groups['x_postprocessed'] = create_grouped_features_values(x_init=self.data["x_postprocessed"],
-                                                                             x_encoded=self.data["x_preprocessed"],
-                                                                             preprocessing=self.preprocessing,
-                                                                             features_groups=self.features_groups,
-                                                                             features_dict=self.features_dict,
-                                                                             how='dict_of_values')
-        self.data_groups['ypred'] = self.data["ypred"]
-        self.data_groups['contributions'] = group_contributions(
-            contributions=self.data['contributions'],
+        self.data_groups = self._get_groups_data(self.data)
+
+    def _get_groups_data(self, data):
+        """
+        Compute groups of features values and contributions of data.
+
+        Parameters
+        ----------
+        data: dict
+            data with the same keys as the data attribute
+
+        Returns
+        -------
+        dict
+            data of the groups of features
+        """
+        data_groups = dict()
+        data_groups['x_postprocessed'] = create_grouped_features_values(x_init=data["x_postprocessed"],
+                                                                        x_encoded=data["x_preprocessed"],
+                                                                        preprocessing=self.preprocessing,
+                                                                        features_groups=self.features_groups,
+                                                                        features_dict=self.features_dict,
+                                                                        how='dict_of_values')
+        data_groups['ypred'] = data["ypred"]
+        data_groups['contributions'] = group_contributions(
+            contributions=data['contributions'],
             features_groups=self.features_groups
         )
+        return data_groups
 
 
     def check_dataset_type(self, x=None):
@@ -354,14 +441,21 @@ class SmartPredictor :
         """
         return adapt_contributions(self._case, contributions)
 
-    def check_contributions(self, contributions):
+    def check_contributions(self, contributions, x=None):
         """
         Check if contributions and prediction set match in terms of shape and index.
+
+        Parameters
+        ----------
+        contributions : pandas.DataFrame or list
+            Local contributions, or list of local contributions.
+        x: pandas.DataFrame (optional)
+            Raw dataset (not preprocessed). By default, the dataset x specified in add_input.
         """
-        if self._drop_option is not None:
-            x = self.data["x"][self.data["x"].columns.difference(self._drop_option["features_to_drop"])]
-        else:
+        if x is None:
             x = self.data["x"]
+        if self._drop_option is not None:
+            x = x[x.columns.difference(self._drop_option["features_to_drop"])]
 
         if not self.backend.state.check_contributions(contributions, x, features_names=False):
             raise ValueError(
@@ -393,10 +487,19 @@ class SmartPredictor :
                 "x_postprocessed": None
                 }
 
-    def predict_proba(self):
+    def predict_proba(self, x=None):
         """
         The predict_proba compute the probabilities predicted for each x row defined in add_input.
 
+        If x is specified, the probabilities of x are computed without modifying the SmartPredictor :
+        this can be used by several threads at once.
+
+        Parameters
+        ----------
+        x: dict, pandas.DataFrame (optional)
+            Raw dataset used by the model to perform the prediction (not preprocessed).
+            By default, the dataset x specified in add_input.
+
         Returns
         -------
         pandas.DataFrame
@@ -407,7 +510,13 @@ class SmartPredictor :
         >>> predictor.add_input(x=xtest_df)
         >>> predictor.predict_proba()
 
+        or
+
+        >>> predictor.predict_proba(x=xtest_df)
+
         """
+        if x is not None:
+            return predict_proba(self.model, self._init_data(x)["x_preprocessed"], self._classes)
         return predict_proba(self.model, self.data["x_preprocessed"], self._classes)
 
     def compute_contributions(self, contributions=None, use_groups=None):
@@ -430,33 +539,57 @@ class SmartPredictor :
             ypred data with right probabilities associated.
 
         """
-        use_groups = True if (use_groups is not False and self.features_groups is not None) else False
-
         if not hasattr(self, "data"):
             raise ValueError("add_input method must be called at least once.")
-        if self.data["x"] is None:
+        return self._compute_contributions(self.data, contributions=contributions, use_groups=use_groups)
+
+    def _compute_contributions(self, data, contributions=None, use_groups=None):
+        """
+        Compute the contributions associated to the ypred of data. If data has no ypred,
+        the predictions are computed and stored in data.
+
+        Parameters
+        -------
+        data: dict
+            data with the same keys as the data attribute
+        contributions : object (optional)
+            Local contributions, or list of local contributions.
+        use_groups : bool (optional)
+            Whether or not to compute groups of features contributions.
+
+        Returns
+        -------
+        pandas.DataFrame
+            Data with contributions associated to the ypred specified.
+        pandas.DataFrame
+            ypred data with right probabilities associated.
+        """
+        use_groups = True if (use_groups is not False and self.features_groups is not None) else False
+
+        if data["x"] is None:
             raise ValueError(
                 """
                 x must be specified in an add_input method to apply detail_contributions.
                 """
             )
-        if self.data["ypred_init"] is None:
-            self.predict()
+        if data["ypred_init"] is None:
+            data["ypred_init"] = self._predict(data["x_preprocessed"])
 
         if contributions is None:
-            explain_data = self.backend.run_explainer(x=self.data["x_preprocessed"])
+            explain_data = self.backend.run_explainer(x=data["x_preprocessed"])
             contributions = self.backend.get_local_contributions(
                 explain_data=explain_data,
-                x=self.data["x_preprocessed"]
+                x=data["x_preprocessed"]
             )
         else:
             contributions = self.backend.format_and_aggregate_local_contributions(
-                x=self.data["x_preprocessed"],
+                x=data["x_preprocessed"],
                 contributions=contributions
             )
-        self.check_contributions(contributions)
-        proba_values = self.predict_proba() if self._case == "classification" else None
-        y_pred, match_contrib = keep_right_contributions(self.data["ypred_init"], contributions,
+        self.check_contributions(contributions, data["x"])
+        proba_values = (predict_proba(self.model, data["x_preprocessed"], self._classes)
+                        if self._case == "classification" else None)
+        y_pred, match_contrib = keep_right_contributions(data["ypred_init"], contributions,
                                  self._case, self._classes,
                                  self.label_dict, proba_values)
         if use_groups:
@@ -464,17 +597,25 @@ class SmartPredictor :
 
         return y_pred, match_contrib
 
-    def detail_contributions(self, contributions=None, use_groups=None):
+    def detail_contributions(self, contributions=None, use_groups=None, x=None, ypred=None):
         """
         The detail_contributions method associates the right contributions with the right data predicted.
         (with ypred specified in add_input or computed automatically)
 
+        If x is specified, the contributions of x are computed without modifying the SmartPredictor :
+        this can be used by several threads at once.
+
         Parameters
         -------
         contributions : object (optional)
             Local contributions, or list of local contributions.
         use_groups : bool (optional)
             Whether or not to compute groups of features contributions.
+        x: dict, pandas.DataFrame (optional)
+            Raw dataset used by the model to perform the prediction (not preprocessed).
+            By default, the dataset x specified in add_input.
+        ypred: pandas.DataFrame (optional)
+            User-specified prediction values of x.
 
         Returns
         -------
@@ -487,8 +628,19 @@ class SmartPredictor :
         >>> predictor.add_input(x=xtest_df)
         >>> predictor.detail_contributions()
 
+        or
+
+        >>> predictor.detail_contributions(x=xtest_df)
+
         """
-        y_pred, detail_contrib = self.compute_contributions(contributions=contributions, use_groups=use_groups)
+        if x is not None:
+            y_pred, detail_contrib = self._compute_contributions(
+                self._init_data(x, ypred),
+                contributions=contributions,
+                use_groups=use_groups
+            )
+        else:
+            y_pred, detail_contrib = self.compute_contributions(contributions=contributions, use_groups=use_groups)
         return pd.concat([y_pred, detail_contrib], axis=1)
 
     def save(self, path):
@@ -516,48 +668,54 @@ class SmartPredictor :
         """
         Apply preprocessing on new dataset input specified.
         """
-        return apply_preprocessing(self.data["x"], self.model, self.preprocessing)
+        return self._apply_preprocessing(self.data["x"])
 
     def filter(self):
         """
         The filter method is an important method which allows to summarize the local explainability
         by using the user defined mask_params parameters which correspond to its use case.
         """
-        mask = [init_mask(self.summary['contrib_sorted'], True)]
-        if self.mask_params["features_to_hide"] is not None:
-            mask.append(
-                hide_contributions(
-                    self.summary['var_dict'],
-                    features_list=self.check_features_name(self.mask_params["features_to_hide"])
-                )
-            )
-        if self.mask_params["threshold"] is not None:
-            mask.append(
-                cap_contributions(
-                    self.summary['contrib_sorted'],
-                    threshold=self.mask_params["threshold"]
-                )
-            )
-        if self.mask_params["positive"] is not None:
-            mask.append(
-                sign_contributions(
-                    self.summary['contrib_sorted'],
-                    positive=self.mask_params["positive"]
-                )
-            )
-        self.mask = combine_masks(mask)
-        if self.mask_params["max_contrib"] is not None:
-            self.mask = cutoff_contributions(mask=self.mask, k=self.mask_params["max_contrib"])
-        self.masked_contributions = compute_masked_contributions(
-            self.summary['contrib_sorted'],
-            self.mask
+        self.mask, self.masked_contributions = self._get_mask(self.summary)
+
+    def _get_mask(self, summary):
+        """
+        Compute the mask defined by mask_params and the masked contributions of a ranked summary.
+
+        Parameters
+        ----------
+        summary: dict
+            Ranked contributions, features values and features ids (see assign_contributions)
+
+        Returns
+        -------
+        pandas.DataFrame
+            Mask of the contributions to display
+        pandas.DataFrame
+            Sum of the hidden contributions
+        """
+        features_to_hide = self.mask_params["features_to_hide"]
+        mask = filter_mask(
+            summary['var_dict'],
+            summary['contrib_sorted'],
+            features_list=self.check_features_name(features_to_hide) if features_to_hide is not None else None,
+            threshold=self.mask_params["threshold"],
+            positive=self.mask_params["positive"],
+            max_contrib=self.mask_params["max_contrib"]
         )
+        masked_contributions = compute_masked_contributions(
+            summary['contrib_sorted'],
+            mask
+        )
+        return mask, masked_contributions
 
-    def summarize(self, use_groups=None):
+    def summarize(self, use_groups=None, x=None, ypred=None, contributions=None):
         """
         The summarize method allows to display the summary of local explainability.
         This method can be configured with modify_mask method to summarize the explainability to suit needs.
 
+        If x is specified, the summary of x is computed without modifying the SmartPredictor
+        (no add_input is needed) : one SmartPredictor can serve several threads at once.
+
         If the user doesn't use modify_mask, the summarize method uses the mask_params parameters specified during
         the initialisation of the SmartPredictor.
 
@@ -570,6 +728,13 @@ class SmartPredictor :
         ----------
         use_groups : bool (optional)
             Whether or not to compute groups of features contributions.
+        x: dict, pandas.DataFrame (optional)
+            Raw dataset used by the model to perform the prediction (not preprocessed).
+            By default, the dataset x specified in add_input.
+        ypred: pandas.DataFrame (optional)
+            User-specified prediction values of x.
+        contributions: pandas.DataFrame (regression) or list (classification) (optional)
+            local contributions of x aggregated if the preprocessing part requires it (e.g. one-hot encoding).
 
         Returns
         -------
@@ -592,10 +757,17 @@ class SmartPredictor :
         0	0	    0.756416	Sex	        1.0	        0.322308
         1	3	    0.628911	Sex	        2.0	        0.585475
         2	0	    0.543308	Sex	        2.0	        -0.486667
+
+        >>> summary_df = predictor.summarize(x=xtest_df)
         """
-        # data is needed : add_input() method must be called at least once
         use_groups = True if (use_groups is not False and self.features_groups is not None) else False
 
+        if x is not None:
+            data, data_groups = self._build_data(x, ypred, contributions)
+            _, _, _, summary = self._summarize(data_groups if use_groups else data, use_groups)
+            return pd.concat([data["ypred"], summary], axis=1)
+
+        # data is needed : add_input() method must be called at least once
         if not hasattr(self, "data"):
             raise ValueError("You have to specify dataset x and y_pred arguments. Please use add_input() method.")
 
@@ -604,6 +776,33 @@ class SmartPredictor :
         else:
             data = self.data
 
+        self.summary, self.mask, self.masked_contributions, data['summary'] = self._summarize(data, use_groups)
+
+        # Matching with y_pred
+        return pd.concat([data["ypred"], data['summary']], axis=1)
+
+    def _summarize(self, data, use_groups):
+        """
+        Rank, filter and summarize the contributions of data.
+
+        Parameters
+        ----------
+        data: dict
+            data or data of the groups of features
+        use_groups : bool
+            Whether data contains groups of features.
+
+        Returns
+        -------
+        dict
+            Ranked contributions, features values and features ids
+        pandas.DataFrame
+            Mask of the contributions to display
+        pandas.DataFrame
+            Sum of the hidden contributions
+        pandas.DataFrame
+            Selected explanation of each row
+        """
         if self._drop_option is not None:
             columns_to_keep = [x for x in self._drop_option["columns_dict_op"].values()
                                if x in data["x_postprocessed"].columns]
@@ -616,25 +815,338 @@ class SmartPredictor :
         columns_dict = {i: col for i, col in enumerate(x_preprocessed.columns)}
         features_dict = {k: v for k, v in self.features_dict.items() if k in x_preprocessed.columns}
 
-        self.summary = assign_contributions(
+        ranked = assign_contributions(
             rank_contributions(
                 data["contributions"],
                 x_preprocessed
             )
         )
-        # Apply filter method with mask_params attributes parameters
-        self.filter()
+        # Apply filter with mask_params attributes parameters
+        mask, masked_contributions = self._get_mask(ranked)
 
         # Summarize information
-        data['summary'] = summarize(self.summary['contrib_sorted'],
-                                         self.summary['var_dict'],
-                                         self.summary['x_sorted'],
-                                         self.mask,
-                                         columns_dict,
-                                         features_dict)
+        summary = summarize(ranked['contrib_sorted'],
+                            ranked['var_dict'],
+                            ranked['x_sorted'],
+                            mask,
+                            columns_dict,
+                            features_dict)
+        return ranked, mask, masked_contributions, summary
+
+    def explain_one(self, record):
+        """
+        The explain_one method is a low-latency alternative to add_input followed by summarize
+        for a single observation. It returns the summary of the observation as a dict.
+
+        Column orders, features types, labels and mask parameters are prepared once and
+        reused by the following calls (see _compile_explain_one). The ranking and the
+        filtering of the contributions are made on NumPy rows. The other stages still work
+        on a one-row pandas DataFrame : the postprocessing, the preprocessing (encoding of the
+        features), the prediction of the model and the run_explainer and
+        get_local_contributions methods of the backend.
+        If groups of features are declared, explain_one uses summarize.
+        explain_one doesn't modify the SmartPredictor : it can be used by several threads at once.
 
-        # Matching with y_pred
-        return pd.concat([data["ypred"], data['summary']], axis=1)
+        Parameters
+        ----------
+        record: dict
+            Raw observation used by the model to perform the prediction (not preprocessed),
+            mapping each feature name to its value.
+
+        Returns
+        -------
+        dict
+            Prediction, probability (classification) and selected explanation of the observation,
+            with the same keys as the columns of summarize output.
+
+        Example
+        --------
+        >>> predictor.explain_one({"Pclass": 1, "Sex": "female", "Age": 28.0})
+        {'ypred': 'Survived', 'proba': 0.92, 'feature_1': 'Sex', 'value_1': 'female', 'contribution_1': 0.45, ...}
+        """
+        if not isinstance(record, dict):
+            raise ValueError("record must be a dict.")
+        if self.features_groups is not None:
+            return {key: _to_builtin(value) for key, value in self.summarize(x=record).iloc[0].items()}
+
+        plan = self._compile_explain_one()
+        if not all(column in plan["features_types"] for column in record.keys()):
+            raise ValueError("""
+            All features from dataset x must be in the features_types dict initialized.
+            """)
+        try:
+            x = pd.DataFrame(
+                {feature: pd.Series([record[feature]], dtype=plan["features_types"][feature])
+                 for feature in plan["features_order"]}
+            )
+        except BaseException:
+            raise ValueError(
+                """
+                The structure of the given dict x isn't at the right format.
+                """
+            )
+        x_postprocessed = apply_postprocessing(x, self.postprocessing) if self.postprocessing else x
+        try:
+            x_preprocessed = self._apply_preprocessing(x)
+        except BaseException:
+            raise ValueError(
+                """
+                Preprocessing has failed. The preprocessing specified or the dataset doesn't match.
+                """
+            )
+
+        ypred = self.model.predict(x_preprocessed)
+        ypred = np.asarray(ypred).ravel()[0]
+        explain_data = self.backend.run_explainer(x=x_preprocessed)
+        contributions = self.backend.get_local_contributions(explain_data=explain_data, x=x_preprocessed)
+        result = dict()
+        if self._case == "classification":
+            position = plan["classes_positions"][ypred]
+            contributions = contributions[position]
+            result["ypred"] = self.label_dict[ypred] if self.label_dict is not None else ypred
+            result["proba"] = self.model.predict_proba(x_preprocessed)[0, position]
+        else:
+            result["ypred"] = ypred
+
+        contributions = contributions.values[0]
+        values = x_postprocessed[plan["columns_to_keep"]].values[0]
+        # Same ordering as rank_contributions
+        argsort = np.argsort(-np.abs(contributions))
+        contributions = contributions[argsort]
+        values = values[argsort]
+
+        mask = np.ones(len(argsort), dtype=bool)
+        if plan["features_to_hide"] is not None:
+            mask &= ~np.isin(argsort, plan["features_to_hide"])
+        if plan["threshold"] is not None:
+            mask &= np.abs(contributions) >= plan["threshold"]
+        if plan["positive"] is not None:
+            mask &= contributions >= 0 if plan["positive"] else contributions < 0
+        if plan["max_contrib"] is not None:
+            mask &= np.cumsum(mask) <= plan["max_contrib"]
+
+        for rank, position in enumerate(np.flatnonzero(mask)):
+            result["feature_" + str(rank + 1)] = plan["features_labels"][argsort[position]]
+            result["value_" + str(rank + 1)] = values[position]
+            result["contribution_" + str(rank + 1)] = contributions[position]
+        return {key: _to_builtin(value) for key, value in result.items()}
+
+    async def aadd_input(self, x=None, ypred=None, contributions=None, executor=None, timeout=None):
+        """
+        Asynchronous counterpart of add_input : the preprocessing, the model and the backend
+        are run in an executor so that the event loop is not blocked.
+
+        The data is stored only once it is fully computed : if the call is cancelled or times out,
+        the SmartPredictor keeps the data of the previous add_input.
+
+        Parameters
+        ----------
+        x: dict, pandas.DataFrame (optional)
+            Raw dataset used by the model to perform the prediction (not preprocessed).
+        ypred: pandas.DataFrame (optional)
+            User-specified prediction values.
+        contributions: pandas.DataFrame (regression) or list (classification) (optional)
+            local contributions aggregated if the preprocessing part requires it (e.g. one-hot encoding).
+        executor: concurrent.futures.Executor (optional)
+            Executor used to run the computation. By default, the default executor of the event loop.
+        timeout: float (optional)
+            Maximum time to wait, in seconds. asyncio.TimeoutError is raised when it is exceeded.
+
+        Example
+        --------
+        >>> await predictor.aadd_input(x=xtest_df, timeout=2)
+        """
+        if x is not None:
+            data, data_groups = await self._run_in_executor(
+                functools.partial(self._build_data, x, ypred, contributions), executor, timeout)
+        else:
+            if not hasattr(self, "data"):
+                raise ValueError("No dataset x specified.")
+            data = copy.copy(self.data)
+            if ypred is not None:
+                data["ypred_init"] = check_ypred(data["x"], ypred)
+
+            def compute():
+                data["ypred"], data["contributions"] = self._compute_contributions(
+                    data, contributions=contributions, use_groups=False)
+                return data, self._get_groups_data(data) if self.features_groups is not None else None
+
+            data, data_groups = await self._run_in_executor(compute, executor, timeout)
+        self.data = data
+        if data_groups is not None:
+            self.data_groups = data_groups
+
+    async def asummarize(self, use_groups=None, x=None, ypred=None, contributions=None, executor=None, timeout=None):
+        """
+        Asynchronous counterpart of summarize : the computation is run in an executor
+        so that the event loop is not blocked. The call supports cancellation and timeouts.
+
+        Parameters
+        ----------
+        use_groups : bool (optional)
+            Whether or not to compute groups of features contributions.
+        x: dict, pandas.DataFrame (optional)
+            Raw dataset used by the model to perform the prediction (not preprocessed).
+            By default, the dataset x specified in add_input.
+        ypred: pandas.DataFrame (optional)
+            User-specified prediction values of x.
+        contributions: pandas.DataFrame (regression) or list (classification) (optional)
+            local contributions of x aggregated if the preprocessing part requires it (e.g. one-hot encoding).
+        executor: concurrent.futures.Executor (optional)
+            Executor used to run the computation. By default, the default executor of the event loop.
+        timeout: float (optional)
+            Maximum time to wait, in seconds. asyncio.TimeoutError is raised when it is exceeded.
+
+        Returns
+        -------
+        pandas.DataFrame
+            - selected explanation of each row for classification case
+
+        Example
+        --------
+        >>> summary_df = await predictor.asummarize(x=xtest_df, timeout=2)
+        """
+        return await self._run_in_executor(
+            functools.partial(self.summarize, use_groups=use_groups, x=x, ypred=ypred, contributions=contributions),
+            executor,
+            timeout
+        )
+
+    async def adetail_contributions(self, contributions=None, use_groups=None, x=None, ypred=None,
+                                    executor=None, timeout=None):
+        """
+        Asynchronous counterpart of detail_contributions : the computation is run in an executor
+        so that the event loop is not blocked. The call supports cancellation and timeouts.
+
+        Parameters
+        -------
+        contributions : object (optional)
+            Local contributions, or list of local contributions.
+        use_groups : bool (optional)
+            Whether or not to compute groups of features contributions.
+        x: dict, pandas.DataFrame (optional)
+            Raw dataset used by the model to perform the prediction (not preprocessed).
+            By default, the dataset x specified in add_input.
+        ypred: pandas.DataFrame (optional)
+            User-specified prediction values of x.
+        executor: concurrent.futures.Executor (optional)
+            Executor used to run the computation. By default, the default executor of the event loop.
+        timeout: float (optional)
+            Maximum time to wait, in seconds. asyncio.TimeoutError is raised when it is exceeded.
+
+        Returns
+        -------
+        pandas.DataFrame
+            A Dataset with ypred and the right associated contributions.
+
+        Example
+        --------
+        >>> detail_df = await predictor.adetail_contributions(x=xtest_df, timeout=2)
+        """
+        return await self._run_in_executor(
+            functools.partial(self.detail_contributions, contributions=contributions, use_groups=use_groups,
+                              x=x, ypred=ypred),
+            executor,
+            timeout
+        )
+
+    @staticmethod
+    async def _run_in_executor(func, executor=None, timeout=None):
+        """
+        Run func in an executor and await its result.
+
+        When the call is cancelled or times out, the awaiting coroutine is released at once.
+        The computation already started in a thread runs to completion but its result is dropped.
+
+        Parameters
+        ----------
+        func: callable
+            Function without arguments
+        executor: concurrent.futures.Executor (optional)
+            Executor used to run func. By default, the default executor of the event loop.
+        timeout: float (optional)
+            Maximum time to wait, in seconds.
+
+        Returns
+        -------
+        Result of func
+        """
+        loop = asyncio.get_running_loop()
+        return await asyncio.wait_for(loop.run_in_executor(executor, func), timeout)
+
+    def batcher(self, max_batch=64, max_wait_ms=5):
+        """
+        Create a micro-batching front end of the SmartPredictor, for example to serve concurrent
+        single-row requests. The records submitted to the batcher are coalesced into a single
+        summarize call and the summaries are scattered back to the callers.
+
+        Parameters
+        ----------
+        max_batch : int (default: 64)
+            Maximum number of records summarized at once.
+        max_wait_ms : float (default: 5)
+            Maximum time waited for other records after the first record of a batch is received,
+            in milliseconds.
+
+        Returns
+        -------
+        Batcher
+            Object with thread-safe submit / explain methods and an asyncio aexplain method.
+
+        Example
+        --------
+        >>> with predictor.batcher(max_batch=32, max_wait_ms=10) as batcher:
+        >>>     future = batcher.submit({"Pclass": 1, "Sex": "female", "Age": 28.0})
+        >>>     summary = future.result()
+        """
+        return Batcher(self, max_batch=max_batch, max_wait_ms=max_wait_ms)
+
+    def _compile_explain_one(self):
+        """
+        Prepare the parameters of explain_one that only depend on the SmartPredictor attributes.
+        The result is stored and computed again only if mask_params, features_dict, columns_dict,
+        features_types or the classes of the model are modified.
+
+        Returns
+        -------
+        dict
+            Parameters used by explain_one
+        """
+        key = (
+            self.mask_params,
+            self.features_dict,
+            self.columns_dict,
+            self.features_types,
+            list(self._classes) if self._classes is not None else None
+        )
+        plan = getattr(self, "_explain_one_plan", None)
+        if plan is not None and plan["key"] == key:
+            return plan
+
+        if not all([type(key) == int for key in self.columns_dict.keys()]):
+            raise ValueError("columns_dict must have only integers keys for features order.")
+        features_order = [self.columns_dict[order]
+                          for order in range(min(self.columns_dict.keys()), max(self.columns_dict.keys()) + 1)]
+        if self._drop_option is not None:
+            columns_to_keep = [x for x in self._drop_option["columns_dict_op"].values() if x in features_order]
+        else:
+            columns_to_keep = features_order
+        features_to_hide = self.mask_params["features_to_hide"]
+
+        plan = {
+            "key": copy.deepcopy(key),
+            "features_order": features_order,
+            "features_types": dict(self.features_types),
+            "columns_to_keep": columns_to_keep,
+            "features_labels": np.array([self.features_dict[col] for col in columns_to_keep], dtype=object),
+            "classes_positions": {label: i for i, label in enumerate(self._classes)} if self._classes else None,
+            "features_to_hide": self.check_features_name(features_to_hide) if features_to_hide is not None else None,
+            "threshold": self.mask_params["threshold"],
+            "positive": self.mask_params["positive"],
+            "max_contrib": self.mask_params["max_contrib"]
+        }
+        self._explain_one_plan = plan
+        return plan
 
     def modify_mask(
             self,
@@ -680,10 +1192,19 @@ class SmartPredictor :
             if attribute is not None:
                 self.mask_params[label] = attribute
 
-    def predict(self):
+    def predict(self, x=None):
         """
         The predict method compute the predicted values for each x row defined in add_input.
 
+        If x is specified, the predicted values of x are computed without modifying the SmartPredictor :
+        this can be used by several threads at once.
+
+        Parameters
+        ----------
+        x: dict, pandas.DataFrame (optional)
+            Raw dataset used by the model to perform the prediction (not preprocessed).
+            By default, the dataset x specified in add_input.
+
         Returns
         -------
         pandas.DataFrame
@@ -694,8 +1215,13 @@ class SmartPredictor :
         >>> predictor.add_input(x=xtest_df)
         >>> predictor.predict()
 
+        or
+
+        >>> predictor.predict(x=xtest_df)
 
         """
+        if x is not None:
+            return self._predict(self._init_data(x)["x_preprocessed"])
         if not hasattr(self, "data"):
             raise ValueError("add_input method must be called at least once.")
         if self.data["x_preprocessed"] is None:
@@ -704,16 +1230,31 @@ class SmartPredictor :
                 x must be specified in an add_input method to apply predict.
                 """
             )
+        self.data["ypred_init"] = self._predict(self.data["x_preprocessed"])
+        return self.data["ypred_init"]
+
+    def _predict(self, x_preprocessed):
+        """
+        Compute the predicted values of a preprocessed dataset.
+
+        Parameters
+        ----------
+        x_preprocessed: pandas.DataFrame
+            Preprocessed dataset used by the model.
+
+        Returns
+        -------
+        pandas.DataFrame
+            A dataset with predicted values for each row.
+        """
         if hasattr(self.model, 'predict'):
-            self.data["ypred_init"] = pd.DataFrame(
-                self.model.predict(self.data["x_preprocessed"]),
+            return pd.DataFrame(
+                self.model.predict(x_preprocessed),
                 columns=['ypred'],
-                index=self.data["x_preprocessed"].index)
+                index=x_preprocessed.index)
         else:
             raise ValueError("model has no predict method")
 
-        return self.data["ypred_init"]
-
     def apply_postprocessing(self):
         """
         Modifies x Dataframe according to postprocessing modifications, if exists.
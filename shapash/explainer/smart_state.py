@@ -5,11 +5,13 @@ import numpy as np
 import pandas as pd
 from shapash.decomposition.contributions import inverse_transform_contributions
 from shapash.decomposition.contributions import rank_contributions, assign_contributions
+from shapash.decomposition.contributions import sparsify_contributions
 from shapash.manipulation.filters import hide_contributions
 from shapash.manipulation.filters import cap_contributions
 from shapash.manipulation.filters import sign_contributions
 from shapash.manipulation.filters import cutoff_contributions
 from shapash.manipulation.filters import combine_masks
+from shapash.manipulation.filters import filter_mask
 from shapash.manipulation.mask import compute_masked_contributions
 from shapash.manipulation.mask import init_mask
 from shapash.manipulation.summarize import summarize, compute_features_import, group_contributions
@@ -103,7 +105,7 @@ class SmartState:
                 return False
         return True
 
-    def rank_contributions(self, contributions, x_init):
+    def rank_contributions(self, contributions, x_init, chunk_size=None, top_k=None):
         """
         Rank contributions line by line and build a reference dictionary to the prediction set.
 
@@ -113,6 +115,10 @@ class SmartState:
             Local contributions to sort.
         x_init : pandas.DataFrame
             Prediction set.
+        chunk_size : int, optional (default: None)
+            Number of rows sorted at once. If None, all the rows are sorted at once.
+        top_k : int, optional (default: None)
+            If not None, only the top_k largest contributions of each row are sorted and kept.
 
         Returns
         -------
@@ -123,8 +129,29 @@ class SmartState:
         pandas.DataFrame
             Input features names sorted for each observation
             by decreasing contributions absolute values.
+        pandas.DataFrame
+            Only if top_k is not None : sums of the negative and positive contributions
+            which are not kept.
+        """
+        return rank_contributions(contributions, x_init, chunk_size=chunk_size, top_k=top_k)
+
+    def sparsify_contributions(self, contributions, threshold=0.0):
+        """
+        Store contributions as a sparse dataframe, the small contributions are not stored.
+
+        Parameters
+        ----------
+        contributions : pandas.DataFrame
+            Local contributions.
+        threshold : float (default: 0.0)
+            Contributions with an absolute value lower than or equal to threshold are dropped.
+
+        Returns
+        -------
+        pandas.DataFrame
+            Sparse local contributions.
         """
-        return rank_contributions(contributions, x_init)
+        return sparsify_contributions(contributions, threshold)
 
     def assign_contributions(self, ranked):
         """
@@ -143,7 +170,7 @@ class SmartState:
         Raises
         ------
         ValueError
-            The output of rank_contributions should always be of length three.
+            The output of rank_contributions should always be of length three or four.
         """
         return assign_contributions(ranked)
 
@@ -244,6 +271,36 @@ class SmartState:
         """
         return combine_masks(masks)
 
+    def filter_mask(self, var_dict, s_contrib, features_list=None, threshold=None, positive=None,
+                    max_contrib=None):
+        """
+        Compute the mask of a filter in a single boolean buffer.
+
+        Parameters
+        ----------
+        var_dict : pd.DataFrame
+            Dataframe with features indexes ordered by contribution.
+        s_contrib : pd.DataFrame
+            Sorted local contributions, positive and negative values.
+        features_list : list, optional (default: None)
+            List of index, features to hide.
+        threshold : float, optional (default: None)
+            Absolute threshold below which any contribution is hidden.
+        positive : bool, optional (default: None)
+            If True, hide negative values. False, hide positive values.
+        max_contrib : int, optional (default: None)
+            Maximum number of contributions to show.
+
+        Returns
+        -------
+        pd.DataFrame
+            Mask where only the contributions to show are True.
+        """
+        return filter_mask(
+            var_dict, s_contrib, features_list=features_list, threshold=threshold,
+            positive=positive, max_contrib=max_contrib
+        )
+
     def compute_masked_contributions(self, s_contrib, masks):
         """
         Compute the summed contributions of hidden features.
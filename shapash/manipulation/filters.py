@@ -117,7 +117,14 @@ def cutoff_contributions(mask, k=10):
     pd.Dataframe
         Mask where only the k-top contributions are considered.
     """
-    return mask.replace(False, np.nan).cumsum(axis=1).isin(range(1, k+1))
+    values = mask.to_numpy(dtype=bool)
+    # Rank of each True among the True of its row, with the smallest integer type possible
+    rank = np.cumsum(values, axis=1, dtype=np.min_scalar_type(values.shape[1]))
+    return pd.DataFrame(
+        values & (rank <= k),
+        columns=mask.columns,
+        index=mask.index
+    )
 
 
 def combine_masks(masks_list):
@@ -140,11 +147,67 @@ def combine_masks(masks_list):
     if len(set(map(lambda x: x.shape, masks_list))) != 1:
         raise ValueError('Masks must have same dimensions.')
 
-    masks_cube = np.dstack(masks_list)
-    mask_final = np.min(masks_cube, axis=2)
+    # Masks are combined in place in a single boolean buffer
+    mask_final = masks_list[0].to_numpy(dtype=bool, copy=True)
+    for mask in masks_list[1:]:
+        mask_final &= mask.to_numpy(dtype=bool)
 
     return pd.DataFrame(
         mask_final,
         columns=['contrib_{}'.format(i+1) for i in range(mask_final.shape[1])],
         index=masks_list[0].index
     )
+
+
+def filter_mask(var_dict, s_contrib, features_list=None, threshold=None, positive=None, max_contrib=None):
+    """
+    Compute the mask of a filter in a single boolean buffer.
+    The conditions of hide_contributions, cap_contributions and sign_contributions
+    are combined in place in the buffer, then the top-k cutoff of cutoff_contributions
+    is applied.
+
+    Parameters
+    ----------
+    var_dict : pd.DataFrame
+        Dataframe with features indexes ordered by contribution.
+    s_contrib : pd.DataFrame
+        Sorted local contributions, positive and negative values.
+    features_list : list, optional (default: None)
+        List of index, features to hide.
+    threshold : float, optional (default: None)
+        Absolute threshold below which any contribution is hidden.
+    positive : bool, optional (default: None)
+        If True, hide negative values. False, hide positive values.
+        If None, hide nothing.
+    max_contrib : int, optional (default: None)
+        Maximum number of contributions to show.
+
+    Returns
+    -------
+    pd.DataFrame
+        Mask where only the contributions to show are True.
+    """
+    values = s_contrib.to_numpy()
+    mask = np.ones(values.shape, dtype=bool)
+    condition = np.empty(values.shape, dtype=bool)
+    if features_list is not None:
+        mask &= np.isin(var_dict.to_numpy(), features_list, invert=True)
+    with np.errstate(invalid='ignore'):
+        if threshold is not None:
+            np.greater_equal(np.abs(values), threshold, out=condition)
+            mask &= condition
+        if positive is not None:
+            if positive:
+                np.greater_equal(values, 0, out=condition)
+            else:
+                np.less(values, 0, out=condition)
+            mask &= condition
+    if max_contrib is not None:
+        rank = np.cumsum(mask, axis=1, dtype=np.min_scalar_type(mask.shape[1]))
+        np.less_equal(rank, max_contrib, out=condition)
+        mask &= condition
+    return pd.DataFrame(
+        mask,
+        columns=['contrib_{}'.format(i+1) for i in range(mask.shape[1])],
+        index=s_contrib.index
+    )
@@ -1,8 +1,8 @@
 """
 Select Lines Module
 """
+import numpy as np
 import pandas as pd
-from pandas.core.common import flatten
 
 def select_lines(dataframe, condition=None):
     """
@@ -46,18 +46,25 @@ def keep_right_contributions(y_pred, contributions, _case, _classes, label_dict,
 
     """
     if _case == "classification":
-        complete_sum = [list(x) for x in list(zip(*[df.values.tolist() for df in contributions]))]
-        indexclas = [_classes.index(x) for x in list(flatten(y_pred.values))]
-        summary = pd.DataFrame([summar[ind]
-                                for ind, summar in zip(indexclas, complete_sum)],
-                               columns=contributions[0].columns,
-                               index=contributions[0].index,
-                               dtype=object)
+        # Summaries of the classes can have different lengths : the longest columns contain the others
+        columns = max((df.columns for df in contributions), key=len)
+        # complete_sum[i, j] : contributions of the row i for the class j
+        complete_sum = np.stack(
+            [df.to_numpy() if len(df.columns) == len(columns) else df.reindex(columns=columns).to_numpy()
+             for df in contributions],
+            axis=1
+        )
+        # Position of the predicted class of each row
+        indexclas = pd.Index(_classes).get_indexer(y_pred.to_numpy().ravel())
+        if (indexclas == -1).any():
+            raise ValueError("y_pred contains values that are not in the model classes.")
+        summary = pd.DataFrame(np.take_along_axis(complete_sum, indexclas[:, None, None], axis=1)[:, 0, :],
+                               columns=columns,
+                               index=contributions[0].index).infer_objects()
         if label_dict is not None:
             y_pred = y_pred.applymap(lambda x: label_dict[x])
         if proba_values is not None:
-            y_proba = pd.DataFrame([proba[ind]
-                                    for ind, proba in zip(indexclas, proba_values.values)],
+            y_proba = pd.DataFrame(np.take_along_axis(proba_values.to_numpy(), indexclas[:, None], axis=1),
                                    columns=['proba'],
                                    index=y_pred.index)
             y_pred = pd.concat([y_pred, y_proba], axis=1)
@@ -13,6 +13,9 @@ def summarize_el(dataframe, mask, prefix):
     """
     Compute a summarized Matrix.
 
+    The entries kept by the mask are moved to the left of each row, in their original
+    order. Numeric matrices keep a numeric dtype (float when padding is needed).
+
     Parameters
     ----------
     dataframe: pd.DataFrame
@@ -28,18 +31,26 @@ def summarize_el(dataframe, mask, prefix):
     pd.DataFrame
         Result of the summarize step
     """
-    matrix = dataframe.where(mask.to_numpy()).values.tolist()
-    summarized_matrix = [[x for x in l if str(x) != 'nan'] for l in matrix]
-    # Padding to create pd.DataFrame
-    max_length = max(len(l) for l in summarized_matrix)
-    for elem in summarized_matrix:
-        elem.extend([np.nan] * (max_length - len(elem)))
+    values = dataframe.to_numpy()
+    mask = mask.to_numpy(dtype=bool)
+    nb_kept = mask.sum(axis=1)
+    max_length = int(nb_kept.max()) if len(nb_kept) > 0 else 0
+    # Stable sort of the negated mask : the kept entries first, in their original order
+    order = np.argsort(~mask, axis=1, kind='stable')[:, :max_length]
+    summarized_matrix = np.take_along_axis(values, order, axis=1)
+    # Padding the rows with less kept entries
+    padding = np.arange(max_length) >= nb_kept[:, None]
+    if padding.any():
+        if summarized_matrix.dtype.kind in 'iuf':
+            summarized_matrix = summarized_matrix.astype(float)
+        else:
+            summarized_matrix = summarized_matrix.astype(object)
+        summarized_matrix[padding] = np.nan
     # Create DataFrame
-    col_list = [prefix + str(x + 1) for x in list(range(max_length))]
+    col_list = [prefix + str(x + 1) for x in range(max_length)]
     df_summarized_matrix = pd.DataFrame(summarized_matrix,
-                                        index=list(dataframe.index),
-                                        columns=col_list,
-                                        dtype=object)
+                                        index=dataframe.index,
+                                        columns=col_list)
 
     return df_summarized_matrix
 
@@ -89,8 +100,16 @@ def summarize(s_contrib, var_dict, x_sorted, mask, columns_dict, features_dict):
         Result of the summarize step
     """
     contrib_sum = summarize_el(s_contrib, mask, 'contribution_')
-    var_dict_sum = summarize_el(var_dict, mask, 'feature_').applymap(
-        lambda x: features_dict[columns_dict[x]] if not np.isnan(x) else x)
+    var_dict_sum = summarize_el(var_dict, mask, 'feature_')
+    ids = var_dict_sum.to_numpy(dtype=float)
+    missing = np.isnan(ids)
+    # Missing entries point to the last position of the lookup array
+    ids = np.where(missing, -1, ids).astype(int)
+    # Lookup array matching the column num with the column label
+    labels = np.full(max(columns_dict.keys(), default=-1) + 2, np.nan, dtype=object)
+    for num in np.unique(ids[~missing]):
+        labels[num] = features_dict[columns_dict[num]]
+    var_dict_sum = pd.DataFrame(labels[ids], index=var_dict_sum.index, columns=var_dict_sum.columns)
     x_sorted_sum = summarize_el(x_sorted, mask, 'value_')
 
     # Concatenate pd.DataFrame
@@ -0,0 +1,236 @@
+"""
+Micro-batching module
+"""
+import asyncio
+import numbers
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+_STOP = object()
+
+
+class Batcher:
+    """
+    Micro-batching front end of a SmartPredictor.
+
+    Records submitted concurrently (by several threads or coroutines) are queued. A worker
+    thread coalesces the pending records into a single summarize call of the SmartPredictor,
+    then scatters the rows of the summary back to the callers.
+    The fixed costs of the model and of the explainer are paid once per batch instead of
+    once per record. The SmartPredictor is not modified.
+
+    Parameters
+    ----------
+    predictor : SmartPredictor
+        SmartPredictor used to summarize the batches.
+    max_batch : int (default: 64)
+        Maximum number of records summarized at once.
+    max_wait_ms : float (default: 5)
+        Maximum time waited for other records after the first record of a batch is received,
+        in milliseconds.
+
+    Example
+    --------
+    >>> with predictor.batcher(max_batch=32, max_wait_ms=10) as batcher:
+    >>>     summary = batcher.explain({"Pclass": 1, "Sex": "female", "Age": 28.0})
+    """
+
+    def __init__(self, predictor, max_batch=64, max_wait_ms=5):
+        if not isinstance(max_batch, numbers.Integral) or max_batch <= 0:
+            raise ValueError("max_batch must be a positive integer.")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be positive.")
+        self.predictor = predictor
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self._queue = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, record):
+        """
+        Submit a record to summarize. This method is thread-safe.
+
+        Parameters
+        ----------
+        record : dict
+            Raw observation used by the model (not preprocessed), mapping each feature name to its value.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Future of the summary of the record (dict).
+        """
+        if not isinstance(record, dict):
+            raise ValueError("record must be a dict.")
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The batcher is closed.")
+            self._queue.put((record, future))
+        return future
+
+    def explain(self, record, timeout=None):
+        """
+        Submit a record and wait for its summary.
+
+        Parameters
+        ----------
+        record : dict
+            Raw observation used by the model (not preprocessed).
+        timeout : float, optional
+            Maximum time to wait, in seconds.
+
+        Returns
+        -------
+        dict
+            Summary of the record.
+        """
+        return self.submit(record).result(timeout=timeout)
+
+    async def aexplain(self, record):
+        """
+        Submit a record and await its summary, without blocking the event loop.
+
+        Parameters
+        ----------
+        record : dict
+            Raw observation used by the model (not preprocessed).
+
+        Returns
+        -------
+        dict
+            Summary of the record.
+        """
+        return await asyncio.wrap_future(self.submit(record))
+
+    def close(self):
+        """
+        Stop the worker thread once the pending records are summarized.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _run(self):
+        """
+        Worker loop : collect the batches and summarize them.
+        """
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._process(batch)
+
+    def _process(self, batch):
+        """
+        Summarize a batch and set the results of the futures.
+        If the batch fails, its records are summarized one by one so that
+        only the invalid records get the error.
+
+        Parameters
+        ----------
+        batch : list
+            List of (record, future) tuples.
+        """
+        batch = [(record, future) for record, future in batch if future.set_running_or_notify_cancel()]
+        if len(batch) == 0:
+            return
+        try:
+            summaries = self._summarize([record for record, _ in batch])
+        except BaseException as error:
+            if len(batch) == 1:
+                batch[0][1].set_exception(error)
+            else:
+                for record, future in batch:
+                    try:
+                        future.set_result(self._summarize([record])[0])
+                    except BaseException as record_error:
+                        future.set_exception(record_error)
+            return
+        for (_, future), summary in zip(batch, summaries):
+            future.set_result(summary)
+
+    def _summarize(self, records):
+        """
+        Summarize a list of records with a single summarize call.
+
+        Parameters
+        ----------
+        records : list
+            List of dict
+
+        Returns
+        -------
+        list
+            List of the summaries (dict), in the same order as records.
+        """
+        features_types = self.predictor.features_types
+        if not all(column in features_types for record in records for column in record.keys()):
+            raise ValueError("""
+            All features from dataset x must be in the features_types dict initialized.
+            """)
+        x = pd.DataFrame.from_records(records)
+        for feature, type_feature in features_types.items():
+            x[feature] = x[feature].astype(type_feature)
+        summary = self.predictor.summarize(x=x)
+        return [_row_to_dict(row) for row in summary.to_dict(orient="records")]
+
+
+def _row_to_dict(row):
+    """
+    Convert a row of summary into a dict : the padding of the summary is removed
+    and the NumPy scalars are converted into Python objects.
+
+    Parameters
+    ----------
+    row : dict
+        Row of the summary
+
+    Returns
+    -------
+    dict
+    """
+    result = dict()
+    for key, value in row.items():
+        if key.startswith(("feature_", "value_", "contribution_")):
+            rank = key.split("_")[-1]
+            if pd.isna(row.get("feature_" + rank)):
+                continue
+        result[key] = _to_builtin(value)
+    return result
+
+
+def _to_builtin(value):
+    """
+    Convert a NumPy scalar into the equivalent Python object.
+    """
+    return value.item() if isinstance(value, np.generic) else value
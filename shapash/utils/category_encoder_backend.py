@@ -2,6 +2,8 @@
 Category_encoder
 """
 
+import threading
+import weakref
 import pandas as pd
 import numpy as np
 import category_encoders as ce
@@ -103,6 +105,26 @@ def inv_transform_target(x_in, enc_target):
     pandas.Dataframe
         The reversed dataframe.
     """
+    for transco in _get_target_mappings(enc_target):
+        x_in = inv_transform_ordinal(x_in, [transco])
+    return x_in
+
+
+def _get_target_mappings(enc_target):
+    """
+    Build the mappings used to reverse a TargetEncoder, in the format used by inv_transform_ordinal.
+
+    Parameters
+    ----------
+    enc_target : category_encoders.TargetEncoder
+        TargetEncoder from category encoder.
+
+    Returns
+    -------
+    list
+        A list of dict containing the col, the mapping and the data_type.
+    """
+    list_transco = []
     for tgt_enc in enc_target.ordinal_encoder.mapping:
         name_target = tgt_enc.get('col')
         mapping_ordinal = enc_target.mapping[name_target]
@@ -115,11 +137,10 @@ def inv_transform_target(x_in, enc_target):
             # print("Warning in inverse TargetEncoder - col " + str(name_target) + ": Multiple label for the same value, "
             #                                                                   "each label will be separate using : / ")
 
-        transco = {'col': name_target,
-                   'mapping': pd.Series(data=aggregate.index, index=aggregate.values),
-                   'data_type': 'object'}
-        x_in = inv_transform_ordinal(x_in, [transco])
-    return x_in
+        list_transco.append({'col': name_target,
+                             'mapping': pd.Series(data=aggregate.index, index=aggregate.values),
+                             'data_type': 'object'})
+    return list_transco
 
 
 def inv_transform_ordinal(x_in, encoding):
@@ -184,6 +205,230 @@ def reverse_basen(x_in, encoding):
     return x
 
 
+def inv_transform_ce_vectorized(columns, encoding):
+    """
+    Vectorized counterpart of inv_transform_ce.
+
+    The data is given as a dict of columns, so that the dataset is neither copied
+    nor rebuilt for each encoder : the dummies are reversed with an argmax over each
+    one-hot block, the BaseN and Binary columns with an integer decoding and the
+    ordinal and target mappings with an array lookup.
+
+    Parameters
+    ----------
+    columns : dict
+        Columns of the prediction set (pandas.Series) in the order of the dataset.
+    encoding : list
+        A list of category encoder (OrdinalEncoder/OnehotEncoder/BaseNEncoder/BinaryEncoder/TargetEncoder)
+        or a list of dict
+
+    Returns
+    -------
+    dict
+        The reversed columns for the given encoding.
+    """
+    if str(type(encoding)) == category_encoder_ordinal:
+        rst = inv_transform_ordinal_vectorized(columns, encoding.mapping)
+
+    elif str(type(encoding)) == category_encoder_onehot:
+        x = reverse_dummies_vectorized(columns, encoding.mapping)
+        rst = inv_transform_ordinal_vectorized(x, encoding.ordinal_encoder.mapping)
+
+    elif str(type(encoding)) == category_encoder_basen:
+        x = reverse_basen_vectorized(columns, encoding)
+        rst = inv_transform_ordinal_vectorized(x, encoding.ordinal_encoder.mapping)
+
+    elif str(type(encoding)) == category_encoder_binary:
+        if ce.__version__ <= '2.2.2':
+            x = reverse_basen_vectorized(columns, encoding.base_n_encoder)
+            rst = inv_transform_ordinal_vectorized(x, encoding.base_n_encoder.ordinal_encoder.mapping)
+        else:
+            x = reverse_basen_vectorized(columns, encoding)
+            rst = inv_transform_ordinal_vectorized(x, encoding.ordinal_encoder.mapping)
+
+    elif str(type(encoding)) == category_encoder_targetencoder:
+        rst = inv_transform_ordinal_vectorized(columns, _get_target_mappings(encoding))
+
+    elif str(type(encoding)) == "<class 'list'>":
+        rst = inv_transform_ordinal_vectorized(columns, encoding)
+
+    else:
+        raise Exception(f"{encoding.__class__.__name__} not supported, no inverse done.")
+
+    return rst
+
+
+def inv_transform_ordinal_vectorized(columns, encoding):
+    """
+    Vectorized counterpart of inv_transform_ordinal.
+
+    Parameters
+    ----------
+    columns : dict
+        Columns of the prediction set (pandas.Series).
+    encoding : list
+        A list of dict containing the col, the mapping and the data_type use for reversed transformation.
+
+    Returns
+    -------
+    dict
+        The reversed columns.
+    """
+    rst = dict(columns)
+    for switch in encoding:
+        col_name = switch.get('col')
+        if not col_name in rst:
+            raise Exception(f'Columns {col_name} not in dataframe.')
+        column_mapping = switch.get('mapping')
+        if isinstance(column_mapping, dict):
+            inverse = pd.Series(data=column_mapping.keys(), index=column_mapping.values())
+        else:
+            inverse = pd.Series(data=column_mapping.index, index=column_mapping.values)
+        rst[col_name] = _lookup(rst[col_name], inverse).astype(switch.get('data_type'))
+    return rst
+
+
+def _lookup(column, mapping):
+    """
+    Same as column.map(mapping). When the mapping keys and the values of the column are
+    integers (ordinal codes), the values are looked up in an array indexed by the codes.
+
+    Parameters
+    ----------
+    column : pandas.Series
+        Values to map.
+    mapping : pandas.Series
+        Mapping between the keys (index) and the new values.
+
+    Returns
+    -------
+    pandas.Series
+        The mapped values.
+    """
+    keys = mapping.index
+    values = column.to_numpy()
+    if not (len(keys) > 0
+            and keys.is_unique
+            and pd.api.types.is_integer_dtype(keys.dtype)
+            and pd.api.types.is_integer_dtype(values.dtype)
+            and mapping.dtype.kind in 'biufO'
+            and keys.max() - keys.min() <= 4 * len(keys) + 16):
+        return column.map(mapping)
+
+    low = keys.min()
+    high = keys.max()
+    positions = np.full(high - low + 1, -1, dtype=np.intp)
+    positions[keys.to_numpy() - low] = np.arange(len(keys))
+    in_range = (values >= low) & (values <= high)
+    indexer = np.full(values.shape[0], -1, dtype=np.intp)
+    indexer[in_range] = positions[values[in_range] - low]
+    missing = indexer == -1
+
+    result = mapping.to_numpy().take(indexer)
+    if missing.any():
+        # Same dtypes as Series.map when some values are not found
+        if result.dtype.kind in 'iu':
+            result = result.astype(np.float64)
+        elif result.dtype.kind == 'b':
+            result = result.astype(object)
+        result[missing] = np.nan
+    return pd.Series(result, index=column.index, name=column.name)
+
+
+def reverse_dummies_vectorized(columns, mapping):
+    """
+    Vectorized counterpart of OneHotEncoder.reverse_dummies : the code of each row
+    is given by the last column of the one-hot block equal to 1, 0 if there is none.
+
+    Parameters
+    ----------
+    columns : dict
+        Columns of the prediction set (pandas.Series).
+    mapping: list
+        Mapping of the OneHotEncoder.
+
+    Returns
+    -------
+    dict
+        The columns with the ordinal codes instead of the dummies.
+    """
+    for switch in mapping:
+        mod = switch.get('mapping')
+        positive_indexes = mod.index[mod.index > 0].to_numpy()
+        index = columns[mod.columns[0]].index
+        nb_positive = positive_indexes.shape[0]
+        if nb_positive > 0:
+            # One row per dummy column : the reductions run over contiguous rows
+            block = np.stack([columns[col].to_numpy() == 1 for col in mod.columns[:nb_positive]])
+            last = nb_positive - 1 - np.argmax(block[::-1], axis=0)
+            codes = np.where(block.any(axis=0), positive_indexes[last], 0)
+        else:
+            codes = np.zeros(len(index), dtype=np.int64)
+        columns = _replace_columns(columns, list(mod.columns), switch.get('col'), pd.Series(codes, index=index))
+    return columns
+
+
+def reverse_basen_vectorized(columns, encoding):
+    """
+    Vectorized counterpart of reverse_basen.
+
+    Parameters
+    ----------
+    columns : dict
+        Columns of the prediction set (pandas.Series).
+    encoding : category_encoders.BaseNEncoder
+        BaseN encoder.
+
+    Returns
+    -------
+    dict
+        The columns with the ordinal codes instead of the baseN digits.
+    """
+    for ind_enc in range(len(encoding.mapping)):
+        col_list = encoding.mapping[ind_enc].get('mapping').columns.tolist()
+        if encoding.base == 1:
+            value_array = np.array([int(col0.split('_')[-1]) for col0 in col_list])
+        else:
+            len0 = len(col_list)
+            value_array = np.array([encoding.base ** (len0 - 1 - i) for i in range(len0)])
+        index = columns[col_list[0]].index
+        codes = np.dot(np.column_stack([columns[col].to_numpy() for col in col_list]), value_array.T)
+        columns = _replace_columns(columns, col_list, encoding.cols[ind_enc], pd.Series(codes, index=index))
+    return columns
+
+
+def _replace_columns(columns, old_columns, new_column, values):
+    """
+    Replace several columns by a single column, inserted at the position of the first replaced column.
+
+    Parameters
+    ----------
+    columns : dict
+        Columns of the dataset.
+    old_columns : list
+        Names of the columns to remove.
+    new_column : str
+        Name of the new column.
+    values : pandas.Series
+        Values of the new column.
+
+    Returns
+    -------
+    dict
+        The new columns.
+    """
+    missing = [col for col in old_columns if col not in columns]
+    if missing:
+        raise KeyError(f'{missing} not found in axis')
+    rst = dict()
+    for col, column in columns.items():
+        if col == old_columns[0]:
+            rst[new_column] = values.rename(new_column)
+        if col not in old_columns:
+            rst[col] = column
+    return rst
+
+
 def calc_inv_contrib_ce(x_contrib, encoding, agg_columns):
     """
     Reversed contribution when category encoder and/or a dict is used.
@@ -209,24 +454,192 @@ def calc_inv_contrib_ce(x_contrib, encoding, agg_columns):
         The aggregate contributions depending on which processing is apply.
     """
     if str(type(encoding)) in dummies_category_encoder:
-        if str(type(encoding)) in category_encoder_binary and ce.__version__ <= '2.2.2':
-            encoding = encoding.base_n_encoder
-        drop_col = []
-        for switch in encoding.mapping:
-            col_in = switch.get('col')
-            mod = switch.get('mapping').columns.tolist()
-            insert_at = x_contrib.columns.tolist().index(mod[0])
-            if agg_columns == 'first':
-                x_contrib.insert(insert_at, col_in, x_contrib[mod[0]])
-            else:
-                x_contrib.insert(insert_at, col_in, x_contrib[mod].sum(axis=1))
-            drop_col += mod
-        x_contrib.drop(drop_col, axis=1, inplace=True)
-        return x_contrib
+        groups = get_column_groups(encoding, x_contrib.columns, _build_column_groups_ce)
+        return aggregate_contributions(x_contrib, groups, agg_columns)
     else:
         return x_contrib
 
 
+def _build_column_groups_ce(encoding, columns):
+    """
+    Build the column groups of a category encoder creating multiple columns : the columns of
+    each encoded feature are replaced by a single column, at the position of the first one.
+
+    Parameters
+    ----------
+    encoding : category_encoders
+        OneHotEncoder, BinaryEncoder or BaseNEncoder.
+    columns : list
+        Names of the contributions columns.
+
+    Returns
+    -------
+    tuple
+        names, positions, starts and encoded flags of the groups (see aggregate_contributions).
+    """
+    if str(type(encoding)) in category_encoder_binary and ce.__version__ <= '2.2.2':
+        encoding = encoding.base_n_encoder
+    col_positions = {col: i for i, col in enumerate(columns)}
+    first_columns = dict()
+    encoded_columns = set()
+    for switch in encoding.mapping:
+        mod = switch.get('mapping').columns.tolist()
+        first_columns[mod[0]] = (switch.get('col'), [col_positions[col] for col in mod])
+        encoded_columns.update(mod)
+
+    names, positions, starts, encoded = [], [], [], []
+    for i, col in enumerate(columns):
+        if col in first_columns:
+            name, group_positions = first_columns[col]
+            starts.append(len(positions))
+            names.append(name)
+            positions.extend(group_positions)
+            encoded.append(True)
+        if col not in encoded_columns:
+            starts.append(len(positions))
+            names.append(col)
+            positions.append(i)
+            encoded.append(False)
+    return (names, np.array(positions, dtype=np.intp), np.array(starts, dtype=np.intp),
+            np.array(encoded, dtype=bool))
+
+
+# Column groups computed for each preprocessing object, by list of contributions columns
+_column_groups_cache = weakref.WeakKeyDictionary()
+_column_groups_lock = threading.Lock()
+
+
+def _fitted_attribute(encoding):
+    """
+    Attribute of an encoding replaced by a new object each time the encoding is fitted.
+
+    Parameters
+    ----------
+    encoding : category_encoders, ColumnTransformer
+        The processing apply to the original data.
+
+    Returns
+    -------
+    object
+        transformers_ of a ColumnTransformer, mapping of a category encoder.
+    """
+    if hasattr(encoding, 'transformers_'):
+        return encoding.transformers_
+    if hasattr(encoding, 'base_n_encoder'):
+        encoding = encoding.base_n_encoder
+    return getattr(encoding, 'mapping', None)
+
+
+def get_column_groups(encoding, columns, build_column_groups):
+    """
+    Get the column groups used to aggregate the contributions for an encoding.
+    The groups only depend on the encoding and the columns : they are computed once
+    and stored for each preprocessing object. They are computed again if the encoding is
+    fitted again ; if the encoding is modified in place in another way, clear_column_groups_cache
+    must be called.
+
+    Parameters
+    ----------
+    encoding : category_encoders, ColumnTransformer
+        The processing apply to the original data.
+    columns : list
+        Names of the contributions columns.
+    build_column_groups : function
+        Function computing the groups from the encoding and the columns.
+
+    Returns
+    -------
+    tuple
+        names, positions, starts and encoded flags of the groups (see aggregate_contributions).
+    """
+    key = tuple(columns)
+    fitted = _fitted_attribute(encoding)
+    try:
+        with _column_groups_lock:
+            cached = _column_groups_cache.get(encoding, dict()).get(key)
+    except TypeError:
+        return build_column_groups(encoding, list(columns))
+    if cached is not None and cached[0] is fitted:
+        return cached[1]
+    groups = build_column_groups(encoding, list(columns))
+    with _column_groups_lock:
+        _column_groups_cache.setdefault(encoding, dict())[key] = (fitted, groups)
+    return groups
+
+
+def clear_column_groups_cache(encoding=None):
+    """
+    Remove the column groups stored by get_column_groups.
+
+    Parameters
+    ----------
+    encoding : category_encoders or ColumnTransformer, optional
+        Only the groups of this encoding are removed. If None, the whole cache is cleared.
+    """
+    with _column_groups_lock:
+        if encoding is None:
+            _column_groups_cache.clear()
+        else:
+            try:
+                _column_groups_cache.pop(encoding, None)
+            except TypeError:
+                pass
+
+
+def aggregate_contributions(x_contrib, groups, agg_columns):
+    """
+    Aggregate the contributions by groups of columns, in a single pass over the contributions array.
+
+    Parameters
+    ----------
+    x_contrib : pandas.DataFrame
+        Contributions set.
+    groups : tuple
+        - names : list of the names of the aggregated columns
+        - positions : np.ndarray of the positions of the columns of x_contrib, group after group
+        - starts : np.ndarray of the position in positions of the first column of each group
+        - encoded : np.ndarray, True for the groups of columns created by an encoder. Their
+          contributions are summed as pandas sum does, missing values counting as 0 (even for
+          a single column). The other groups are single columns kept as they are.
+    agg_columns : str
+        'sum' to sum the contributions of a group, 'first' to take the first column of the group.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The aggregate contributions, one column per group.
+    """
+    names, positions, starts, encoded = groups
+    if len(names) == 0:
+        return pd.DataFrame(index=x_contrib.index)
+    sizes = np.diff(np.append(starts, len(positions)))
+
+    if x_contrib.dtypes.nunique() > 1:
+        # Mixed dtypes : the single columns are kept as they are
+        columns = []
+        for name, start, size, is_encoded in zip(names, starts, sizes, encoded):
+            if agg_columns == 'first' or not is_encoded:
+                column = x_contrib.iloc[:, positions[start]]
+            else:
+                column = x_contrib.iloc[:, positions[start:start + size]].sum(axis=1)
+            columns.append(column.rename(name))
+        return pd.concat(columns, axis=1)
+
+    values = x_contrib.to_numpy()
+    if agg_columns == 'first':
+        aggregated = values[:, positions[starts]]
+    else:
+        if not np.array_equal(positions, np.arange(values.shape[1])):
+            values = values[:, positions]
+        if values.dtype.kind == 'f' and np.isnan(values).any():
+            # Same as pandas sum : missing values are skipped in the encoded groups
+            aggregated = np.add.reduceat(np.where(np.isnan(values), 0, values), starts, axis=1)
+            aggregated[:, ~encoded] = values[:, starts[~encoded]]
+        else:
+            aggregated = np.add.reduceat(values, starts, axis=1)
+    return pd.DataFrame(aggregated, columns=names, index=x_contrib.index)
+
+
 def transform_ce(x_in, encoding):
     """
     Choose and apply the transformation for the given encoding.
@@ -6,10 +6,12 @@ import pandas as pd
 import numpy as np
 from shapash.utils.category_encoder_backend import inv_transform_ordinal
 from shapash.utils.category_encoder_backend import inv_transform_ce
+from shapash.utils.category_encoder_backend import inv_transform_ce_vectorized, inv_transform_ordinal_vectorized
 from shapash.utils.category_encoder_backend import supported_category_encoder
 from shapash.utils.category_encoder_backend import dummies_category_encoder
 from shapash.utils.category_encoder_backend import category_encoder_binary
 from shapash.utils.category_encoder_backend import transform_ordinal, get_col_mapping_ce
+from shapash.utils.category_encoder_backend import aggregate_contributions, get_column_groups
 from shapash.utils.model_synoptic import simple_tree_model_sklearn, catboost_model,\
     linear_model, svm_model, xgboost_model, lightgbm_model, dict_model_feature
 from shapash.utils.model import extract_features_model
@@ -109,6 +111,79 @@ def inv_transform_ct(x_in, encoding):
     return rst
 
 
+def inv_transform_ct_vectorized(columns, encoding):
+    """
+    Vectorized counterpart of inv_transform_ct.
+
+    The data is given as a dict of columns and the transformers are reversed on their block
+    of columns : the result is built once instead of being concatenated for each transformer.
+
+    Parameters
+    ----------
+    columns : dict
+        Columns of the prediction set (pandas.Series) in the order of the dataset.
+    encoding : list
+        The list must contain a single ColumnsTransformer and an optional list of dict.
+
+    Returns
+    -------
+    dict
+        The reversed columns for the given list of encoding.
+    """
+    if str(type(encoding)) == columntransformer:
+        # We use inverse tranform from the encoding method base on columns position
+        init = 0
+        names = list(columns.keys())
+        rst = dict()
+
+        for enc in encoding.transformers_:
+            name_encoding = enc[0]
+            ct_encoding = enc[1]
+            col_encoding = enc[2]
+
+            if str(type(ct_encoding)) in supported_sklearn:
+                colname_output = [name_encoding + '_' + val for val in col_encoding]
+                if str(type(ct_encoding)) in dummies_sklearn:
+                    nb_col = len(ct_encoding.get_feature_names(col_encoding))
+                else:
+                    nb_col = len(colname_output)
+                block = [columns[col] for col in names[init:init + nb_col]]
+                x_inverse = ct_encoding.inverse_transform(pd.concat(block, axis=1))
+                index = block[0].index
+                for i, col in enumerate(colname_output):
+                    rst[col] = pd.Series(x_inverse[:, i], index=index, name=col)
+                init += nb_col
+
+            elif str(type(ct_encoding)) in supported_category_encoder:
+                colname_output = [name_encoding + '_' + val for val in col_encoding]
+                colname_input = ct_encoding.get_feature_names()
+                nb_col = len(colname_input)
+                block = {col_input: columns[col].rename(col_input)
+                         for col_input, col in zip(colname_input, names[init:init + nb_col])}
+                frame = inv_transform_ce_vectorized(block, ct_encoding)
+                for col, column in zip(colname_output, frame.values()):
+                    rst[col] = column.rename(col)
+                init += nb_col
+
+            # columns not encode
+            elif name_encoding == 'remainder':
+                if ct_encoding == 'passthrough':
+                    nb_col = len(col_encoding)
+                    for col in names[init:init + nb_col]:
+                        rst[col] = columns[col]
+
+            else:
+                raise Exception(f'{ct_encoding} is not supported yet.')
+
+    elif str(type(encoding)) == "<class 'list'>":
+        rst = inv_transform_ordinal_vectorized(columns, encoding)
+
+    else:
+        raise Exception(f"{encoding.__class__.__name__} not supported, no inverse done.")
+
+    return rst
+
+
 def inv_transform_ce_in_ct(x_in, init, name_encoding, col_encoding, ct_encoding):
     """
     Inverse transform when using category_encoder in ColumnsTransformer preprocessing.
@@ -207,60 +282,79 @@ def calc_inv_contrib_ct(x_contrib, encoding, agg_columns):
     """
 
     if str(type(encoding)) == columntransformer:
-        # We use inverse tranform from the encoding method base on columns position
-        init = 0
-        rst = pd.DataFrame()
+        groups = get_column_groups(encoding, x_contrib.columns, _build_column_groups_ct)
+        return aggregate_contributions(x_contrib, groups, agg_columns)
+    else:
+        return x_contrib
 
-        for enc in encoding.transformers_:
-            name_encoding = enc[0]
-            ct_encoding = enc[1]
-            col_encoding = enc[2]
 
-            if str(type(ct_encoding)) in supported_category_encoder+supported_sklearn:
-                # We create new columns names depending on the name of the transformers and the name of the column.
-                colname_output = [name_encoding + '_' + val for val in col_encoding]
+def _build_column_groups_ct(encoding, columns):
+    """
+    Build the column groups of a ColumnTransformer : the contributions columns are read
+    by position, transformer after transformer. The columns created by the same feature
+    of a dummies encoder are grouped.
 
-                # If the processing create multiple columns we find the number of original categories and aggregate
-                # the contribution.
-                if str(type(ct_encoding)) in dummies_sklearn or str(type(ct_encoding)) in dummies_category_encoder:
-                    for i_enc in range(len(colname_output)):
-                        if str(type(ct_encoding)) == sklearn_onehot:
-                            col_origin = ct_encoding.categories_[i_enc]
-                        elif str(type(ct_encoding)) == category_encoder_binary:
-                            try:
-                                col_origin = ct_encoding.base_n_encoder.mapping[i_enc].get('mapping').columns.tolist()
-                            except:
-                                col_origin = ct_encoding.mapping[i_enc].get('mapping').columns.tolist()
-                        else:
-                            col_origin = ct_encoding.mapping[i_enc].get('mapping').columns.tolist()
-                        nb_col = len(col_origin)
-                        if agg_columns == 'first':
-                            contrib_inverse = x_contrib.iloc[:, init]
-                        else:
-                            contrib_inverse = x_contrib.iloc[:, init:init + nb_col].sum(axis=1)
-                        frame = pd.DataFrame(contrib_inverse,
-                                             columns=[colname_output[i_enc]],
-                                             index=contrib_inverse.index)
-                        rst = pd.concat([rst, frame], axis=1)
-                        init += nb_col
-                else:
-                    nb_col = len(colname_output)
-                    frame = x_contrib.iloc[:, init:init + nb_col]
-                    frame.columns = colname_output
-                    rst = pd.concat([rst, frame], axis=1)
-                    init += nb_col
+    Parameters
+    ----------
+    encoding : ColumnTransformer
+        The ColumnTransformer used.
+    columns : list
+        Names of the contributions columns.
 
-            elif name_encoding == 'remainder':
-                if ct_encoding == 'passthrough':
-                    nb_col = len(col_encoding)
-                    frame = x_contrib.iloc[:, init:init + nb_col]
-                    rst = pd.concat([rst, frame], axis=1)
+    Returns
+    -------
+    tuple
+        names, positions, starts and encoded flags of the groups (see aggregate_contributions).
+    """
+    init = 0
+    names, positions, starts, encoded = [], [], [], []
+    for enc in encoding.transformers_:
+        name_encoding = enc[0]
+        ct_encoding = enc[1]
+        col_encoding = enc[2]
+
+        if str(type(ct_encoding)) in supported_category_encoder+supported_sklearn:
+            # We create new columns names depending on the name of the transformers and the name of the column.
+            colname_output = [name_encoding + '_' + val for val in col_encoding]
+
+            # If the processing create multiple columns we find the number of original categories and aggregate
+            # the contribution.
+            if str(type(ct_encoding)) in dummies_sklearn or str(type(ct_encoding)) in dummies_category_encoder:
+                for i_enc in range(len(colname_output)):
+                    if str(type(ct_encoding)) == sklearn_onehot:
+                        col_origin = ct_encoding.categories_[i_enc]
+                    elif str(type(ct_encoding)) == category_encoder_binary:
+                        try:
+                            col_origin = ct_encoding.base_n_encoder.mapping[i_enc].get('mapping').columns.tolist()
+                        except:
+                            col_origin = ct_encoding.mapping[i_enc].get('mapping').columns.tolist()
+                    else:
+                        col_origin = ct_encoding.mapping[i_enc].get('mapping').columns.tolist()
+                    nb_col = len(col_origin)
+                    starts.append(len(positions))
+                    names.append(colname_output[i_enc])
+                    positions.extend(range(init, init + nb_col))
+                    encoded.append(True)
                     init += nb_col
             else:
-                raise Exception(f"{encoding.__class__.__name__} not supported, no inverse done.")
-        return rst
-    else:
-        return x_contrib
+                for colname in colname_output:
+                    starts.append(len(positions))
+                    names.append(colname)
+                    positions.append(init)
+                    encoded.append(False)
+                    init += 1
+
+        elif name_encoding == 'remainder':
+            if ct_encoding == 'passthrough':
+                for position in range(init, min(init + len(col_encoding), len(columns))):
+                    starts.append(len(positions))
+                    names.append(columns[position])
+                    positions.append(position)
+                    encoded.append(False)
+        else:
+            raise Exception(f"{encoding.__class__.__name__} not supported, no inverse done.")
+    return (names, np.array(positions, dtype=np.intp), np.array(starts, dtype=np.intp),
+            np.array(encoded, dtype=bool))
 
 
 def transform_ct(x_in, model, encoding):
@@ -1,6 +1,13 @@
+import numbers
+
 import numpy as np
 import pandas as pd
+from sklearn.neighbors import BallTree
 from sklearn.preprocessing import normalize
+from sklearn.utils import check_random_state
+
+# Maximum number of elements of the temporary arrays built when computing pairwise distances
+_MAX_BLOCK_ELEMENTS = 2 ** 22
 
 
 def _df_to_array(instances):
@@ -47,7 +54,7 @@ def _compute_distance(x1, x2, mean_vector, epsilon=0.0000001):
     return diff
 
 
-def _compute_similarities(instance, dataset):
+def _compute_similarities(instance, dataset, mean_vector=None):
     """
     Compute pairwise distances between an instance and all other data points
 
@@ -57,24 +64,131 @@ def _compute_similarities(instance, dataset):
         Reference data point
     dataset : 2D array
         Entire dataset used to identify neighbors
+    mean_vector : array, optional
+        Each value of this vector is the std.dev for each feature in dataset.
+        Computed from dataset if not given.
 
     Returns
     -------
     similarity_distance : array
         V[j] == distance between actual instance and instance j
     """
-    mean_vector = np.array(dataset, dtype=np.float32).std(axis=0)
-    similarity_distance = np.zeros(dataset.shape[0])
+    if mean_vector is None:
+        mean_vector = _get_std_vector(dataset)
+    return _compute_pairwise_distances(np.asarray(instance).reshape(1, -1), dataset, mean_vector)[0]
+
+
+def _get_std_vector(dataset):
+    """
+    Compute the std.dev of each feature of dataset, used to normalize distances
+
+    Parameters
+    ----------
+    dataset : 2D array
+        Entire dataset used to identify neighbors
+
+    Returns
+    -------
+    mean_vector : array
+        Std.dev of each feature
+    """
+    return np.array(dataset, dtype=np.float32).std(axis=0)
+
+
+def _compute_pairwise_distances(instances, dataset, mean_vector, epsilon=0.0000001):
+    """
+    Compute distances (L1 on normalized data) between each instance and all data points.
+    Instances are processed by blocks to bound the size of the temporary arrays.
+
+    Parameters
+    ----------
+    instances : 2D array
+        Reference data points
+    dataset : 2D array
+        Entire dataset used to identify neighbors
+    mean_vector : array
+        Each value of this vector is the std.dev for each feature in dataset
+
+    Returns
+    -------
+    distances : 2D array
+        D[i, j] == distance between instance i and instance j of dataset
+    """
+    scale = mean_vector + epsilon
+    distances = np.empty((instances.shape[0], dataset.shape[0]))
+    block_size = max(1, _MAX_BLOCK_ELEMENTS // max(dataset.size, 1))
+    for start in range(0, instances.shape[0], block_size):
+        block = instances[start:start + block_size]
+        distances[start:start + block_size] = np.sum(
+            np.abs(block[:, np.newaxis, :] - dataset[np.newaxis, :, :]) / scale, axis=2)
+    return distances
 
-    for j in range(0, dataset.shape[0]):
-        # Calculate distance between point and instance j
-        dist = _compute_distance(instance, dataset[j], mean_vector)
-        similarity_distance[j] = dist
 
-    return similarity_distance
+def build_neighbors_tree(dataset, epsilon=0.0000001):
+    """
+    Build a tree index on the normalized dataset to speed up the search of neighbors.
+    The manhattan distance in this space is the L1 distance on normalized data
+    used by find_neighbors.
+
+    Parameters
+    ----------
+    dataset : 2D array
+        Entire dataset used to identify neighbors
+
+    Returns
+    -------
+    tree : sklearn.neighbors.BallTree
+        Tree index of the normalized dataset
+    """
+    scale = _get_std_vector(dataset) + epsilon
+    return BallTree(np.asarray(dataset) / scale, metric='manhattan')
+
+
+def _get_nearest_neighbors(instances, dataset, n_neighbors, tree=None, epsilon=0.0000001):
+    """
+    Find the closest data points of each instance (the instance itself included)
 
+    Parameters
+    ----------
+    instances : 2D array
+        Reference data points
+    dataset : 2D array
+        Entire dataset used to identify neighbors
+    n_neighbors : int
+        Number of data points kept for each instance
+    tree : sklearn.neighbors.BallTree, optional
+        Tree index built with build_neighbors_tree on dataset. Brute force search is used if None.
 
-def _get_radius(dataset, n_neighbors, sample_size=500, percentile=95):
+    Returns
+    -------
+    indices : 2D array
+        Positions in dataset of the closest data points, sorted by increasing distance
+    distances : 2D array
+        Corresponding distances
+    """
+    n_neighbors = min(n_neighbors, dataset.shape[0])
+    mean_vector = _get_std_vector(dataset)
+    if tree is not None:
+        distances, indices = tree.query(instances / (mean_vector + epsilon), k=n_neighbors)
+        return indices, distances
+
+    indices = np.empty((instances.shape[0], n_neighbors), dtype=np.intp)
+    distances = np.empty((instances.shape[0], n_neighbors))
+    block_size = max(1, _MAX_BLOCK_ELEMENTS // max(dataset.size, 1))
+    for start in range(0, instances.shape[0], block_size):
+        block_distances = _compute_pairwise_distances(instances[start:start + block_size], dataset, mean_vector)
+        if n_neighbors < dataset.shape[0]:
+            block_indices = np.argpartition(block_distances, n_neighbors - 1, axis=1)[:, :n_neighbors]
+        else:
+            block_indices = np.tile(np.arange(dataset.shape[0]), (block_distances.shape[0], 1))
+        block_distances = np.take_along_axis(block_distances, block_indices, axis=1)
+        order = np.argsort(block_distances, axis=1, kind='stable')
+        indices[start:start + block_size] = np.take_along_axis(block_indices, order, axis=1)
+        distances[start:start + block_size] = np.take_along_axis(block_distances, order, axis=1)
+    return indices, distances
+
+
+def _get_radius(dataset, n_neighbors, sample_size=500, percentile=95, random_state=None):
     """
     Calculate the maximum allowed distance between points to be considered as neighbors
 
@@ -88,33 +202,30 @@ def _get_radius(dataset, n_neighbors, sample_size=500, percentile=95):
         Number of data points to sample from dataset, by default 500
     percentile : int, optional
         Percentile used to calculate the distance threshold, by default 95
+    random_state : int or np.random.RandomState, optional
+        Seed used to sample points from dataset, by default None (numpy global random state)
 
     Returns
     -------
     radius : float
         Distance threshold
     """
+    random_state = check_random_state(random_state)
     # Select 500 points max to sample
     size = min([dataset.shape[0], sample_size])
     # Randomly sample points from dataset
-    sampled_instances = dataset[np.random.randint(0, dataset.shape[0], size), :]
+    sampled_instances = dataset[random_state.randint(0, dataset.shape[0], size), :]
     # Define normalization vector
-    mean_vector = np.array(dataset, dtype=np.float32).std(axis=0)
-    # Initialize the similarity matrix
-    similarity_distance = np.zeros((size, size))
+    mean_vector = _get_std_vector(dataset)
     # Calculate pairwise distance between instances
-    for i in range(size):
-        for j in range(i, size):
-            dist = _compute_distance(sampled_instances[i], sampled_instances[j], mean_vector)
-            similarity_distance[i, j] = dist
-            similarity_distance[j, i] = dist
+    similarity_distance = _compute_pairwise_distances(sampled_instances, sampled_instances, mean_vector)
     # Select top n_neighbors
     ordered_X = np.sort(similarity_distance)[:, 1: n_neighbors + 1]
     # Select the value of the distance that captures XX% of all distances (percentile)
     return np.percentile(ordered_X.flatten(), percentile)
 
 
-def find_neighbors(selection, dataset, model, mode, n_neighbors=10):
+def find_neighbors(selection, dataset, model, mode, n_neighbors=10, tree=None, radius=None, return_positions=False):
     """
     For each instance, select neighbors based on 3 criteria:
 
@@ -134,59 +245,70 @@ def find_neighbors(selection, dataset, model, mode, n_neighbors=10):
         "classification" or "regression"
     n_neighbors : int, optional
         Top N neighbors initially allowed, by default 10
+    tree : sklearn.neighbors.BallTree, optional
+        Tree index built with build_neighbors_tree on dataset, by default None (brute force search)
+    radius : float, optional
+        Distance threshold of filter 3, computed with _get_radius if None
+    return_positions : bool, optional
+        Whether or not to also return the positions of the neighbors in dataset, by default False
 
     Returns
     -------
     all_neighbors : list of 2D arrays
         Wrap all instances with corresponding neighbors in a list with length (#instances).
         Each array has shape (#neighbors, #features) where #neighbors includes the instance itself.
+    all_positions : list of 1D arrays
+        Positions in dataset of the rows of each array of all_neighbors (only if return_positions is True).
     """
     instances = dataset.loc[selection].values
+    dataset_values = dataset.values
 
-    all_neighbors = np.empty((0, instances.shape[1] + 1), float)
     """Filter 1 : Pick top N closest neighbors"""
-    for instance in instances:
-        c = _compute_similarities(instance, dataset.values)
-        # Pick indices of the closest neighbors (and include instance itself)
-        neighbors_indices = np.argsort(c)[: n_neighbors + 1]
-        # Return instance with its neighbors
-        neighbors = dataset.values[neighbors_indices]
-        # Add distance column
-        neighbors = np.append(neighbors, c[neighbors_indices].reshape(n_neighbors + 1, 1), axis=1)
-        all_neighbors = np.append(all_neighbors, neighbors, axis=0)
+    # Pick indices of the closest neighbors (and include instance itself)
+    neighbors_indices, neighbors_distances = _get_nearest_neighbors(
+        instances, dataset_values, n_neighbors + 1, tree=tree)
+    # Return instances with their neighbors, distance column and prediction column
+    all_neighbors = np.empty((neighbors_indices.size, dataset_values.shape[1] + 2))
+    all_neighbors[:, :-2] = dataset_values[neighbors_indices.ravel()]
+    all_neighbors[:, -2] = neighbors_distances.ravel()
 
     # Calculate predictions for all instances and corresponding neighbors
+    # For XGB it is necessary to add columns in df, otherwise columns mismatch
+    neighbors_values = pd.DataFrame(all_neighbors[:, :-2], columns=dataset.columns)
     if mode == "regression":
-        # For XGB it is necessary to add columns in df, otherwise columns mismatch
-        predictions = model.predict(pd.DataFrame(all_neighbors[:, :-1], columns=dataset.columns))
+        all_neighbors[:, -1] = model.predict(neighbors_values)
     elif mode == "classification":
-        predictions = model.predict_proba(pd.DataFrame(all_neighbors[:, :-1], columns=dataset.columns))[:, 1]
+        all_neighbors[:, -1] = model.predict_proba(neighbors_values)[:, 1]
 
-    # Add prediction column
-    all_neighbors = np.append(all_neighbors, predictions.reshape(all_neighbors.shape[0], 1), axis=1)
     # Split back into original chunks (1 chunck = instance + neighbors)
     all_neighbors = np.split(all_neighbors, instances.shape[0])
+    all_positions = list(neighbors_indices)
 
-    """Filter 2 : neighbors with similar blackbox output"""
-    # Remove points if prediction is far away from instance prediction
-    if mode == "regression":
-        # Trick : use enumerate to allow the modifcation directly on the iterator
-        for i, neighbors in enumerate(all_neighbors):
-            all_neighbors[i] = neighbors[abs(neighbors[:, -1] - neighbors[0, -1]) < 0.1 * abs(neighbors[0, -1])]
-    elif mode == "classification":
-        for i, neighbors in enumerate(all_neighbors):
-            all_neighbors[i] = neighbors[abs(neighbors[:, -1] - neighbors[0, -1]) < 0.1]
-
-    """Filter 3 : neighbors below a distance threshold"""
-    # Remove points if distance is bigger than radius
-    radius = _get_radius(dataset.values, n_neighbors)
+    if radius is None:
+        radius = _get_radius(dataset_values, n_neighbors)
 
     for i, neighbors in enumerate(all_neighbors):
+        """Filter 2 : neighbors with similar blackbox output"""
+        # Remove points if prediction is far away from instance prediction
+        if mode == "regression":
+            keep = abs(neighbors[:, -1] - neighbors[0, -1]) < 0.1 * abs(neighbors[0, -1])
+        elif mode == "classification":
+            keep = abs(neighbors[:, -1] - neighbors[0, -1]) < 0.1
+
+        """Filter 3 : neighbors below a distance threshold"""
+        # Remove points if distance is bigger than radius
         # -2 indicates the distance column
-        all_neighbors[i] = neighbors[neighbors[:, -2] < radius]
+        keep &= neighbors[:, -2] < radius
+
+        all_neighbors[i] = neighbors[keep]
+        all_positions[i] = all_positions[i][keep]
+
+    if return_positions:
+        return all_neighbors, all_positions
     return all_neighbors
 
-def shap_neighbors(instance, x_encoded, contributions, mode):
+
+def shap_neighbors(instance, x_encoded, contributions, mode, positions=None):
     """
     For an instance and corresponding neighbors, calculate various
     metrics (described below) that are useful to evaluate local stability
@@ -199,6 +321,9 @@ def shap_neighbors(instance, x_encoded, contributions, mode):
         Entire dataset used to identify neighbors
     contributions : DataFrame
         Calculated contribution values for the dataset
+    positions : 1D array, optional
+        Positions in x_encoded of the rows of instance, as returned by find_neighbors.
+        If None, rows are found by matching the features values with x_encoded.
 
     Returns
     -------
@@ -209,14 +334,18 @@ def shap_neighbors(instance, x_encoded, contributions, mode):
     norm_abs_shap_values[0, :] : array
         Normalized absolute SHAP value of the instance
     """
-    # Extract SHAP values for instance and neighbors
-    # :-2 indicates that two columns are disregarded : distance to instance and model output
-    ind = pd.merge(x_encoded.reset_index(), pd.DataFrame(instance[:, :-2], columns=x_encoded.columns), how='inner')\
-        .set_index(x_encoded.index.name if x_encoded.index.name is not None else 'index').index
     # If classification, select contrbutions of one class only
     if mode == "classification" and len(contributions) == 2:
         contributions = contributions[1]
-    shap_values = contributions.loc[ind]
+    # Extract SHAP values for instance and neighbors
+    if positions is not None:
+        shap_values = contributions.values[positions]
+    else:
+        # :-2 indicates that two columns are disregarded : distance to instance and model output
+        ind = pd.merge(x_encoded.reset_index(), pd.DataFrame(instance[:, :-2], columns=x_encoded.columns),
+                       how='inner').set_index(x_encoded.index.name if x_encoded.index.name is not None
+                                              else 'index').index
+        shap_values = contributions.loc[ind]
     # For neighbors comparison, the sign of SHAP values is taken into account
     norm_shap_values = normalize(shap_values, axis=1, norm="l1")
     # But not for the average impact of the features across the dataset
@@ -229,7 +358,58 @@ def shap_neighbors(instance, x_encoded, contributions, mode):
 
     return norm_shap_values, average_diff, norm_abs_shap_values[0, :]
 
-def get_min_nb_features(selection, contributions, mode, distance):
+
+def batch_shap_neighbors(all_positions, contributions, mode):
+    """
+    Compute the variability and amplitude metrics of shap_neighbors for several instances at once,
+    using the positions of their neighbors returned by find_neighbors.
+
+    Parameters
+    ----------
+    all_positions : list of 1D arrays
+        For each instance, positions in the dataset of the instance and its neighbors (instance first)
+    contributions : DataFrame
+        Calculated contribution values for the dataset
+    mode : str
+        "classification" or "regression"
+
+    Returns
+    -------
+    variability : 2D array
+        Variability (stddev / mean) of normalized SHAP values across neighbors, one row per instance
+    amplitude : 2D array
+        Normalized absolute SHAP values of the instances, one row per instance
+    """
+    if mode == "classification" and len(contributions) == 2:
+        contributions = contributions[1]
+    n_features = contributions.shape[1]
+    counts = np.array([len(positions) for positions in all_positions])
+    variability = np.zeros((len(all_positions), n_features))
+    amplitude = np.zeros((len(all_positions), n_features))
+    non_empty = counts > 0
+    if not non_empty.any():
+        return variability, amplitude
+
+    # Segment i of the stacked arrays contains instance i and its neighbors
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[non_empty]
+    counts = counts[non_empty][:, np.newaxis]
+    norm_shap_values = normalize(contributions.values[np.concatenate(all_positions)], axis=1, norm="l1")
+    norm_abs_shap_values = np.abs(norm_shap_values)
+
+    mean_shap_values = np.add.reduceat(norm_shap_values, starts, axis=0) / counts
+    deviations = norm_shap_values - np.repeat(mean_shap_values, counts[:, 0], axis=0)
+    std_shap_values = np.sqrt(np.add.reduceat(deviations ** 2, starts, axis=0) / counts)
+    mean_abs_shap_values = np.add.reduceat(norm_abs_shap_values, starts, axis=0) / counts
+
+    # Replace NaN with 0
+    variability[non_empty] = np.divide(std_shap_values, mean_abs_shap_values,
+                                       out=np.zeros(std_shap_values.shape),
+                                       where=mean_abs_shap_values != 0)
+    amplitude[non_empty] = norm_abs_shap_values[starts]
+    return variability, amplitude
+
+
+def get_min_nb_features(selection, contributions, mode, distance, chunk_size=None):
     """
     Determine the minimum number of features needed for the prediction \
     of the interpretability method to be *close enough* \
@@ -259,6 +439,8 @@ def get_min_nb_features(selection, contributions, mode, distance):
         "classification" or "regression"
     distance : float, optional
         How close we want to be from model with all features, by default 0.1 (10%)
+    chunk_size : int, optional
+        Number of instances processed at once to bound the memory used, by default None (all instances)
 
     Returns
     -------
@@ -270,29 +452,27 @@ def get_min_nb_features(selection, contributions, mode, distance):
     if mode == "classification" and len(contributions) == 2:
         contributions = contributions[1]
     contributions = contributions.loc[selection].values
-    features_needed = []
-    # For each instance, add features one by one (ordered by SHAP) until we get close enough
-    for i in range(contributions.shape[0]):
-        ids = np.flip(np.argsort(np.abs(contributions[i, :])))
-        output_value = np.sum(contributions[i, :])
-
-        score = 0
-        for j, idx in enumerate(ids):
-            # j : number of features needed
-            # idx : positions of the j top shap values
-            score += contributions[i, idx]
-            # CLOSE_ENOUGH
-            if mode == "regression":
-                if abs(score - output_value) < distance * abs(output_value):
-                    break
-            elif mode == "classification":
-                if abs(score - output_value) < distance:
-                    break
-        features_needed.append(j + 1)
-    return features_needed
-
-
-def get_distance(selection, contributions, mode, nb_features):
+    features_needed = np.empty(contributions.shape[0], dtype=int)
+    for start, stop in _get_chunks(contributions.shape[0], chunk_size):
+        block = contributions[start:stop]
+        # Features ordered by decreasing absolute contribution
+        ids = np.flip(np.argsort(np.abs(block), axis=1), axis=1)
+        output_value = np.sum(block, axis=1)
+        # score[:, j] : output obtained with the j + 1 top features
+        score = np.cumsum(np.take_along_axis(block, ids, axis=1), axis=1)
+        # CLOSE_ENOUGH
+        if mode == "regression":
+            close_enough = np.abs(score - output_value[:, None]) < distance * np.abs(output_value)[:, None]
+        elif mode == "classification":
+            close_enough = np.abs(score - output_value[:, None]) < distance
+        # First number of features close enough, all the features if never close enough
+        features_needed[start:stop] = np.where(
+            close_enough.any(axis=1), close_enough.argmax(axis=1) + 1, block.shape[1]
+        )
+    return features_needed.tolist()
+
+
+def get_distance(selection, contributions, mode, nb_features, chunk_size=None):
     """
     Determine how close we get to the output with all features by using only a subset of them
 
@@ -306,6 +486,8 @@ def get_distance(selection, contributions, mode, nb_features):
         "classification" or "regression"
     nb_features : int, optional
         Number of features used, by default 5
+    chunk_size : int, optional
+        Number of instances processed at once to bound the memory used, by default None (all instances)
 
     Returns
     -------
@@ -325,12 +507,39 @@ def get_distance(selection, contributions, mode, nb_features):
     assert nb_features <= contributions.shape[1]
 
     contributions = contributions.loc[selection].values
-    top_features = np.array([sorted(row, key=abs, reverse=True) for row in contributions])[:, :nb_features]
-    output_top_features = np.sum(top_features[:, :], axis=1)
-    output_all_features = np.sum(contributions[:, :], axis=1)
+    output_top_features = np.empty(contributions.shape[0])
+    for start, stop in _get_chunks(contributions.shape[0], chunk_size):
+        block = contributions[start:stop]
+        # Stable sort keeps the original order of features with the same absolute contribution
+        ids = np.argsort(-np.abs(block), axis=1, kind="stable")[:, :nb_features]
+        output_top_features[start:stop] = np.sum(np.take_along_axis(block, ids, axis=1), axis=1)
+    output_all_features = np.sum(contributions, axis=1)
 
     if mode == "regression":
         distance = abs(output_top_features - output_all_features) / abs(output_all_features)
     elif mode == "classification":
         distance = abs(output_top_features - output_all_features)
     return distance
+
+
+def _get_chunks(n_rows, chunk_size=None):
+    """
+    Bounds of the blocks of rows processed at once.
+
+    Parameters
+    ----------
+    n_rows : int
+        Number of rows
+    chunk_size : int, optional
+        Number of rows of each block, by default None (a single block)
+
+    Returns
+    -------
+    list
+        List of (start, stop) tuples
+    """
+    if chunk_size is None:
+        chunk_size = max(n_rows, 1)
+    if not isinstance(chunk_size, numbers.Integral) or chunk_size <= 0:
+        raise ValueError("chunk_size must be a positive integer")
+    return [(start, min(start + chunk_size, n_rows)) for start in range(0, n_rows, chunk_size)]
@@ -4,6 +4,7 @@ Transform Module
 from shapash.utils.columntransformer_backend import (
     columntransformer,
     inv_transform_ct,
+    inv_transform_ct_vectorized,
     supported_sklearn,
     transform_ct,
     get_col_mapping_ct
@@ -11,18 +12,28 @@ from shapash.utils.columntransformer_backend import (
 from shapash.utils.category_encoder_backend import (
     transform_ce,
     inv_transform_ce,
+    inv_transform_ce_vectorized,
     supported_category_encoder,
-    get_col_mapping_ce
+    category_encoder_ordinal,
+    get_col_mapping_ce,
+    clear_column_groups_cache,
+    _fitted_attribute
 )
 import re
+import threading
+import weakref
 import numpy as np
 import pandas as pd
 
+# Mappings computed by get_preprocessing_mapping for each preprocessing object, by encoded columns
+_preprocessing_mapping_cache = weakref.WeakKeyDictionary()
+_preprocessing_mapping_lock = threading.Lock()
+
 # TODO
 # encode targeted variable ? from sklearn.preprocessing import LabelEncoder
 # make an easy version for dict, not writing all mapping
 
-def inverse_transform(x_init, preprocessing=None):
+def inverse_transform(x_init, preprocessing=None, vectorized=False):
     """
     Reverse transformation giving a preprocessing.
 
@@ -46,6 +57,10 @@ def inverse_transform(x_init, preprocessing=None):
         Prediction set.
     preprocessing : category_encoders, ColumnTransformer, list, dict, optional (default: None)
         The processing apply to the original data
+    vectorized : bool, optional (default: False)
+        If True, the encoders are reversed on the columns of x_init without copying it first :
+        argmax over the one-hot blocks, integer decoding of the BaseN and Binary columns and
+        array lookup for the ordinal and target mappings. The result is the same.
 
     Returns
     -------
@@ -62,6 +77,15 @@ def inverse_transform(x_init, preprocessing=None):
         # Check encoding are supported
         use_ct, use_ce = check_transformers(list_encoding)
 
+        if vectorized:
+            columns = {col: x_init[col] for col in x_init.columns}
+            for encoding in list_encoding:
+                if use_ct:
+                    columns = inv_transform_ct_vectorized(columns, encoding)
+                else:
+                    columns = inv_transform_ce_vectorized(columns, encoding)
+            return pd.DataFrame({col: column.array for col, column in columns.items()}, index=x_init.index)
+
         # Apply Inverse Transform
         x_inverse = x_init.copy()
 
@@ -120,6 +144,133 @@ def apply_preprocessing(x_init, model, preprocessing=None):
                 x_init = transform_ce(x_init, encoding)
         return x_init
 
+def compile_preprocessing(preprocessing=None):
+    """
+    Compile a preprocessing into an ordered list of steps, applied by apply_compiled_preprocessing.
+
+    The preprocessing is converted into a list and checked once. Dict mappings and
+    category_encoders OrdinalEncoder (with the default handle_unknown and handle_missing)
+    are compiled into lookup tables applied column by column.
+    Other encoders are kept as they are and applied with transform_ce or transform_ct.
+
+    Each step is a tuple whose first element is the kind of step :
+        - ("mapping", [(col, lookup, dtype), ...]) : list of dict
+        - ("ordinal", encoder, [(col, lookup), ...]) : category_encoders OrdinalEncoder
+        - ("ce", encoding) : other category_encoders and list of dict not compiled
+        - ("ct", encoding) : ColumnTransformer and list of dict used with a ColumnTransformer
+
+    Parameters
+    ----------
+    preprocessing : category_encoders, ColumnTransformer, list, dict, optional (default: None)
+        The processing to apply to the original data
+
+    Returns
+    -------
+    list or None
+        The list of steps, None if there is no preprocessing.
+    """
+    if preprocessing is None:
+        return None
+
+    list_encoding = preprocessing_tolist(preprocessing)
+    use_ct, use_ce = check_transformers(list_encoding)
+
+    plan = []
+    for encoding in list_encoding:
+        if isinstance(encoding, list) and all(isinstance(switch.get('mapping'), pd.Series) for switch in encoding):
+            plan.append(("mapping", [(switch.get('col'),
+                                      pd.Series(data=switch.get('mapping').values,
+                                                index=switch.get('mapping').index),
+                                      switch.get('mapping').values.dtype)
+                                     for switch in encoding]))
+        elif use_ct:
+            plan.append(("ct", encoding))
+        elif str(type(encoding)) == category_encoder_ordinal \
+                and encoding.handle_unknown == 'value' \
+                and encoding.handle_missing == 'value' \
+                and not encoding.drop_invariant \
+                and encoding.return_df:
+            plan.append(("ordinal", encoding, [(switch.get('col'), switch.get('mapping'))
+                                               for switch in encoding.mapping]))
+        else:
+            plan.append(("ce", encoding))
+    return plan
+
+def apply_compiled_preprocessing(x_init, model, plan=None):
+    """
+    Apply a preprocessing compiled by compile_preprocessing on a raw dataset.
+    The result is the same as apply_preprocessing with the initial preprocessing.
+
+    Parameters
+    ----------
+    x_init : pandas.DataFrame
+        Raw dataset to apply preprocessing.
+    model: model object
+        model used to check the different values of target estimate predict_proba
+    plan : list, optional (default: None)
+        The list of steps returned by compile_preprocessing
+
+    Returns
+    -------
+    pandas.Dataframe
+        return the dataframe with preprocessing.
+    """
+    if plan is None:
+        return x_init
+
+    for step in plan:
+        if step[0] == "mapping":
+            # Same as transform_ordinal : the columns of x_init are replaced
+            for col_name, lookup, dtype in step[1]:
+                if col_name not in x_init.columns:
+                    raise Exception(f'Columns {col_name} not in dataframe.')
+                x_init[col_name] = x_init[col_name].map(lookup).astype(dtype)
+
+        elif step[0] == "ordinal":
+            x_init = _apply_ordinal_lookup(x_init, step[1], step[2])
+
+        elif step[0] == "ct":
+            x_init = transform_ct(x_init, model, step[1])
+
+        else:
+            x_init = transform_ce(x_init, step[1])
+    return x_init
+
+def _apply_ordinal_lookup(x_init, encoder, lookups):
+    """
+    Apply the mapping of a fitted category_encoders OrdinalEncoder,
+    as OrdinalEncoder.transform with handle_unknown='value' and handle_missing='value'.
+
+    Parameters
+    ----------
+    x_init : pandas.DataFrame
+        Raw dataset to apply preprocessing.
+    encoder : category_encoders.OrdinalEncoder
+        Fitted encoder, used for the categorical columns.
+    lookups : list
+        List of tuples (column name, mapping).
+
+    Returns
+    -------
+    pandas.Dataframe
+        The dataset encoded.
+    """
+    if not isinstance(x_init, pd.DataFrame) \
+            or any(isinstance(x_init[col_name].dtype, pd.CategoricalDtype) for col_name, _ in lookups):
+        return encoder.transform(x_init)
+    if x_init.shape[1] != encoder._dim:
+        raise ValueError('Unexpected input dimension %d, expected %d' % (x_init.shape[1], encoder._dim,))
+
+    x_encoded = x_init.copy()
+    for col_name, lookup in lookups:
+        column = x_encoded[col_name].map(lookup)
+        try:
+            column = column.astype(int)
+        except ValueError:
+            column = column.astype(float)
+        x_encoded[col_name] = column.fillna(-1)
+    return x_encoded
+
 def preprocessing_tolist(preprocess):
     """
     Transform preprocess into a list, if preprocess contains a dict, transform the dict into a list of dict.
@@ -304,6 +455,70 @@ def get_preprocessing_mapping(x_encoded, preprocessing=None):
     """
     Get the columns mapping from preprocessing.
 
+    The mapping only depends on the preprocessing object and on the columns of x_encoded :
+    it is computed once and then stored in a cache, weakly keyed on the preprocessing object
+    (the mappings are removed with the object). It is computed again if the preprocessing is
+    fitted again ; if it is modified in place in another way, clear_preprocessing_mapping_cache
+    must be called. The mappings of a list or a dict of preprocessing are not cached.
+
+    Parameters
+    ----------
+    x_encoded : pd.DataFrame
+        Pandas dataframe after encoder transformations
+    preprocessing : category_encoders or ColumnTransformer or list or dict or list of dict
+        The processing apply to the original data
+
+    Returns
+    -------
+    dict
+        the mapping between columns names before and after preprocessing.
+    """
+    if preprocessing is None:
+        return {}
+
+    columns = tuple(x_encoded.columns) if x_encoded is not None else None
+    fitted = _fitted_attribute(preprocessing)
+    try:
+        with _preprocessing_mapping_lock:
+            cached = _preprocessing_mapping_cache.get(preprocessing, dict()).get(columns)
+    except TypeError:
+        return _compute_preprocessing_mapping(x_encoded, preprocessing)
+    if cached is None or cached[0] is not fitted:
+        cached = (fitted, _compute_preprocessing_mapping(x_encoded, preprocessing))
+        with _preprocessing_mapping_lock:
+            _preprocessing_mapping_cache.setdefault(preprocessing, dict())[columns] = cached
+    return {col: list(cols) for col, cols in cached[1].items()}
+
+
+def clear_preprocessing_mapping_cache(preprocessing=None):
+    """
+    Remove the mappings stored by get_preprocessing_mapping, and the column groups
+    stored by get_column_groups to aggregate the contributions.
+
+    Parameters
+    ----------
+    preprocessing : category_encoders or ColumnTransformer or list or dict or list of dict, optional
+        Only the mappings of this preprocessing are removed. If None, the whole cache is cleared.
+    """
+    with _preprocessing_mapping_lock:
+        if preprocessing is None:
+            _preprocessing_mapping_cache.clear()
+        else:
+            try:
+                _preprocessing_mapping_cache.pop(preprocessing, None)
+            except TypeError:
+                pass
+    if isinstance(preprocessing, list):
+        for encoding in preprocessing:
+            clear_column_groups_cache(encoding)
+    else:
+        clear_column_groups_cache(preprocessing)
+
+
+def _compute_preprocessing_mapping(x_encoded, preprocessing=None):
+    """
+    Compute the columns mapping from preprocessing, without cache.
+
     Parameters
     ----------
     x_encoded : pd.DataFrame
@@ -343,7 +558,7 @@ def get_preprocessing_mapping(x_encoded, preprocessing=None):
         elif isinstance(enc, list):
             for sub_enc in enc:
                 # Recursive call
-                dict_col_mapping.update(get_preprocessing_mapping(preprocessing=sub_enc, x_encoded=x_encoded))
+                dict_col_mapping.update(_compute_preprocessing_mapping(preprocessing=sub_enc, x_encoded=x_encoded))
 
     return dict_col_mapping
 
@@ -13,14 +13,19 @@ from dash import dcc
 from dash import html
 from dash.dependencies import Output, Input, State
 from flask import Flask
+from collections import OrderedDict
 import pandas as pd
 import plotly.graph_objs as go
 import random
 import numpy as np
 import re
+import threading
+import uuid
 from math import log10
-from shapash.webapp.utils.utils import apply_filter, check_row, round_to_k
+from shapash.webapp.utils.utils import apply_filter, apply_sort, check_row, get_index_page, get_page, round_to_k
 from shapash.webapp.utils.MyGraph import MyGraph
+from shapash.webapp.utils.figure_cache import FigureCache, hash_selection
+from shapash.webapp.utils.session_store import MemorySessionStore, SQLiteSessionStore
 from shapash.utils.utils import truncate_str
 
 
@@ -45,7 +50,7 @@ class SmartApp:
             SmartExplainer instance to point to.
     """
 
-    def __init__(self, explainer, settings: dict = None):
+    def __init__(self, explainer, settings: dict = None, session_store=None):
         """
         Init on class instantiation, everything to be able to run the app on server.
         Parameters
@@ -56,6 +61,10 @@ class SmartApp:
             A dict describing the default webapp settings values to be used
             Possible settings (dict keys) are 'rows', 'points', 'violin', 'features'
             Values should be positive ints
+        session_store : BaseSessionStore or str, optional
+            Store of the state of each browser session (selected label, selection, ...).
+            If a str, path of a SQLite file shared by all the worker processes (SQLiteSessionStore).
+            If None, the state is kept in the memory of the process (MemorySessionStore).
         """
         # APP
         self.server = Flask(__name__)
@@ -88,21 +97,42 @@ class SmartApp:
         self.predict_col = ['_predict_']
         self.explainer.features_imp = self.explainer.state.compute_features_import(self.explainer.contributions)
         if self.explainer._case == 'classification':
-            self.label = self.explainer.check_label_name(len(self.explainer._classes) - 1, 'num')[1]
-            self.selected_feature = self.explainer.features_imp[-1].idxmax()
-            self.max_threshold = int(max([x.applymap(lambda x: round_to_k(x, k=1)).max().max()
-                                          for x in self.explainer.contributions]))
+            label = self.explainer.check_label_name(len(self.explainer._classes) - 1, 'num')[1]
+            selected_feature = self.explainer.features_imp[-1].idxmax()
+            # round_to_k is monotonic : the maximum is computed before rounding
+            self.max_threshold = int(round_to_k(max([x.max().max() for x in self.explainer.contributions]), k=1))
         else:
-            self.label = None
-            self.selected_feature = self.explainer.features_imp.idxmax()
-            self.max_threshold = int(self.explainer.contributions.applymap(lambda x: round_to_k(x, k=1)).max().max())
-        self.list_index = []
-        self.subset = None
-        self.last_click_data = None
+            label = None
+            selected_feature = self.explainer.features_imp.idxmax()
+            self.max_threshold = int(round_to_k(self.explainer.contributions.max().max(), k=1))
+        self.page_size = 50
+        # Figures shared by all the sessions
+        self.figure_cache = FigureCache()
+
+        # SESSIONS
+        # The state of each browser session is kept in the session store, not on the instance
+        if session_store is None:
+            session_store = MemorySessionStore()
+        elif isinstance(session_store, str):
+            session_store = SQLiteSessionStore(session_store)
+        self.session_store = session_store
+        self.state_ini = {
+            'label': label,
+            'selected_feature': selected_feature,
+            'selection_query': None,
+            'subset_query': None,
+            'last_click_data': None,
+            'importance_curves': 0,
+            'rows': self.settings['rows'],
+        }
+        # The explainer is filtered before drawing a local plot
+        self.explainer_lock = threading.Lock()
 
         # DATA
         self.dataframe = pd.DataFrame()
         self.round_dataframe = pd.DataFrame()
+        self.datasets = OrderedDict()
+        self.datasets_lock = threading.Lock()
         self.init_data()
 
         # COMPONENTS
@@ -121,46 +151,224 @@ class SmartApp:
             'body': {}
         }
         self.make_skeleton()
-        self.app.layout = html.Div([self.skeleton['navbar'], self.skeleton['body']])
+        self.app.layout = self.serve_layout
 
         # CALLBACK
         self.callback_fullscreen_buttons()
         self.init_callback_settings()
         self.callback_generator()
 
-    def init_data(self):
+    def init_data(self, rows=None):
         """
         Method which initializes data from explainer object
+
+        Parameters
+        ----------
+        rows : int, optional
+            Number of rows of the datatable. If None, settings['rows'] is used and the
+            dataframe and round_dataframe attributes are updated.
+
+        Returns
+        -------
+        dict
+            dataframe, round_dataframe and the caches used to filter them
         """
         if hasattr(self.explainer, 'y_pred'):
-            self.dataframe = self.explainer.x_init.copy()
+            dataframe = self.explainer.x_init.copy()
             if isinstance(self.explainer.y_pred, (pd.Series, pd.DataFrame)):
                 self.predict_col = self.explainer.y_pred.columns.to_list()[0]
-                self.dataframe = self.dataframe.join(self.explainer.y_pred)
+                dataframe = dataframe.join(self.explainer.y_pred)
             elif isinstance(self.explainer.y_pred, list):
-                self.dataframe = self.dataframe.join(pd.DataFrame(data=self.explainer.y_pred,
-                                                                  columns=[self.predict_col],
-                                                                  index=self.explainer.x_init.index))
+                dataframe = dataframe.join(pd.DataFrame(data=self.explainer.y_pred,
+                                                        columns=[self.predict_col],
+                                                        index=self.explainer.x_init.index))
             else:
                 raise TypeError('y_pred must be of type pd.Series, pd.DataFrame or list')
         else:
             raise ValueError('y_pred must be set when calling compile function.')
 
-        self.dataframe['_index_'] = self.explainer.x_init.index
-        self.dataframe.rename(columns={f'{self.predict_col}': '_predict_'}, inplace=True)
-        col_order = ['_index_', '_predict_'] + self.dataframe.columns.drop(['_index_', '_predict_']).tolist()
-        self.list_index = random.sample(population=self.dataframe.index.tolist(),
-                                        k=min(self.settings['rows'], len(self.dataframe.index.tolist()))
-                                        )
-        self.dataframe = self.dataframe[col_order].loc[self.list_index].sort_index()
-        self.round_dataframe = self.dataframe.copy()
-        for col in list(self.dataframe.columns):
-            typ = self.dataframe[col].dtype
+        default = rows is None
+        rows = self.settings['rows'] if default else rows
+        dataframe['_index_'] = self.explainer.x_init.index
+        dataframe.rename(columns={f'{self.predict_col}': '_predict_'}, inplace=True)
+        col_order = ['_index_', '_predict_'] + dataframe.columns.drop(['_index_', '_predict_']).tolist()
+        # The sample only depends on rows : all the worker processes display the same rows
+        list_index = random.Random(0).sample(population=dataframe.index.tolist(),
+                                             k=min(rows, len(dataframe.index.tolist()))
+                                             )
+        dataframe = dataframe[col_order].loc[list_index].sort_index()
+        round_dataframe = dataframe.copy()
+        for col in list(dataframe.columns):
+            typ = dataframe[col].dtype
             if typ == float:
-                std = self.dataframe[col].std()
+                std = dataframe[col].std()
                 if std != 0:
                     digit = max(round(log10(1 / std) + 1) + 2, 0)
-                    self.round_dataframe[col] = self.dataframe[col].map(f'{{:.{digit}f}}'.format).astype(float)
+                    round_dataframe[col] = np.round(dataframe[col], digit)
+        dataset = {
+            'dataframe': dataframe,
+            'round_dataframe': round_dataframe,
+            'sorted_index': dict(),
+            'filtered': OrderedDict(),
+        }
+        with self.datasets_lock:
+            self.datasets[rows] = dataset
+            while len(self.datasets) > 4:
+                self.datasets.popitem(last=False)
+        if default:
+            self.dataframe = dataframe
+            self.round_dataframe = round_dataframe
+        return dataset
+
+    def get_dataset(self, rows):
+        """
+        Get the data of the datatable for a number of rows, computed on the first use.
+
+        Parameters
+        ----------
+        rows : int
+            Number of rows of the datatable.
+
+        Returns
+        -------
+        dict
+            dataframe, round_dataframe and the caches used to filter them
+        """
+        with self.datasets_lock:
+            dataset = self.datasets.get(rows)
+            if dataset is not None:
+                self.datasets.move_to_end(rows)
+                return dataset
+        return self.init_data(rows)
+
+    def get_filtered_dataframe(self, rows, filter_query, sort_by):
+        """
+        Filter and sort the rounded dataframe according to the datatable state.
+        The last results are cached so that changing page does not
+        filter and sort the data again.
+
+        Parameters
+        ----------
+        rows : int
+            Number of rows of the datatable.
+        filter_query : str
+            query of the datatable
+        sort_by : list
+            sorted columns of the datatable
+
+        Returns
+        -------
+        pandas.DataFrame
+            Filtered and sorted dataframe
+        """
+        dataset = self.get_dataset(rows)
+        query = (filter_query, tuple((col['column_id'], col['direction']) for col in sort_by or []))
+        with self.datasets_lock:
+            df = dataset['filtered'].get(query)
+        if df is None:
+            round_dataframe = dataset['round_dataframe']
+            df = apply_filter(round_dataframe, filter_query, dataset['sorted_index']) if filter_query \
+                else round_dataframe
+            df = apply_sort(df, sort_by)
+            with self.datasets_lock:
+                dataset['filtered'][query] = df
+                while len(dataset['filtered']) > 16:
+                    dataset['filtered'].popitem(last=False)
+        return df
+
+    def get_selection(self, selection_query):
+        """
+        Index of the rows of the datatable selected by a query. The sessions store the
+        query instead of the index : the index is computed again from the cache of
+        get_filtered_dataframe.
+
+        Parameters
+        ----------
+        selection_query : dict or None
+            rows, filter_query and sort_by of the datatable.
+
+        Returns
+        -------
+        list or None
+            Index of the selected rows, None if selection_query is None
+        """
+        if selection_query is None:
+            return None
+        return self.get_filtered_dataframe(
+            selection_query['rows'], selection_query['filter_query'], selection_query['sort_by']
+        )['_index_'].tolist()
+
+    def get_state(self, session_id, key):
+        """
+        Get a value of the state of a browser session.
+
+        Parameters
+        ----------
+        session_id : str
+            Identifier of the session (session_id store of the layout).
+        key : str
+            Key of state_ini.
+
+        Returns
+        -------
+        object
+        """
+        return self.session_store.get(session_id, key, self.state_ini[key])
+
+    def set_state(self, session_id, key, value):
+        """
+        Set a value of the state of a browser session.
+
+        Parameters
+        ----------
+        session_id : str
+            Identifier of the session (session_id store of the layout).
+        key : str
+            Key of state_ini.
+        value : object
+            New value.
+        """
+        self.session_store.set(session_id, key, value)
+
+    def serve_layout(self):
+        """
+        Layout of the app, served at each page load with a new session identifier.
+
+        Returns
+        -------
+        dash_html_components.Div
+        """
+        return html.Div([
+            dcc.Store(id='session_id', data=str(uuid.uuid4())),
+            self.skeleton['navbar'],
+            self.skeleton['body']
+        ])
+
+    def get_tooltip_data(self, page, dataframe=None):
+        """
+        Build the tooltips of the rows displayed in the datatable, with the values
+        of the dataframe (not rounded).
+
+        Parameters
+        ----------
+        page : pandas.DataFrame
+            rows of the rounded dataframe displayed in the datatable
+        dataframe : pandas.DataFrame, optional
+            dataframe (not rounded) of the datatable. If None, the dataframe attribute is used.
+
+        Returns
+        -------
+        list
+            tooltip_data of the datatable
+        """
+        if dataframe is None:
+            dataframe = self.dataframe
+        return [
+            {
+                column: {'value': str(value), 'type': 'text'}
+                for column, value in row.items()
+            } for row in dataframe.loc[page.index].to_dict('records')
+        ]
 
     def init_components(self):
         """
@@ -301,20 +509,16 @@ class SmartApp:
 
         self.components['table']['dataset'] = dash_table.DataTable(
             id='dataset',
-            data=self.round_dataframe.to_dict('records'),
-            tooltip_data=[
-                {
-                    column: {'value': str(value), 'type': 'text'}
-                    for column, value in row.items()
-                } for row in self.dataframe.to_dict('rows')
-            ], tooltip_duration=2000,
+            data=self.round_dataframe.iloc[:self.page_size].to_dict('records'),
+            tooltip_data=self.get_tooltip_data(self.round_dataframe.iloc[:self.page_size]),
+            tooltip_duration=2000,
 
             columns=[{"name": '_index_', "id": '_index_'}, {"name": '_predict_', "id": '_predict_'}] +
                     [{"name": i, "id": i} for i in self.explainer.x_init],
             editable=False, row_deletable=False,
             style_as_list_view=True,
-            virtualization=True,
-            page_action='none',
+            page_action='custom', page_current=0, page_size=self.page_size,
+            page_count=get_page(self.round_dataframe, 0, self.page_size)[2],
             fixed_rows={'headers': True, 'data': 0},
             fixed_columns={'headers': True, 'data': 0},
             filter_action='custom', filter_query='',
@@ -566,7 +770,7 @@ class SmartApp:
             ]
             self.components['menu']['classification_badge'].style = on_style
             self.components['menu']['regression_badge'].style = off_style
-            self.components['menu']['select_label'].value = self.label
+            self.components['menu']['select_label'].value = self.state_ini['label']
 
         elif self.explainer._case == 'regression':
             self.components['menu']['classification_badge'].style = off_style
@@ -639,16 +843,15 @@ class SmartApp:
         ]
         return filter
 
-    def select_point(self, graph, click_data):
+    def select_point(self, figure, click_data):
         """
-        Method which set the selected point in graph component corresponding to click_data
+        Method which set the selected point in figure corresponding to click_data
         """
         if click_data:
             curve_id = click_data['points'][0]['curveNumber']
             point_id = click_data['points'][0]['pointIndex']
-            for curve in range(len(self.components['graph'][graph].figure['data'])):
-                self.components['graph'][graph].figure['data'][curve].selectedpoints = \
-                    [point_id] if curve == curve_id else []
+            for curve in range(len(figure['data'])):
+                figure['data'][curve].selectedpoints = [point_id] if curve == curve_id else []
 
     def callback_fullscreen_buttons(self):
         """
@@ -772,65 +975,63 @@ class SmartApp:
                 Output('dataset', 'tooltip_data'),
                 Output('dataset', 'columns'),
                 Output('dataset', 'active_cell'),
+                Output('dataset', 'page_current'),
+                Output('dataset', 'page_count'),
             ],
             [
                 Input('dataset', 'sort_by'),
                 Input('dataset', "filter_query"),
-                Input('modal', 'is_open')
+                Input('dataset', 'page_current'),
+                Input('modal', 'is_open'),
+                Input('validation', 'n_clicks')
             ],
             [State('rows', 'value'),
-             State('name', 'value')]
+             State('name', 'value'),
+             State('index_id', 'value'),
+             State('session_id', 'data')]
         )
-        def update_datatable(sort_by, filter_query, is_open, rows, name):
+        def update_datatable(sort_by, filter_query, page_current, is_open, validation, rows, name, index,
+                             session_id):
             """
-            update datatable according to sorting, filtering and settings modifications
+            update datatable according to sorting, filtering, paging, settings modifications
+            and index selection (the page containing the selected index is displayed)
             """
             ctx = dash.callback_context
             active_cell = no_update
-            columns = self.components['table']['dataset'].columns
-            if ctx.triggered[0]['prop_id'] == 'modal.is_open':
+            columns = no_update
+            if ctx.triggered[0]['prop_id'] == 'validation.n_clicks':
+                rows = self.get_state(session_id, 'rows')
+                df = self.get_filtered_dataframe(rows, filter_query, sort_by)
+                index_page = get_index_page(df, index, self.page_size)
+                if index_page is None or index_page == page_current:
+                    raise PreventUpdate
+                page_current = index_page
+            elif ctx.triggered[0]['prop_id'] == 'modal.is_open':
                 if is_open:
                     raise PreventUpdate
                 else:
-
-                    self.settings['rows'] = rows
-                    self.init_data()
+                    self.set_state(session_id, 'rows', rows)
                     active_cell = {'row': 0, 'column': 0, 'column_id': '_index_'}
-                    self.settings_ini['rows'] = self.settings['rows']
-
+                    columns = [{"name": '_index_', "id": '_index_'}, {"name": '_predict_', "id": '_predict_'}]
                     if name == [1]:
-                        columns = [
-                            {"name": '_index_', "id": '_index_'},
-                            {"name": '_predict_', "id": '_predict_'}] + \
-                            [{"name": self.explainer.features_dict[i], "id": i} for i in self.explainer.x_init]
-
-            if not filter_query:
-                df = self.round_dataframe
+                        columns += [{"name": self.explainer.features_dict[i], "id": i} for i in self.explainer.x_init]
+                    else:
+                        columns += [{"name": i, "id": i} for i in self.explainer.x_init]
             else:
-                df = apply_filter(self.round_dataframe, filter_query)
-
-            if len(sort_by):
-                df = df.sort_values(
-                    [col['column_id'] for col in sort_by],
-                    ascending=[
-                        col['direction'] == 'asc'
-                        for col in sort_by
-                    ],
-                    inplace=False
-                )
-            self.components['table']['dataset'].data = df.to_dict('records')
-            self.components['table']['dataset'].tooltip_data = [
-                {
-                    column: {'value': str(value), 'type': 'text'}
-                    for column, value in row.items()
-                } for row in df.to_dict('rows')
-            ]
+                rows = self.get_state(session_id, 'rows')
+            if ctx.triggered[0]['prop_id'] not in ['dataset.page_current', 'validation.n_clicks']:
+                page_current = 0
+
+            df = self.get_filtered_dataframe(rows, filter_query, sort_by)
+            page, page_current, page_count = get_page(df, page_current, self.page_size)
 
             return (
-                self.components['table']['dataset'].data,
-                self.components['table']['dataset'].tooltip_data,
+                page.to_dict('records'),
+                self.get_tooltip_data(page, self.get_dataset(rows)['dataframe']),
                 columns,
                 active_cell,
+                page_current,
+                page_count,
             )
 
         @app.callback(
@@ -848,10 +1049,13 @@ class SmartApp:
             [
                 State('global_feature_importance', 'clickData'),
                 State('dataset', "filter_query"),
-                State('features', 'value')
+                State('dataset', 'sort_by'),
+                State('features', 'value'),
+                State('session_id', 'data')
             ]
         )
-        def update_feature_importance(label, data, is_open, n_clicks, bool_group, clickData, filter_query, features):
+        def update_feature_importance(label, data, is_open, n_clicks, bool_group, clickData, filter_query, sort_by,
+                                      features, session_id):
             """
             update feature importance plot according to selected label and dataset state.
             """
@@ -862,55 +1066,71 @@ class SmartApp:
             if ctx.triggered[0]['prop_id'] == 'modal.is_open':
                 if is_open:
                     raise PreventUpdate
-                else:
-                    self.settings['features'] = features
-                    self.settings_ini['features'] = self.settings['features']
             elif ctx.triggered[0]['prop_id'] == 'select_label.value':
-                self.label = label
+                self.set_state(session_id, 'label', label)
             elif ctx.triggered[0]['prop_id'] == 'dataset.data':
-                self.list_index = [d['_index_'] for d in data]
+                # The datatable only contains the current page : the selection is the filtered dataframe
+                selection_query = dict(
+                    rows=self.get_state(session_id, 'rows'), filter_query=filter_query, sort_by=sort_by
+                )
+                if selection_query == self.get_state(session_id, 'selection_query'):
+                    raise PreventUpdate
+                self.set_state(session_id, 'selection_query', selection_query)
             elif (ctx.triggered[0]['prop_id'] == 'card_global_feature_importance.n_clicks'
                   and self.explainer.features_groups):
                 # When we click twice on the same bar this will reset the graph
-                if self.last_click_data == clickData:
+                if self.get_state(session_id, 'last_click_data') == clickData:
                     selected_feature = None
                 list_sub_features = [f for group_features in self.explainer.features_groups.values()
                                      for f in group_features]
                 if selected_feature in list_sub_features:
-                    self.last_click_data = clickData
+                    self.set_state(session_id, 'last_click_data', clickData)
                     raise PreventUpdate
                 else:
                     pass
             elif ctx.triggered[0]['prop_id'] == 'bool_groups.on':
                 clickData = None  # We reset the graph and clicks if we toggle the button
             else:
-                self.last_click_data = clickData
+                self.set_state(session_id, 'last_click_data', clickData)
                 raise PreventUpdate
 
+            label = self.get_state(session_id, 'label')
             group_name = selected_feature if (self.explainer.features_groups is not None
                                               and selected_feature in self.explainer.features_groups.keys()) else None
-            selection = self.list_index if filter_query else None
-            self.components['graph']['global_feature_importance'].figure = \
-                self.explainer.plot.features_importance(
-                    max_features=features,
-                    selection=selection,
-                    label=self.label,
-                    group_name=group_name,
-                    display_groups=bool_group
-                )
-            self.components['graph']['global_feature_importance'].adjust_graph()
-            self.components['graph']['global_feature_importance'].figure.layout.clickmode = 'event+select'
-            if selected_feature and selected_feature not in self.explainer.features_groups.keys():
-                self.select_point('global_feature_importance', clickData)
-
-            # font size can be adapted to screen size
-            nb_car = max([len(self.components['graph']['global_feature_importance'].figure.data[0].y[i]) for i in
-                          range(len(self.components['graph']['global_feature_importance'].figure.data[0].y))])
-            self.components['graph']['global_feature_importance'].figure.update_layout(
-                yaxis=dict(tickfont={'size': min(round(500 / nb_car), 12)})
+            selection = self.get_selection(self.get_state(session_id, 'selection_query')) if filter_query else None
+            select_point = bool(selected_feature and selected_feature not in self.explainer.features_groups.keys())
+            key = (
+                'global_feature_importance', features, hash_selection(selection), label, group_name,
+                bool_group, (clickData['points'][0]['curveNumber'], clickData['points'][0]['pointIndex'])
+                if select_point else None
             )
-            self.last_click_data = clickData
-            return self.components['graph']['global_feature_importance'].figure, clickData
+            figure = self.figure_cache.get(key)
+            if figure is None:
+                graph = MyGraph(
+                    figure=self.explainer.plot.features_importance(
+                        max_features=features,
+                        selection=selection,
+                        label=label,
+                        group_name=group_name,
+                        display_groups=bool_group
+                    ),
+                    id='global_feature_importance'
+                )
+                graph.adjust_graph()
+                graph.figure.layout.clickmode = 'event+select'
+                if select_point:
+                    self.select_point(graph.figure, clickData)
+
+                # font size can be adapted to screen size
+                nb_car = max([len(graph.figure.data[0].y[i]) for i in range(len(graph.figure.data[0].y))])
+                graph.figure.update_layout(
+                    yaxis=dict(tickfont={'size': min(round(500 / nb_car), 12)})
+                )
+                figure = graph.figure
+                self.figure_cache.set(key, figure)
+            self.set_state(session_id, 'importance_curves', len(figure.data))
+            self.set_state(session_id, 'last_click_data', clickData)
+            return figure, clickData
 
         @app.callback(
             Output(component_id='feature_selector', component_property='figure'),
@@ -921,10 +1141,11 @@ class SmartApp:
             ],
             [
                 State('points', 'value'),
-                State('violin', 'value')
+                State('violin', 'value'),
+                State('session_id', 'data')
             ]
         )
-        def update_feature_selector(feature, label, is_open, points, violin):
+        def update_feature_selector(feature, label, is_open, points, violin, session_id):
             """
             Update feature plot according to label, data, selected feature and settings modifications
             """
@@ -932,39 +1153,46 @@ class SmartApp:
             if ctx.triggered[0]['prop_id'] == 'modal.is_open':
                 if is_open:
                     raise PreventUpdate
-                else:
-                    self.settings['points'] = points
-                    self.settings_ini['points'] = self.settings['points']
-                    self.settings['violin'] = violin
-                    self.settings_ini['violin'] = self.settings['violin']
-
             elif ctx.triggered[0]['prop_id'] == 'select_label.value':
-                self.label = label
+                self.set_state(session_id, 'label', label)
             elif ctx.triggered[0]['prop_id'] == 'global_feature_importance.clickData':
                 if feature is not None:
                     # Removing bold
-                    self.selected_feature = feature['points'][0]['label'].replace('<b>', '').replace('</b>', '')
+                    self.set_state(session_id, 'selected_feature',
+                                   feature['points'][0]['label'].replace('<b>', '').replace('</b>', ''))
                     if feature['points'][0]['curveNumber'] == 0 and \
-                            len(self.components['graph']['global_feature_importance'].figure['data']) == 2:
-                        self.subset = self.list_index
+                            self.get_state(session_id, 'importance_curves') == 2:
+                        self.set_state(session_id, 'subset_query', self.get_state(session_id, 'selection_query'))
                     else:
-                        self.subset = None
+                        self.set_state(session_id, 'subset_query', None)
             else:
                 raise PreventUpdate
 
-            self.components['graph']['feature_selector'].figure = self.explainer.plot.contribution_plot(
-                col=self.selected_feature,
-                selection=self.subset,
-                label=self.label,
-                violin_maxf=violin,
-                max_points=points
+            label = self.get_state(session_id, 'label')
+            selected_feature = self.get_state(session_id, 'selected_feature')
+            subset = self.get_selection(self.get_state(session_id, 'subset_query'))
+            key = ('feature_selector', selected_feature, hash_selection(subset), label, violin, points)
+            figure = self.figure_cache.get(key)
+            if figure is not None:
+                return figure
+
+            graph = MyGraph(
+                figure=self.explainer.plot.contribution_plot(
+                    col=selected_feature,
+                    selection=subset,
+                    label=label,
+                    violin_maxf=violin,
+                    max_points=points
+                ),
+                id='feature_selector'
             )
 
-            self.components['graph']['feature_selector'].figure['layout'].clickmode = 'event'
-            subset_graph = True if self.subset is not None else False
-            self.components['graph']['feature_selector'].adjust_graph(subset_graph=subset_graph, title_size_adjust=True)
+            graph.figure['layout'].clickmode = 'event'
+            subset_graph = True if subset is not None else False
+            graph.adjust_graph(subset_graph=subset_graph, title_size_adjust=True)
+            self.figure_cache.set(key, graph.figure)
 
-            return self.components['graph']['feature_selector'].figure
+            return graph.figure
 
         @app.callback(
             [
@@ -988,7 +1216,6 @@ class SmartApp:
             if ctx.triggered[0]['prop_id'] != 'dataset.data':
                 if ctx.triggered[0]['prop_id'] == 'feature_selector.clickData':
                     selected = click_data['points'][0]['customdata']
-                    self.click_graph = True
                 elif ctx.triggered[0]['prop_id'] == 'dataset.active_cell':
                     if cell is not None:
                         selected = data[cell['row']]['_index_']
@@ -1016,7 +1243,6 @@ class SmartApp:
             """
             update max_contrib label
             """
-            self.components['filter']['max_contrib']['max_contrib_id'].value = value
             return f'Features to display : {value}'
 
         @app.callback(
@@ -1025,9 +1251,10 @@ class SmartApp:
              Output('max_contrib_id', 'marks')
              ],
             [Input('modal', 'is_open')],
-            [State('features', 'value')]
+            [State('features', 'value'),
+             State('max_contrib_id', 'value')]
         )
-        def update_max_contrib_id(is_open, features):
+        def update_max_contrib_id(is_open, features, max_contrib):
             """
             update max contrib component layout after settings modifications
             """
@@ -1050,7 +1277,7 @@ class SmartApp:
                     marks = {f'{round(max * feat / nb_marks)}': f'{round(max * feat / nb_marks)}'
                              for feat in range(1, nb_marks + 1)}
                     marks['1'] = '1'
-                    if max < self.components['filter']['max_contrib']['max_contrib_id'].value:
+                    if max < max_contrib:
                         value = max
                     else:
                         value = no_update
@@ -1102,31 +1329,42 @@ class SmartApp:
             else:
                 sign = (False if negative == [1] else None)
 
-            self.explainer.filter(threshold=threshold,
-                                  features_to_hide=masked,
-                                  positive=sign,
-                                  max_contrib=max_contrib,
-                                  display_groups=bool_group)
             if np.issubdtype(type(self.explainer.x_init.index[0]), np.dtype(int).type):
                 selected = int(selected)
-            self.components['graph']['detail_feature'].figure = self.explainer.plot.local_plot(
-                index=selected,
-                label=label,
-                show_masked=True,
-                yaxis_max_label=8,
-                display_groups=bool_group
-            )
-            self.components['graph']['detail_feature'].adjust_graph(title_size_adjust=True)
+            key = ('detail_feature', selected, label, threshold, tuple(masked) if masked else None, sign,
+                   max_contrib, bool_group)
+            figure = self.figure_cache.get(key)
+            if figure is not None:
+                return figure
+
+            # filter modifies the explainer shared by all the sessions
+            with self.explainer_lock:
+                self.explainer.filter(threshold=threshold,
+                                      features_to_hide=masked,
+                                      positive=sign,
+                                      max_contrib=max_contrib,
+                                      display_groups=bool_group)
+                graph = MyGraph(
+                    figure=self.explainer.plot.local_plot(
+                        index=selected,
+                        label=label,
+                        show_masked=True,
+                        yaxis_max_label=8,
+                        display_groups=bool_group
+                    ),
+                    id='detail_feature'
+                )
+            graph.adjust_graph(title_size_adjust=True)
             # font size can be adapted to screen size
-            list_yaxis = [self.components['graph']['detail_feature'].figure.data[i].y[0] for i in
-                          range(len(self.components['graph']['detail_feature'].figure.data))]
+            list_yaxis = [graph.figure.data[i].y[0] for i in range(len(graph.figure.data))]
             # exclude new line with labels of y axis
             list_yaxis = [x.split('<br />')[0] for x in list_yaxis]
             nb_car = max([len(x) for x in list_yaxis])
-            self.components['graph']['detail_feature'].figure.update_layout(
+            graph.figure.update_layout(
                 yaxis=dict(tickfont={'size': min(round(500 / nb_car), 12)})
             )
-            return self.components['graph']['detail_feature'].figure
+            self.figure_cache.set(key, graph.figure)
+            return graph.figure
 
         @app.callback(
             Output("validation", "n_clicks"),
@@ -1152,18 +1390,23 @@ class SmartApp:
                 Output('dataset', 'style_cell_conditional'),
             ],
             [
-                Input("validation", "n_clicks")
+                Input("validation", "n_clicks"),
+                Input('dataset', 'data')
             ],
             [
-                State('dataset', 'data'),
                 State('index_id', 'value')
             ]
 
         )
         def datatable_layout(validation, data, index):
+            """
+            highlight the selected index when it is validated or when its page is displayed
+            """
             ctx = dash.callback_context
             if ctx.triggered[0]['prop_id'] == 'validation.n_clicks' and validation is not None:
                 pass
+            elif ctx.triggered[0]['prop_id'] == 'dataset.data' and validation is not None:
+                pass
             else:
                 raise PreventUpdate
 
@@ -1183,7 +1426,7 @@ class SmartApp:
                  'width': '70px', 'fontWeight': 'bold'} for c in ['_index_', '_predict_']
             ]
 
-            selected = check_row(data, index)
+            selected = check_row(data, index) if data and index is not None else None
             if selected is not None:
                 style_data_conditional += [{"if": {"row_index": selected}, "backgroundColor": self.color[0]}]
 
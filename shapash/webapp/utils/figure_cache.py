@@ -0,0 +1,110 @@
+"""
+LRU cache of the figures displayed by the webapp.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objs as go
+import plotly.io as pio
+
+
+class FigureCache:
+    """
+    LRU cache of plotly figures, bounded by the size of the serialized figures.
+
+    The figures are stored as JSON strings : the size of an entry is known and each
+    call to get returns a new figure that can be modified without altering the cache.
+    The cache is thread-safe, it can be shared by all the sessions of the webapp.
+
+    Parameters
+    ----------
+    max_bytes : int (default: 64 MB)
+        Maximum size of the cached figures. A figure larger than max_bytes is not cached.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 ** 2):
+        self.max_bytes = max_bytes
+        self.n_bytes = 0
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._figures)
+
+    def get(self, key):
+        """
+        Get the figure cached under key.
+
+        Parameters
+        ----------
+        key : tuple
+            Hashable key built from the inputs of the figure.
+
+        Returns
+        -------
+        plotly.graph_objs.Figure or None
+            A copy of the cached figure, None if the key is not cached.
+        """
+        with self._lock:
+            figure_json = self._figures.get(key)
+            if figure_json is None:
+                return None
+            self._figures.move_to_end(key)
+        return go.Figure(json.loads(figure_json))
+
+    def set(self, key, figure):
+        """
+        Cache a figure under key, the least recently used figures are removed
+        when the cache is full.
+
+        Parameters
+        ----------
+        key : tuple
+            Hashable key built from the inputs of the figure.
+        figure : plotly.graph_objs.Figure
+            Figure to cache.
+        """
+        figure_json = pio.to_json(figure)
+        size = len(figure_json)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._figures:
+                self.n_bytes -= len(self._figures.pop(key))
+            self._figures[key] = figure_json
+            self.n_bytes += size
+            while self.n_bytes > self.max_bytes:
+                _, removed = self._figures.popitem(last=False)
+                self.n_bytes -= len(removed)
+
+    def clear(self):
+        """
+        Remove all the cached figures.
+        """
+        with self._lock:
+            self._figures.clear()
+            self.n_bytes = 0
+
+
+def hash_selection(selection):
+    """
+    Hash a list of index, used in the keys of the figure cache.
+
+    Parameters
+    ----------
+    selection : list or None
+        List of index of the selected rows
+
+    Returns
+    -------
+    str or None
+        Hash of the selection, None if selection is None
+    """
+    if selection is None:
+        return None
+    hashed = pd.util.hash_pandas_object(pd.Series(selection, dtype=object), index=False).to_numpy()
+    return hashlib.sha1(np.ascontiguousarray(hashed).tobytes()).hexdigest()
@@ -0,0 +1,194 @@
+"""
+Stores of the state of each session of the webapp.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+
+class BaseSessionStore(ABC):
+    """
+    Base class of the session stores : the state of each browser session of the webapp
+    (selected label, selection of the datatable, last click...) is stored outside of the
+    SmartApp instance, so that several sessions and several worker processes can serve the app.
+
+    The values are read and written key by key : the callbacks of a session running
+    at the same time do not overwrite the keys modified by each other.
+    Reading or writing a value of a session keeps the session alive.
+    The values are stored as JSON by all the stores : lists are read back as lists,
+    tuples as lists.
+    """
+
+    @abstractmethod
+    def get(self, session_id, key, default=None):
+        """
+        Get a value of the state of a session.
+
+        Parameters
+        ----------
+        session_id : str
+            Identifier of the session.
+        key : str
+            Name of the value.
+        default : object, optional
+            Value returned if the key is not stored for this session.
+
+        Returns
+        -------
+        object
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, session_id, key, value):
+        """
+        Set a value of the state of a session.
+
+        Parameters
+        ----------
+        session_id : str
+            Identifier of the session.
+        key : str
+            Name of the value.
+        value : object
+            Value to store, it must be JSON serializable (values of the dash components).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self, session_id=None):
+        """
+        Remove the state of a session, or of all the sessions if session_id is None.
+
+        Parameters
+        ----------
+        session_id : str, optional
+            Identifier of the session.
+        """
+        raise NotImplementedError
+
+
+class MemorySessionStore(BaseSessionStore):
+    """
+    Session store kept in the memory of the process (default store).
+    It is shared by the threads of a process, not by several worker processes.
+
+    Parameters
+    ----------
+    max_sessions : int (default: 1000)
+        Maximum number of sessions stored, the least recently used sessions are removed.
+    """
+
+    def __init__(self, max_sessions=1000):
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id, key, default=None):
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None:
+                return default
+            self._sessions.move_to_end(session_id)
+            value = state.get(key)
+        return default if value is None else json.loads(value)
+
+    def set(self, session_id, key, value):
+        with self._lock:
+            self._sessions.setdefault(session_id, dict())[key] = json.dumps(value)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def clear(self, session_id=None):
+        with self._lock:
+            if session_id is None:
+                self._sessions.clear()
+            else:
+                self._sessions.pop(session_id, None)
+
+
+class SQLiteSessionStore(BaseSessionStore):
+    """
+    Session store backed by a SQLite file, shared by all the worker processes of a host.
+
+    Parameters
+    ----------
+    path : str
+        Path of the SQLite database, created if it does not exist.
+    max_age : float, optional (default: 86400)
+        Sessions not read nor modified for more than max_age seconds are removed.
+        If None, the sessions are kept until clear is called.
+    timeout : float (default: 30)
+        Time to wait for the lock of the database, in seconds.
+    """
+
+    def __init__(self, path, max_age=86400, timeout=30):
+        self.path = path
+        self.max_age = max_age
+        self.timeout = timeout
+        self._local = threading.local()
+        self._last_expiration = 0
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS session_state ("
+                "session_id TEXT, key TEXT, value TEXT, updated REAL, PRIMARY KEY (session_id, key))"
+            )
+
+    def _connection(self):
+        """
+        SQLite connection of the current thread. A new connection is opened in a forked
+        worker process, the connections of the parent process are not reused.
+        """
+        if getattr(self._local, 'pid', None) != os.getpid():
+            self._local.connection = sqlite3.connect(self.path, timeout=self.timeout)
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def get(self, session_id, key, default=None):
+        with self._connection() as connection:
+            row = connection.execute(
+                "SELECT value FROM session_state WHERE session_id = ? AND key = ?", (session_id, key)
+            ).fetchone()
+            if row is None:
+                return default
+            connection.execute(
+                "UPDATE session_state SET updated = ? WHERE session_id = ? AND key = ?",
+                (time.time(), session_id, key)
+            )
+        return json.loads(row[0])
+
+    def set(self, session_id, key, value):
+        now = time.time()
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO session_state VALUES (?, ?, ?, ?)",
+                (session_id, key, json.dumps(value), now)
+            )
+            if self.max_age is not None and now - self._last_expiration > min(self.max_age, 60):
+                self._last_expiration = now
+                connection.execute(
+                    "DELETE FROM session_state WHERE session_id IN "
+                    "(SELECT session_id FROM session_state GROUP BY session_id HAVING MAX(updated) < ?)",
+                    (now - self.max_age,)
+                )
+
+    def clear(self, session_id=None):
+        with self._connection() as connection:
+            if session_id is None:
+                connection.execute("DELETE FROM session_state")
+            else:
+                connection.execute("DELETE FROM session_state WHERE session_id = ?", (session_id,))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_local']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 import pandas as pd
 import numpy as np
 
@@ -92,33 +94,208 @@ def split_filter_part(filter_part):
     return [None] * 3
 
 
-def apply_filter(df, filter_query):
+@lru_cache(maxsize=128)
+def compile_filter_query(filter_query):
+    """
+    Parse a filter query from dash.datatable once : the result is cached per query string.
+
+    Parameters
+    ----------
+    filter_query : str
+        query from dcc.datatable
+
+    Returns
+    -------
+    tuple
+        tuple of (column, operator, value) of the supported filter parts
+
+    """
+    predicates = []
+    for filter_part in filter_query.split(' && '):
+        col_name, operator, filter_value = split_filter_part(filter_part)
+        if operator in ('eq', 'ne', 'lt', 'le', 'gt', 'ge', 'contains', 'datestartswith'):
+            predicates.append((col_name, operator, filter_value))
+    return tuple(predicates)
+
+
+def get_sorted_column(df, col_name, sorted_index):
+    """
+    Get the sort of a numeric column from sorted_index, computed on the first use.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        dataFrame to be filtered
+    col_name : str
+        numeric column
+    sorted_index : dict
+        cache of the sorted columns of df
+
+    Returns
+    -------
+    tuple
+        positions sorting the column, sorted values and number of values which are not missing
+
+    """
+    if col_name not in sorted_index:
+        values = df[col_name].to_numpy()
+        order = np.argsort(values, kind='stable')
+        sorted_values = values[order]
+        n_valid = sorted_values.shape[0] - int(np.isnan(sorted_values).sum()) \
+            if sorted_values.dtype.kind == 'f' else sorted_values.shape[0]
+        sorted_index[col_name] = (order, sorted_values, n_valid)
+    return sorted_index[col_name]
+
+
+def _range_bounds(df, col_name, operator, filter_value, sorted_index):
+    """
+    Bounds, in the sorted column, of the rows of df matching a range predicate,
+    found by binary search.
+    """
+    order, sorted_values, n_valid = get_sorted_column(df, col_name, sorted_index)
+    if operator in ('lt', 'le'):
+        start = 0
+        stop = np.searchsorted(sorted_values[:n_valid], filter_value, side='left' if operator == 'lt' else 'right')
+    else:
+        start = np.searchsorted(sorted_values[:n_valid], filter_value, side='right' if operator == 'gt' else 'left')
+        stop = n_valid
+    return order, start, stop
+
+
+def apply_filter(df, filter_query, sorted_index=None):
     """
     Apply a filter query from dash.datable to a pandas.DataFrame (source code : Dash documentation)
 
+    The query is parsed once (compile_filter_query). The predicates are evaluated on the positions
+    of the rows still selected, and the dataframe is sliced once at the end.
+    If sorted_index is given, the most selective range predicate (lt, le, gt, ge) on a numeric
+    column is resolved by binary search in the sorted column instead of a comparison of all the rows.
+
     Parameters
     ----------
     df : pandas.DataFrame
         dataFrame to be filtered
     filter_query : dcc.datatable.filter_query
         query from dcc.datatable to apply to the DataFrame
+    sorted_index : dict, optional
+        cache of the sorted numeric columns of df, filled when needed. It must be reset
+        when df is modified.
 
     Returns
     -------
     pandas.DataFrame
 
     """
-    filtering_expressions = filter_query.split(' && ')
-    for filter_part in filtering_expressions:
-        col_name, operator, filter_value = split_filter_part(filter_part)
+    predicates = list(compile_filter_query(filter_query))
+    positions = None
+    if sorted_index is not None:
+        candidates = []
+        for predicate in predicates:
+            col_name, operator, filter_value = predicate
+            if operator in ('lt', 'le', 'gt', 'ge') and isinstance(filter_value, float) \
+                    and col_name in df.columns and df[col_name].dtype.kind in 'iuf':
+                candidates.append((_range_bounds(df, col_name, operator, filter_value, sorted_index), predicate))
+        if candidates:
+            (order, start, stop), predicate = min(candidates, key=lambda candidate: candidate[0][2] - candidate[0][1])
+            positions = np.sort(order[start:stop])
+            predicates.remove(predicate)
+    for col_name, operator, filter_value in predicates:
+        column = df[col_name] if positions is None else df[col_name].iloc[positions]
         if operator in ('eq', 'ne', 'lt', 'le', 'gt', 'ge'):
             # these operators match pandas series operator method names
-            df = df.loc[getattr(df[col_name], operator)(filter_value)]
+            mask = getattr(column, operator)(filter_value)
         elif operator == 'contains':
-            df = df.loc[df[col_name].str.contains(filter_value)]
-        elif operator == 'datestartswith':
+            mask = column.str.contains(filter_value)
+        else:
             # this is a simplification of the front-end filtering logic,
             # only works with complete fields in standard format
-            df = df.loc[df[col_name].str.startswith(filter_value)]
-    return df
+            mask = column.str.startswith(filter_value)
+        mask = mask.to_numpy(dtype=bool, na_value=False)
+        positions = np.flatnonzero(mask) if positions is None else positions[mask]
+    if positions is None:
+        return df
+    return df.iloc[positions]
+
+
+def apply_sort(df, sort_by):
+    """
+    Apply a sort from dash.datatable to a pandas.DataFrame
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        dataFrame to be sorted
+    sort_by : dcc.datatable.sort_by
+        list of dict with the column_id and the direction of each sorted column
+
+    Returns
+    -------
+    pandas.DataFrame
+
+    """
+    if not sort_by:
+        return df
+    return df.sort_values(
+        [col['column_id'] for col in sort_by],
+        ascending=[col['direction'] == 'asc' for col in sort_by],
+        inplace=False
+    )
+
+
+def get_page(df, page_current, page_size):
+    """
+    Select the rows of a page of dash.datatable
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        dataFrame to be paged
+    page_current : int
+        number of the page (starting at 0)
+    page_size : int
+        number of rows of a page
 
+    Returns
+    -------
+    pandas.DataFrame
+        rows of the page
+    int
+        number of the page, bounded by the number of pages
+    int
+        number of pages
+
+    """
+    page_count = max(-(-df.shape[0] // page_size), 1)
+    page_current = min(max(page_current or 0, 0), page_count - 1)
+    page = df.iloc[page_current * page_size:(page_current + 1) * page_size]
+    return page, page_current, page_count
+
+
+def get_index_page(df, index, page_size):
+    """
+    Find the page of dash.datatable containing a specific index
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        dataFrame displayed by the datatable, with the index in the '_index_' column
+    index : int or str
+        index from the dataset to find
+    page_size : int
+        number of rows of a page
+
+    Returns
+    -------
+    int or None
+        number of the page (starting at 0), None if the index is not in df
+    """
+    if index is None or df.shape[0] == 0:
+        return None
+    indexes = df['_index_']
+    if np.issubdtype(indexes.dtype, np.integer):
+        try:
+            index = int(index)
+        except ValueError:
+            return None
+    positions = np.flatnonzero(indexes.to_numpy() == index)
+    return int(positions[0]) // page_size if len(positions) > 0 else None
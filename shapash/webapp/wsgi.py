@@ -0,0 +1,40 @@
+"""
+WSGI factory of the webapp, used to serve a saved SmartExplainer with several worker processes.
+
+Example with gunicorn, the explainer being loaded once before the workers are forked::
+
+    gunicorn --preload --workers 4 --bind 0.0.0.0:8050 \
+        "shapash.webapp.wsgi:create_app('xpl.pkl', session_store='sessions.sqlite')"
+"""
+from shapash import SmartExplainer
+
+
+def create_app(path, settings=None, session_store=None):
+    """
+    Load a SmartExplainer saved with SmartExplainer.save and build the Flask server of its webapp.
+
+    The state of each browser session is kept in session_store : with several worker
+    processes, use a SQLite file (or another BaseSessionStore shared by the workers) so that
+    the requests of a session can be served by any worker. With gunicorn --preload, the explainer
+    is loaded once and its memory is shared by the forked workers (copy-on-write).
+
+    Parameters
+    ----------
+    path : str
+        Path of the pickle file of the SmartExplainer.
+    settings : dict, optional
+        Default settings of the webapp ('rows', 'points', 'violin', 'features').
+    session_store : BaseSessionStore or str, optional
+        Store of the state of the sessions. A str is the path of a SQLite file.
+        If None, the state is kept in the memory of each process : use a single worker.
+
+    Returns
+    -------
+    flask.Flask
+        WSGI application
+    """
+    xpl = SmartExplainer.load(path)
+    if xpl.y_pred is None:
+        xpl.predict()
+    xpl.init_app(settings, session_store=session_store)
+    return xpl.smartapp.server
@@ -3,12 +3,14 @@ Unit tests acv backend.
 """
 
 import unittest
+from unittest.mock import patch
 import numpy as np
 import pandas as pd
 import sklearn.ensemble as ske
 import xgboost as xgb
 import category_encoders as ce
-from shapash.backend.lime_backend import LimeBackend
+from lime import lime_tabular
+from shapash.backend.lime_backend import LimeBackend, _explain_rows
 
 
 class TestAcvBackend(unittest.TestCase):
@@ -65,3 +67,71 @@ class TestAcvBackend(unittest.TestCase):
                 assert len(features_imp[0]) == len(self.x_df.columns)
             else:
                 assert len(features_imp) == len(self.x_df.columns)
+
+    def test_run_explainer_multiclass(self):
+        df = pd.DataFrame(np.random.randint(1, 123, size=(6, 2)), columns=['x1', 'x2'])
+        y = pd.Series([0, 1, 2, 0, 1, 2])
+        model = ske.RandomForestClassifier(n_estimators=1).fit(df.values, y)
+        backend_xpl = LimeBackend(model, data=df)
+        explain_data = backend_xpl.run_explainer(df)
+        assert isinstance(explain_data['contributions'], list)
+        assert len(explain_data['contributions']) == 3
+        for contrib in explain_data['contributions']:
+            assert contrib.shape == df.shape
+        contributions = backend_xpl.get_local_contributions(df, explain_data)
+        assert len(contributions) == 3
+
+    def test_run_explainer_n_jobs(self):
+        for model in self.model_list:
+            print(type(model))
+            model.fit(self.x_df.values, self.y_df)
+            backend_xpl = LimeBackend(model, data=self.x_df, n_jobs=2)
+            explain_data = backend_xpl.run_explainer(self.x_df)
+            assert explain_data['contributions'].shape == self.x_df.shape
+            pd.testing.assert_index_equal(explain_data['contributions'].index, self.x_df.index)
+
+    def test_explain_rows_batch(self):
+        df = pd.DataFrame(np.random.rand(5, 3), columns=['x1', 'x2', 'x3'])
+        y = pd.Series([0, 1, 2, 0, 1])
+        model = ske.RandomForestClassifier(n_estimators=1).fit(df.values, y)
+        calls = list()
+
+        def predict_fn(x):
+            calls.append(x.shape[0])
+            return model.predict_proba(x)
+
+        explainer_args = dict(training_data=df.values, feature_names=list(df.columns), mode='classification')
+        labels = [0, 1, 2]
+        np.random.seed(0)
+        contributions = _explain_rows(explainer_args, predict_fn, df.values, labels, batch_size=2)
+        assert calls == [10000, 10000, 5000]
+
+        np.random.seed(0)
+        explainer = lime_tabular.LimeTabularExplainer(**explainer_args)
+        for i, row in enumerate(df.values):
+            local_exp = explainer.explain_instance(row, model.predict_proba, labels=labels, num_features=3).as_map()
+            for j, label in enumerate(labels):
+                features_ids, weights = zip(*local_exp[label])
+                np.testing.assert_allclose(contributions[j, i, list(features_ids)], weights)
+
+    def test_explain_rows_lime_sampling(self):
+        """
+        The neighborhoods are generated with the private sampling method of Lime : this test
+        fails if a new version of Lime renames it or does not call it anymore.
+        """
+        df = pd.DataFrame(np.random.rand(3, 2), columns=['x1', 'x2'])
+        model = ske.RandomForestRegressor(n_estimators=1).fit(df.values, [0.5, 1.0, 2.0])
+        explainer_args = dict(training_data=df.values, feature_names=list(df.columns), mode='regression')
+        data_inverse = lime_tabular.LimeTabularExplainer._LimeTabularExplainer__data_inverse
+        with patch.object(lime_tabular.LimeTabularExplainer, '_LimeTabularExplainer__data_inverse',
+                          autospec=True, side_effect=data_inverse) as mock_data_inverse:
+            np.random.seed(0)
+            contributions = _explain_rows(explainer_args, model.predict, df.values, [1])
+        assert mock_data_inverse.call_count == 3
+
+        np.random.seed(0)
+        explainer = lime_tabular.LimeTabularExplainer(**explainer_args)
+        for i, row in enumerate(df.values):
+            local_exp = explainer.explain_instance(row, model.predict, num_features=2).as_map()
+            features_ids, weights = zip(*local_exp[1])
+            np.testing.assert_allclose(contributions[0, i, list(features_ids)], weights)
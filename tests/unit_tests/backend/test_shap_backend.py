@@ -1,10 +1,12 @@
 import unittest
+from unittest.mock import patch
 import numpy as np
 import pandas as pd
 import sklearn.ensemble as ske
 import xgboost as xgb
 import lightgbm as lgb
 import catboost as cb
+import shap
 
 from shapash.backend.shap_backend import ShapBackend
 
@@ -75,3 +77,29 @@ class TestShapBackend(unittest.TestCase):
                 assert len(features_imp[0]) == len(self.x_df.columns)
             else:
                 assert len(features_imp) == len(self.x_df.columns)
+
+    def test_run_explainer_n_jobs(self):
+        for model in self.model_list[:4]:
+            print(type(model))
+            model.fit(self.x_df, self.y_df)
+            explain_data = ShapBackend(model).run_explainer(self.x_df)
+            explain_data_n_jobs = ShapBackend(model, n_jobs=2).run_explainer(self.x_df)
+            np.testing.assert_allclose(explain_data['contributions'], explain_data_n_jobs['contributions'])
+
+    def test_run_explainer_n_jobs_sampling(self):
+        """
+        A sampling explainer gives the same contributions whatever the value of n_jobs
+        """
+        model = ske.RandomForestRegressor(n_estimators=5, random_state=0).fit(self.x_df, self.y_df['y'])
+        list_contributions = []
+        with patch('shapash.backend.shap_backend._BLOCK_SIZE', 5):
+            for n_jobs in [1, 2]:
+                backend_xpl = ShapBackend(model, explainer_compute_args={'max_evals': 50}, n_jobs=n_jobs)
+                backend_xpl.explainer = shap.explainers.Permutation(model.predict, self.x_df)
+                np.random.seed(0)
+                list_contributions.append(backend_xpl.run_explainer(self.x_df)['contributions'])
+        np.testing.assert_allclose(list_contributions[0], list_contributions[1])
+
+        for n_jobs in [0, -2, 1.5]:
+            with self.assertRaises(ValueError):
+                ShapBackend(model, n_jobs=n_jobs).run_explainer(self.x_df)
@@ -4,7 +4,7 @@ Unit test of contributions
 import unittest
 import pandas as pd
 import numpy as np
-from shapash.decomposition.contributions import rank_contributions
+from shapash.decomposition.contributions import rank_contributions, sparsify_contributions
 
     
 class TestContributions(unittest.TestCase):
@@ -68,4 +68,83 @@ class TestContributions(unittest.TestCase):
 
         assert pd.Index.equals(s_ord.index, expected_s_ord.index)
         assert pd.Index.equals(x_ord.index, expected_x_ord.index)
-        assert pd.Index.equals(s_dict.index, expected_s_dict.index)
\ No newline at end of file
+        assert pd.Index.equals(s_dict.index, expected_s_dict.index)
+
+    def test_rank_contributions_2(self):
+        """
+        Unit test rank contributions 2
+        checking rank contributions by chunks gives the same results
+        """
+        np.random.seed(0)
+        dataframe_s = pd.DataFrame(np.random.randn(11, 4), columns=["Phi_" + str(i) for i in range(4)])
+        dataframe_x = pd.DataFrame(
+            [['Male', 1, 2.5, 'PhD']] * 11,
+            columns=["X" + str(i) for i in range(4)]
+        )
+
+        expected = rank_contributions(dataframe_s, dataframe_x)
+        output = rank_contributions(dataframe_s, dataframe_x, chunk_size=3)
+
+        for expected_df, output_df in zip(expected, output):
+            pd.testing.assert_frame_equal(expected_df, output_df)
+
+    def test_rank_contributions_3(self):
+        """
+        Unit test rank contributions 3
+        checking rank contributions with top_k keeps the top_k first columns of the full ranking
+        """
+        np.random.seed(0)
+        dataframe_s = pd.DataFrame(np.random.randn(11, 6), columns=["Phi_" + str(i) for i in range(6)])
+        dataframe_x = pd.DataFrame(np.random.randn(11, 6), columns=["X" + str(i) for i in range(6)])
+
+        expected = rank_contributions(dataframe_s, dataframe_x)
+        for chunk_size in [None, 4]:
+            output = rank_contributions(dataframe_s, dataframe_x, chunk_size=chunk_size, top_k=2)
+            assert len(output) == 4
+            for expected_df, output_df in zip(expected, output[:3]):
+                pd.testing.assert_frame_equal(expected_df.iloc[:, :2], output_df)
+            rest = expected[0].iloc[:, 2:]
+            assert np.allclose(output[3]['masked_neg'], rest.clip(upper=0).sum(axis=1))
+            assert np.allclose(output[3]['masked_pos'], rest.clip(lower=0).sum(axis=1))
+
+        output = rank_contributions(dataframe_s, dataframe_x, top_k=10)
+        for expected_df, output_df in zip(expected, output[:3]):
+            pd.testing.assert_frame_equal(expected_df, output_df)
+        assert (output[3] == 0).all().all()
+
+        with self.assertRaises(ValueError):
+            rank_contributions(dataframe_s, dataframe_x, top_k=0)
+
+    def test_rank_contributions_4(self):
+        """
+        Unit test rank contributions 4
+        checking a chunk_size which is not a positive integer is rejected
+        """
+        dataframe_s = pd.DataFrame(np.random.randn(5, 3), columns=["Phi_" + str(i) for i in range(3)])
+        dataframe_x = pd.DataFrame(np.random.randn(5, 3), columns=["X" + str(i) for i in range(3)])
+        for chunk_size in [0, -2, 2.5]:
+            with self.assertRaises(ValueError):
+                rank_contributions(dataframe_s, dataframe_x, chunk_size=chunk_size)
+        output = rank_contributions(dataframe_s, dataframe_x, chunk_size=np.int64(2))
+        for expected_df, output_df in zip(rank_contributions(dataframe_s, dataframe_x), output):
+            pd.testing.assert_frame_equal(expected_df, output_df)
+
+    def test_sparsify_contributions_1(self):
+        """
+        Unit test sparsify contributions 1
+        """
+        dataframe_s = pd.DataFrame([[0.0, 1.5, -0.01], [0.0, 0.0, 2.0]],
+                                   columns=['X1', 'X2', 'X3'], index=['a', 'b'])
+
+        output = sparsify_contributions(dataframe_s)
+        assert all(isinstance(dtype, pd.SparseDtype) for dtype in output.dtypes)
+        assert output.sparse.density == 0.5
+        pd.testing.assert_frame_equal(output.sparse.to_dense(), dataframe_s)
+
+        output = sparsify_contributions(dataframe_s, threshold=0.1)
+        expected = pd.DataFrame([[0.0, 1.5, 0.0], [0.0, 0.0, 2.0]],
+                                columns=['X1', 'X2', 'X3'], index=['a', 'b'])
+        pd.testing.assert_frame_equal(output.sparse.to_dense(), expected)
+
+        with self.assertRaises(ValueError):
+            sparsify_contributions(dataframe_s, threshold=-1)
@@ -8,6 +8,8 @@ import category_encoders as ce
 import sklearn.preprocessing as skp
 from sklearn.compose import ColumnTransformer
 from shapash.decomposition.contributions import inverse_transform_contributions
+from shapash.utils.category_encoder_backend import _column_groups_cache, clear_column_groups_cache
+from shapash.utils.transform import clear_preprocessing_mapping_cache
 
 
 class TestInverseContribCaterogyEncoder(unittest.TestCase):
@@ -147,4 +149,84 @@ class TestInverseContribCaterogyEncoder(unittest.TestCase):
                                                     input_dict1,
                                                     list_dict])
 
-        pd.testing.assert_frame_equal(expected_contrib, original)
\ No newline at end of file
+        pd.testing.assert_frame_equal(expected_contrib, original)
+    def test_aggregation_first_and_missing_values(self):
+        """
+        Test first aggregation and missing contributions, with category encoder and columntransformers
+        """
+        train = pd.DataFrame({'Onehot1': ['A', 'B', 'C'], 'Ordinal1': ['I', 'J', 'I'], 'other': [1, 2, 3]})
+
+        contributions = pd.DataFrame([[1., 2., np.nan, 3., 4.],
+                                      [np.nan, np.nan, np.nan, np.nan, 5.]],
+                                     index=['index1', 'index2'])
+
+        enc_onehot = ce.OneHotEncoder(cols=['Onehot1']).fit(train)
+        contributions.columns = enc_onehot.transform(train).columns
+        expected_sum = pd.DataFrame({'Onehot1': [3., 0.], 'Ordinal1': [3., np.nan], 'other': [4., 5.]},
+                                    index=['index1', 'index2'])
+        expected_first = pd.DataFrame({'Onehot1': [1., np.nan], 'Ordinal1': [3., np.nan], 'other': [4., 5.]},
+                                      index=['index1', 'index2'])
+        pd.testing.assert_frame_equal(inverse_transform_contributions(contributions, enc_onehot), expected_sum)
+        pd.testing.assert_frame_equal(inverse_transform_contributions(contributions, enc_onehot, 'first'),
+                                      expected_first)
+
+        enc = ColumnTransformer(
+            transformers=[
+                ('onehot_ce', ce.OneHotEncoder(), ['Onehot1']),
+                ('ordinal_ce', ce.OrdinalEncoder(), ['Ordinal1'])
+            ],
+            remainder='passthrough')
+        enc.fit(train)
+        contributions.columns = range(5)
+        expected_first.columns = ['onehot_ce_Onehot1', 'ordinal_ce_Ordinal1', 4]
+        expected_sum.columns = expected_first.columns
+        pd.testing.assert_frame_equal(inverse_transform_contributions(contributions, enc), expected_sum)
+        pd.testing.assert_frame_equal(inverse_transform_contributions(contributions, enc, 'first'), expected_first)
+
+    def test_aggregation_single_column_group(self):
+        """
+        Test sum aggregation of an encoded feature with a single column : missing values count as 0
+        as with pandas sum, the columns which are not encoded keep their missing values
+        """
+        train = pd.DataFrame({'Onehot1': ['A', 'B', 'A'], 'Onehot2': ['C', 'C', 'C'], 'other': [1, 2, 3]})
+        contributions = pd.DataFrame([[1., 2., np.nan, 4.],
+                                      [np.nan, 1., np.nan, np.nan]],
+                                     index=['index1', 'index2'])
+        expected = pd.DataFrame({'Onehot1': [3., 1.], 'Onehot2': [0., 0.], 'other': [4., np.nan]},
+                                index=['index1', 'index2'])
+
+        enc_onehot = ce.OneHotEncoder(cols=['Onehot1', 'Onehot2']).fit(train)
+        contributions.columns = enc_onehot.transform(train).columns
+        pd.testing.assert_frame_equal(inverse_transform_contributions(contributions, enc_onehot), expected)
+
+        enc = ColumnTransformer(
+            transformers=[('onehot_ce', ce.OneHotEncoder(), ['Onehot1', 'Onehot2'])],
+            remainder='passthrough')
+        enc.fit(train)
+        contributions.columns = range(4)
+        expected.columns = ['onehot_ce_Onehot1', 'onehot_ce_Onehot2', 3]
+        pd.testing.assert_frame_equal(inverse_transform_contributions(contributions, enc), expected)
+
+    def test_refit_encoder_in_place(self):
+        """
+        Test the cached column groups of an encoder refitted in place, and their invalidation
+        """
+        contributions = pd.DataFrame([[1., 2., 3., 4.]], columns=range(4))
+        enc = ColumnTransformer(
+            transformers=[('onehot_ce', ce.OneHotEncoder(), ['Onehot1', 'Onehot2'])],
+            remainder='passthrough')
+        enc.fit(pd.DataFrame({'Onehot1': ['A', 'B'], 'Onehot2': ['C', 'C'], 'other': [1, 2]}))
+        expected = pd.DataFrame([[3., 3., 4.]], columns=['onehot_ce_Onehot1', 'onehot_ce_Onehot2', 3])
+        pd.testing.assert_frame_equal(inverse_transform_contributions(contributions, enc), expected)
+        assert enc in _column_groups_cache
+
+        # Same contributions columns, other groups
+        enc.fit(pd.DataFrame({'Onehot1': ['A', 'A'], 'Onehot2': ['C', 'D'], 'other': [1, 2]}))
+        expected = pd.DataFrame([[1., 5., 4.]], columns=['onehot_ce_Onehot1', 'onehot_ce_Onehot2', 3])
+        pd.testing.assert_frame_equal(inverse_transform_contributions(contributions, enc), expected)
+
+        clear_preprocessing_mapping_cache(enc)
+        assert enc not in _column_groups_cache
+        pd.testing.assert_frame_equal(inverse_transform_contributions(contributions, enc), expected)
+        clear_column_groups_cache()
+        assert len(_column_groups_cache) == 0
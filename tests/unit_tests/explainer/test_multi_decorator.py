@@ -145,6 +145,16 @@ class TestMultiDecorator(unittest.TestCase):
         state.combine_masks(masks)
         mock_delegate.assert_called_with('combine_masks', transposed_masks)
 
+    def test_filter_mask(self):
+        """
+        Unit test filter mask
+        """
+        backend = Mock()
+        state = MultiDecorator(backend)
+        state.filter_mask([1, 2, 3], [4, 5, 6], max_contrib=2)
+        assert backend.filter_mask.call_count == 3
+        backend.filter_mask.assert_called_with(3, 6, max_contrib=2)
+
     def test_compute_masked_contributions(self):
         """
         Unit test compute masked contributions
@@ -322,6 +322,126 @@ class TestSmartExplainer(unittest.TestCase):
         xpl = SmartExplainer(clf, data=df[['x1', 'x2']], backend="lime")
         xpl.compile(x=df[['x1', 'x2']])
         
+    def test_compile_6(self):
+        """
+        Unit test compile 6
+        checking compile method by batches gives the same results as compile method
+        """
+        np.random.seed(0)
+        df = pd.DataFrame(range(0, 21), columns=['id'])
+        df['y'] = df['id'].apply(lambda x: 1 if x < 10 else 0)
+        df['x1'] = np.random.randint(1, 123, df.shape[0])
+        df['x2'] = np.random.randint(1, 3, df.shape[0])
+        df = df.set_index('id')
+        clf = cb.CatBoostClassifier(n_estimators=1).fit(df[['x1', 'x2']], df['y'])
+
+        xpl = SmartExplainer(clf)
+        xpl.compile(x=df[['x1', 'x2']])
+        xpl_chunks = SmartExplainer(clf)
+        xpl_chunks.compile(x=df[['x1', 'x2']], batch_size=np.int64(4))
+        for contrib, contrib_chunks in zip(xpl.contributions, xpl_chunks.contributions):
+            pd.testing.assert_frame_equal(contrib, contrib_chunks)
+        for key in ['contrib_sorted', 'x_sorted', 'var_dict']:
+            for data, data_chunks in zip(xpl.data[key], xpl_chunks.data[key]):
+                pd.testing.assert_frame_equal(data, data_chunks)
+
+        xpl_lime = SmartExplainer(clf, data=df[['x1', 'x2']], backend="lime")
+        with self.assertRaises(AssertionError):
+            xpl_lime.compile(x=df[['x1', 'x2']], batch_size=4)
+
+        # batch_size is checked even when it is not used to compute the contributions
+        for batch_size in [0, -2, 2.5]:
+            for kwargs in [{}, {'contributions': xpl.contributions}]:
+                with self.assertRaises(ValueError):
+                    SmartExplainer(clf).compile(x=df[['x1', 'x2']], batch_size=batch_size, **kwargs)
+        with self.assertRaises(ValueError):
+            SmartExplainer(clf).compile(x=df[['x1', 'x2']], batch_size=-50)
+
+    def test_compile_7(self):
+        """
+        Unit test compile 7
+        checking compile method with sparse contributions gives the same outputs
+        """
+        np.random.seed(0)
+        df = pd.DataFrame(range(0, 21), columns=['id'])
+        df['y'] = df['id'].apply(lambda x: 1 if x < 10 else 0)
+        df['x1'] = np.random.randint(1, 123, df.shape[0])
+        df['x2'] = np.random.randint(1, 3, df.shape[0])
+        df['x3'] = 0
+        df = df.set_index('id')
+        clf = cb.CatBoostClassifier(n_estimators=1).fit(df[['x1', 'x2', 'x3']], df['y'])
+        y_pred = pd.DataFrame(clf.predict(df[['x1', 'x2', 'x3']]), columns=['pred'], index=df.index)
+
+        xpl = SmartExplainer(clf)
+        xpl.compile(x=df[['x1', 'x2', 'x3']], y_pred=y_pred)
+        xpl_sparse = SmartExplainer(clf)
+        xpl_sparse.compile(x=df[['x1', 'x2', 'x3']], y_pred=y_pred, sparse_threshold=0)
+        for contrib, contrib_sparse in zip(xpl.contributions, xpl_sparse.contributions):
+            assert all(isinstance(dtype, pd.SparseDtype) for dtype in contrib_sparse.dtypes)
+            pd.testing.assert_frame_equal(contrib, contrib_sparse.sparse.to_dense())
+
+        pd.testing.assert_frame_equal(xpl.to_pandas(max_contrib=2), xpl_sparse.to_pandas(max_contrib=2))
+        xpl.compute_features_import()
+        xpl_sparse.compute_features_import()
+        for features_imp, features_imp_sparse in zip(xpl.features_imp, xpl_sparse.features_imp):
+            pd.testing.assert_series_equal(features_imp, features_imp_sparse)
+        local_plot = xpl.plot.local_plot(index=3)
+        local_plot_sparse = xpl_sparse.plot.local_plot(index=3)
+        for bar, bar_sparse in zip(local_plot.data, local_plot_sparse.data):
+            assert np.allclose(bar.x, bar_sparse.x)
+
+    def test_compile_sparse_memory(self):
+        """
+        Unit test compile sparse memory
+        checking the memory saved by sparse contributions on a dataset of many one-hot features :
+        only the contributions and the sorted contributions are sparse
+        """
+        np.random.seed(0)
+        x = pd.DataFrame(np.random.randint(0, 2, size=(200, 60)), columns=['x' + str(i) for i in range(60)])
+        y = x['x0'] + 2 * x['x1'] - x['x2']
+        reg = cb.CatBoostRegressor(n_estimators=1, depth=3, verbose=False).fit(x, y)
+
+        xpl = SmartExplainer(reg)
+        xpl.compile(x=x)
+        xpl_sparse = SmartExplainer(reg)
+        xpl_sparse.compile(x=x, sparse_threshold=0)
+
+        def memory(df):
+            return df.memory_usage(deep=True).sum()
+
+        assert memory(xpl_sparse.contributions) < memory(xpl.contributions) / 5
+        assert memory(xpl_sparse.data['contrib_sorted']) < memory(xpl.data['contrib_sorted']) / 5
+        for key in ['x_sorted', 'var_dict']:
+            assert memory(xpl_sparse.data[key]) == memory(xpl.data[key])
+
+    def test_compile_8(self):
+        """
+        Unit test compile 8
+        checking compile method with top_k gives the same summary
+        """
+        np.random.seed(0)
+        df = pd.DataFrame(range(0, 21), columns=['id'])
+        df['y'] = df['id'].apply(lambda x: 1 if x < 10 else 0)
+        df['x1'] = np.random.randint(1, 123, df.shape[0])
+        df['x2'] = np.random.randint(1, 3, df.shape[0])
+        df['x3'] = np.random.randint(1, 5, df.shape[0])
+        df = df.set_index('id')
+        clf = cb.CatBoostClassifier(n_estimators=1).fit(df[['x1', 'x2', 'x3']], df['y'])
+        y_pred = pd.DataFrame(clf.predict(df[['x1', 'x2', 'x3']]), columns=['pred'], index=df.index)
+
+        xpl = SmartExplainer(clf)
+        xpl.compile(x=df[['x1', 'x2', 'x3']], y_pred=y_pred)
+        xpl_top = SmartExplainer(clf)
+        xpl_top.compile(x=df[['x1', 'x2', 'x3']], y_pred=y_pred, top_k=2)
+        for contrib_sorted in xpl_top.data['contrib_sorted']:
+            assert contrib_sorted.shape == (21, 2)
+
+        pd.testing.assert_frame_equal(xpl.to_pandas(max_contrib=2), xpl_top.to_pandas(max_contrib=2))
+        xpl.filter(max_contrib=1)
+        xpl_top.filter(max_contrib=1)
+        for masked, masked_top in zip(xpl.masked_contributions, xpl_top.masked_contributions):
+            pd.testing.assert_frame_equal(masked, masked_top)
+
 
     def test_filter_0(self):
         """
@@ -333,12 +453,9 @@ class TestSmartExplainer(unittest.TestCase):
         mockstate = Mock()
         xpl.state = mockstate
         xpl.filter()
-        mockstate.init_mask.assert_called()
-        mockstate.hide_contributions.assert_not_called()
-        mockstate.cap_contributions.assert_not_called()
-        mockstate.sign_contributions.assert_not_called()
-        mockstate.combine_masks.assert_called()
-        mockstate.cutoff_contributions.assert_not_called()
+        mockstate.filter_mask.assert_called_once_with(
+            1, 2, features_list=None, threshold=None, positive=None, max_contrib=None
+        )
         assert hasattr(xpl, 'mask')
         mockstate.compute_masked_contributions.assert_called()
         assert hasattr(xpl, 'masked_contributions')
@@ -359,12 +476,9 @@ class TestSmartExplainer(unittest.TestCase):
         mockstate = Mock()
         xpl.state = mockstate
         xpl.filter(features_to_hide=['X1', 'X2'])
-        mockstate.init_mask.assert_called()
-        mockstate.hide_contributions.assert_called()
-        mockstate.cap_contributions.assert_not_called()
-        mockstate.sign_contributions.assert_not_called()
-        mockstate.combine_masks.assert_called()
-        mockstate.cutoff_contributions.assert_not_called()
+        mockstate.filter_mask.assert_called_once_with(
+            1, 2, features_list=[1, 2], threshold=None, positive=None, max_contrib=None
+        )
         assert hasattr(xpl, 'mask')
         mockstate.compute_masked_contributions.assert_called()
         assert hasattr(xpl, 'masked_contributions')
@@ -379,12 +493,9 @@ class TestSmartExplainer(unittest.TestCase):
         mockstate = Mock()
         xpl.state = mockstate
         xpl.filter(threshold=0.1)
-        mockstate.init_mask.assert_called()
-        mockstate.hide_contributions.assert_not_called()
-        mockstate.cap_contributions.assert_called()
-        mockstate.sign_contributions.assert_not_called()
-        mockstate.combine_masks.assert_called()
-        mockstate.cutoff_contributions.assert_not_called()
+        mockstate.filter_mask.assert_called_once_with(
+            1, 2, features_list=None, threshold=0.1, positive=None, max_contrib=None
+        )
         assert hasattr(xpl, 'mask')
         mockstate.compute_masked_contributions.assert_called()
         assert hasattr(xpl, 'masked_contributions')
@@ -399,12 +510,9 @@ class TestSmartExplainer(unittest.TestCase):
         mockstate = Mock()
         xpl.state = mockstate
         xpl.filter(positive=True)
-        mockstate.init_mask.assert_called()
-        mockstate.hide_contributions.assert_not_called()
-        mockstate.cap_contributions.assert_not_called()
-        mockstate.sign_contributions.assert_called()
-        mockstate.combine_masks.assert_called()
-        mockstate.cutoff_contributions.assert_not_called()
+        mockstate.filter_mask.assert_called_once_with(
+            1, 2, features_list=None, threshold=None, positive=True, max_contrib=None
+        )
         assert hasattr(xpl, 'mask')
         mockstate.compute_masked_contributions.assert_called()
         assert hasattr(xpl, 'masked_contributions')
@@ -419,12 +527,9 @@ class TestSmartExplainer(unittest.TestCase):
         mockstate = Mock()
         xpl.state = mockstate
         xpl.filter(max_contrib=10)
-        mockstate.init_mask.assert_called()
-        mockstate.hide_contributions.assert_not_called()
-        mockstate.cap_contributions.assert_not_called()
-        mockstate.sign_contributions.assert_not_called()
-        mockstate.combine_masks.assert_called()
-        mockstate.cutoff_contributions.assert_called()
+        mockstate.filter_mask.assert_called_once_with(
+            1, 2, features_list=None, threshold=None, positive=None, max_contrib=10
+        )
         assert hasattr(xpl, 'mask')
         mockstate.compute_masked_contributions.assert_called()
         assert hasattr(xpl, 'masked_contributions')
@@ -439,12 +544,9 @@ class TestSmartExplainer(unittest.TestCase):
         mockstate = Mock()
         xpl.state = mockstate
         xpl.filter(positive=True, max_contrib=10)
-        mockstate.init_mask.assert_called()
-        mockstate.hide_contributions.assert_not_called()
-        mockstate.cap_contributions.assert_not_called()
-        mockstate.sign_contributions.assert_called()
-        mockstate.combine_masks.assert_called()
-        mockstate.cutoff_contributions.assert_called()
+        mockstate.filter_mask.assert_called_once_with(
+            1, 2, features_list=None, threshold=None, positive=True, max_contrib=10
+        )
         assert hasattr(xpl, 'mask')
         mockstate.compute_masked_contributions.assert_called()
         assert hasattr(xpl, 'masked_contributions')
@@ -459,12 +561,9 @@ class TestSmartExplainer(unittest.TestCase):
         mockstate = Mock()
         xpl.state = mockstate
         xpl.filter()
-        mockstate.init_mask.assert_called()
-        mockstate.hide_contributions.assert_not_called()
-        mockstate.cap_contributions.assert_not_called()
-        mockstate.sign_contributions.assert_not_called()
-        mockstate.combine_masks.assert_called()
-        mockstate.cutoff_contributions.assert_not_called()
+        mockstate.filter_mask.assert_called_once_with(
+            1, 2, features_list=None, threshold=None, positive=None, max_contrib=None
+        )
         assert hasattr(xpl, 'mask')
         mockstate.compute_masked_contributions.assert_called()
         assert hasattr(xpl, 'masked_contributions')
@@ -484,7 +583,8 @@ class TestSmartExplainer(unittest.TestCase):
                 columns=['Col1', 'Col2', 'Col3']
             )
         ]
-        xpl.data = {'var_dict': 1, 'contrib_sorted': contributions, 'x_sorted': 3}
+        var_dict = [pd.DataFrame(data=[[0, 1, 2], [0, 1, 2]], columns=['Col1', 'Col2', 'Col3'])] * 2
+        xpl.data = {'var_dict': var_dict, 'contrib_sorted': contributions, 'x_sorted': 3}
         xpl.state = MultiDecorator(SmartState())
         xpl.filter(threshold=0.5, max_contrib=2)
         expected_mask = [
@@ -522,6 +622,52 @@ class TestSmartExplainer(unittest.TestCase):
         }
         self.assertDictEqual(expected_param_dict, xpl.mask_params)
 
+    def test_filter_8(self):
+        """
+        Unit test filter 8
+        checking filter method with features_to_hide, threshold and positive after a compile with top_k
+        """
+        np.random.seed(0)
+        df = pd.DataFrame(range(0, 21), columns=['id'])
+        df['y'] = df['id'].apply(lambda x: 1 if x < 10 else 0)
+        df['x1'] = np.random.randint(1, 123, df.shape[0])
+        df['x2'] = np.random.randint(1, 3, df.shape[0])
+        df['x3'] = np.random.randint(1, 5, df.shape[0])
+        df = df.set_index('id')
+        clf = cb.CatBoostClassifier(n_estimators=1).fit(df[['x1', 'x2', 'x3']], df['y'])
+        y_pred = pd.DataFrame(clf.predict(df[['x1', 'x2', 'x3']]), columns=['pred'], index=df.index)
+
+        xpl = SmartExplainer(clf)
+        xpl.compile(x=df[['x1', 'x2', 'x3']], y_pred=y_pred)
+        xpl_top = SmartExplainer(clf)
+        xpl_top.compile(x=df[['x1', 'x2', 'x3']], y_pred=y_pred, top_k=np.int64(2))
+        threshold = np.median(np.abs(xpl.data['contrib_sorted'][1].values))
+
+        def shown_and_masked(explainer):
+            return [
+                pd.Series((contrib.values * mask.values).sum(axis=1), index=contrib.index) + masked.sum(axis=1)
+                for contrib, mask, masked in zip(
+                    explainer.data['contrib_sorted'], explainer.mask, explainer.masked_contributions
+                )
+            ]
+
+        # The hidden feature and the contributions below the threshold are in the top_k or in the rest
+        xpl.filter(features_to_hide=['x1'], threshold=threshold, max_contrib=1)
+        xpl_top.filter(features_to_hide=['x1'], threshold=threshold, max_contrib=1)
+        for masked, masked_top in zip(xpl.masked_contributions, xpl_top.masked_contributions):
+            pd.testing.assert_frame_equal(masked, masked_top)
+
+        # The sign filter applies to the top_k contributions only, the sum of the contributions is kept
+        for positive in [True, False]:
+            xpl.filter(features_to_hide=['x1'], threshold=threshold, positive=positive)
+            xpl_top.filter(features_to_hide=['x1'], threshold=threshold, positive=positive)
+            for mask, contrib in zip(xpl_top.mask, xpl_top.data['contrib_sorted']):
+                shown = contrib.values[mask.values]
+                assert (shown >= 0).all() if positive else (shown < 0).all()
+                assert (np.abs(shown) >= threshold).all()
+            for total, total_top in zip(shown_and_masked(xpl), shown_and_masked(xpl_top)):
+                pd.testing.assert_series_equal(total, total_top)
+
     def test_check_label_name_1(self):
         """
         Unit test check label name 1
@@ -817,6 +963,8 @@ class TestSmartExplainer(unittest.TestCase):
             dtype=object
         )
         expected['pred'] = expected['pred'].astype(int)
+        numeric_columns = [col for col in expected.columns if col.startswith(('value_', 'contribution_'))]
+        expected[numeric_columns] = expected[numeric_columns].astype(float)
         assert not pd.testing.assert_frame_equal(expected, output)
 
     def predict_proba(self, arg1, arg2):
@@ -878,6 +1026,8 @@ class TestSmartExplainer(unittest.TestCase):
         )
         expected['pred'] = expected['pred'].astype(int)
         expected['proba'] = expected['proba'].astype(float)
+        numeric_columns = [col for col in expected.columns if col.startswith(('value_', 'contribution_'))]
+        expected[numeric_columns] = expected[numeric_columns].astype(float)
         pd.testing.assert_frame_equal(expected, output)
 
     def test_to_pandas_3(self):
@@ -976,6 +1126,8 @@ class TestSmartExplainer(unittest.TestCase):
             dtype=object
         )
         expected['pred'] = expected['pred'].astype(int)
+        numeric_columns = [col for col in expected.columns if col.startswith(('value_', 'contribution_'))]
+        expected[numeric_columns] = expected[numeric_columns].astype(float)
         pd.testing.assert_frame_equal(expected, output)
 
     def test_compute_features_import_1(self):
@@ -1182,6 +1334,31 @@ class TestSmartExplainer(unittest.TestCase):
 
         assert xpl.local_neighbors["norm_shap"].shape[1] == expected
 
+    def test_compute_features_stability_3(self):
+        df = pd.DataFrame(np.random.randint(0, 100, size=(15, 4)), columns=list('ABCD'))
+        selection = [1, 3]
+        X = df.iloc[:, :-1]
+        y = df.iloc[:, -1]
+        model = DecisionTreeRegressor().fit(X, y)
+
+        xpl = SmartExplainer(model)
+        xpl.compile(x=X)
+
+        xpl.compute_features_stability(selection, use_tree=True)
+        tree = xpl._neighbors_tree[1]
+        xpl.compute_features_stability(selection, use_tree=True)
+        expected = (len(selection), X.shape[1])
+
+        assert xpl._neighbors_tree[1] is tree
+        radius = xpl._neighbors_radius
+        xpl.compute_features_stability(selection)
+        assert xpl._neighbors_radius is radius
+        xpl.compile(x=X.copy())
+        xpl.compute_features_stability(selection)
+        assert xpl._neighbors_radius is not radius
+        assert xpl.features_stability["variability"].shape == expected
+        assert xpl.features_stability["amplitude"].shape == expected
+
     def test_compute_features_compacity(self):
         df = pd.DataFrame(np.random.randint(0, 100, size=(15, 4)), columns=list('ABCD'))
         selection = [1, 3]
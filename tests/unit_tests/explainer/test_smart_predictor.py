@@ -18,6 +18,10 @@ from catboost import Pool
 import category_encoders as ce
 from unittest.mock import patch
 import types
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import time
+import pytest
 from sklearn.compose import ColumnTransformer
 import sklearn.preprocessing as skp
 import shap
@@ -1062,6 +1066,181 @@ class TestSmartPredictor(unittest.TestCase):
         assert len(contribution_expected) == len(contribution_output)
         assert all(output.columns == expected_output.columns)
 
+    def test_summarize_stateless(self):
+        """
+        Unit test summarize, detail_contributions, predict and predict_proba with x specified :
+        same results as add_input, without modifying the SmartPredictor
+        """
+        predictor_1 = self.predictor_1
+        x = self.df_1[['x1', 'x2']]
+        output = predictor_1.summarize(x=x)
+        detail = predictor_1.detail_contributions(x=x)
+        prediction = predictor_1.predict(x=x)
+        proba = predictor_1.predict_proba(x=x)
+        assert not hasattr(predictor_1, 'data')
+        assert not hasattr(predictor_1, 'summary')
+        assert not hasattr(predictor_1, 'mask')
+
+        predictor_1.add_input(x=x)
+        pd.testing.assert_frame_equal(output, predictor_1.summarize())
+        pd.testing.assert_frame_equal(detail, predictor_1.detail_contributions())
+        pd.testing.assert_frame_equal(prediction, predictor_1.predict())
+        pd.testing.assert_frame_equal(proba, predictor_1.predict_proba())
+
+        # Concurrent calls on the same SmartPredictor
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            outputs = list(executor.map(lambda i: predictor_1.summarize(x=x.iloc[[i]]), range(x.shape[0])))
+        for i, output_i in enumerate(outputs):
+            pd.testing.assert_frame_equal(output_i, output.iloc[[i]])
+
+    def test_summarize_stateless_groups(self):
+        """
+        Unit test summarize with x specified and groups of features
+        """
+        predictor_1 = self.predictor_1_w_groups
+        x = self.df_1[['x1', 'x2']]
+        output = predictor_1.summarize(x=x)
+        assert not hasattr(predictor_1, 'data_groups')
+        predictor_1.add_input(x=x)
+        pd.testing.assert_frame_equal(output, predictor_1.summarize())
+
+    def test_async_api(self):
+        """
+        Unit test aadd_input, asummarize and adetail_contributions
+        """
+        predictor_1 = self.predictor_1
+        x = self.df_1[['x1', 'x2']]
+
+        async def run():
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                summary_x = await predictor_1.asummarize(x=x, executor=executor)
+                detail_x = await predictor_1.adetail_contributions(x=x, executor=executor)
+                await predictor_1.aadd_input(x=x, executor=executor)
+                summary = await predictor_1.asummarize(executor=executor)
+                detail = await predictor_1.adetail_contributions()
+            return summary_x, detail_x, summary, detail
+
+        summary_x, detail_x, summary, detail = asyncio.run(run())
+        pd.testing.assert_frame_equal(summary_x, summary)
+        pd.testing.assert_frame_equal(detail_x, detail)
+        pd.testing.assert_frame_equal(summary, predictor_1.summarize())
+
+    def test_async_api_timeout(self):
+        """
+        Unit test of the timeout of the asynchronous API : the event loop is not blocked
+        and the SmartPredictor is not modified
+        """
+        predictor_1 = self.predictor_1
+        x = self.df_1[['x1', 'x2']]
+        run_explainer = predictor_1.backend.run_explainer
+
+        def slow_run_explainer(*args, **kwargs):
+            time.sleep(0.5)
+            return run_explainer(*args, **kwargs)
+
+        async def tick(ticks):
+            while True:
+                await asyncio.sleep(0.01)
+                ticks.append(1)
+
+        async def run():
+            ticks = []
+            ticker = asyncio.create_task(tick(ticks))
+            with self.assertRaises(asyncio.TimeoutError):
+                await predictor_1.asummarize(x=x, timeout=0.2)
+            with self.assertRaises(asyncio.TimeoutError):
+                await predictor_1.aadd_input(x=x, timeout=0.2)
+            ticker.cancel()
+            return ticks
+
+        with patch.object(predictor_1.backend, 'run_explainer', side_effect=slow_run_explainer):
+            ticks = asyncio.run(run())
+        assert len(ticks) > 10
+        assert not hasattr(predictor_1, 'data')
+
+    def test_explain_one_1(self):
+        """
+        Unit test explain_one method : same result as add_input and summarize
+        """
+        predictor_1 = self.predictor_1
+        predictor_1.modify_mask(max_contrib=1, positive=True)
+        x = self.df_1[['x1', 'x2']]
+        for i in range(x.shape[0]):
+            output = predictor_1.explain_one(x.iloc[i].to_dict())
+            predictor_1.add_input(x=x.iloc[[i]])
+            expected = predictor_1.summarize().iloc[0].dropna().to_dict()
+            assert list(output.keys()) == list(expected.keys())
+            for key, value in expected.items():
+                if isinstance(value, float):
+                    assert output[key] == pytest.approx(value)
+                else:
+                    assert output[key] == value
+
+        with self.assertRaises(ValueError):
+            predictor_1.explain_one(x)
+        with self.assertRaises(ValueError):
+            predictor_1.explain_one({"x1": 2, "x3": "S"})
+
+    def test_explain_one_2(self):
+        """
+        Unit test explain_one method : the prepared parameters follow the modifications
+        of the SmartPredictor
+        """
+        predictor_1 = self.predictor_1
+        x = self.df_1[['x1', 'x2']]
+        record = x.iloc[0].to_dict()
+
+        def check_summarize(output):
+            predictor_1.add_input(x=x.iloc[[0]])
+            expected = predictor_1.summarize().iloc[0].dropna().to_dict()
+            assert list(output.keys()) == list(expected.keys())
+            for key, value in expected.items():
+                if isinstance(value, float):
+                    assert output[key] == pytest.approx(value)
+                else:
+                    assert output[key] == value
+
+        check_summarize(predictor_1.explain_one(record))
+        predictor_1.modify_mask(features_to_hide=['x1'], threshold=0)
+        check_summarize(predictor_1.explain_one(record))
+        predictor_1.features_dict = {'x1': 'age', 'x2': 'weight'}
+        output = predictor_1.explain_one(record)
+        assert output['feature_1'] == 'weight'
+        check_summarize(output)
+        predictor_1.features_types = {'x1': str(x['x1'].dtype)}
+        with self.assertRaises(ValueError):
+            predictor_1.explain_one(record)
+
+    def test_explain_one_benchmark(self):
+        """
+        Latency benchmark of explain_one compared to add_input and summarize :
+        the median latency of explain_one must be lower
+        """
+        predictor_1 = self.predictor_1
+        x = self.df_1[['x1', 'x2']]
+        records = [x.iloc[i % x.shape[0]].to_dict() for i in range(50)]
+        predictor_1.explain_one(records[0])
+
+        latencies = []
+        for record in records:
+            start = time.perf_counter()
+            predictor_1.explain_one(record)
+            latencies.append(time.perf_counter() - start)
+        p50, p99 = np.percentile(latencies, [50, 99])
+
+        reference_latencies = []
+        for record in records:
+            start = time.perf_counter()
+            predictor_1.add_input(x=record)
+            predictor_1.summarize()
+            reference_latencies.append(time.perf_counter() - start)
+        reference_p50, reference_p99 = np.percentile(reference_latencies, [50, 99])
+
+        print("explain_one latency : p50 {:.2f} ms, p99 {:.2f} ms".format(1000 * p50, 1000 * p99))
+        print("add_input + summarize latency : p50 {:.2f} ms, p99 {:.2f} ms".format(
+            1000 * reference_p50, 1000 * reference_p99))
+        assert p50 < reference_p50
+
     def test_modfiy_mask(self):
         """
         Unit test modify_mask method
@@ -234,6 +234,15 @@ class TestSmartState(unittest.TestCase):
         state.combine_masks(Mock())
         mock_combine_masks.assert_called()
 
+    @patch('shapash.explainer.smart_state.filter_mask')
+    def test_filter_mask(self, mock_filter_mask):
+        """
+        Unit test filter mask
+        """
+        state = SmartState()
+        state.filter_mask(Mock(), Mock(), threshold=0.1)
+        mock_filter_mask.assert_called()
+
     @patch('shapash.explainer.smart_state.compute_masked_contributions')
     def test_compute_masked_contributions(self, mock_compute_masked_contributions):
         """
@@ -305,6 +314,8 @@ class TestSmartState(unittest.TestCase):
             index=[0, 1, 2],
             dtype=object
         )
+        numeric_columns = [col for col in expected.columns if col.startswith(('value_', 'contribution_'))]
+        expected[numeric_columns] = expected[numeric_columns].astype(float)
         assert not pd.testing.assert_frame_equal(expected, output)
 
     @patch('shapash.explainer.smart_state.compute_features_import')
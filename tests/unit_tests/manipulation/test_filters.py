@@ -9,6 +9,7 @@ from shapash.manipulation.filters import cap_contributions
 from shapash.manipulation.filters import hide_contributions
 from shapash.manipulation.filters import sign_contributions
 from shapash.manipulation.filters import combine_masks
+from shapash.manipulation.filters import filter_mask
 
 
 class TestFilter(unittest.TestCase):
@@ -244,6 +245,18 @@ class TestFilter(unittest.TestCase):
         )
         pd.testing.assert_frame_equal(output, expected)
 
+    def test_cutoff_contributions_4(self):
+        """
+        Unit test cutoff contributions 4 : more features than the int8 range
+        """
+        dataframe = pd.DataFrame(np.ones((2, 300), dtype=bool))
+        dataframe.iloc[1, :100] = False
+        output = cutoff_contributions(dataframe, 150)
+        assert output.iloc[0].sum() == 150
+        assert output.iloc[0, :150].all()
+        assert output.iloc[1].sum() == 150
+        assert output.iloc[1, 100:250].all()
+
     def test_combine_masks_1(self):
         """
         Unit test combine mask 1
@@ -292,3 +305,33 @@ class TestFilter(unittest.TestCase):
             columns=['contrib_1', 'contrib_2', 'contrib_3']
         )
         pd.testing.assert_frame_equal(output, expected_output)
+
+    def test_filter_mask(self):
+        """
+        Unit test filter mask, compared with the combination of the single masks
+        """
+        var_dict = pd.DataFrame(
+            [[1, 0, 2, 3],
+             [2, 3, 0, 1],
+             [0, 1, 3, 2]],
+            columns=['feature_1', 'feature_2', 'feature_3', 'feature_4']
+        )
+        s_contrib = pd.DataFrame(
+            [[0.5, -0.4, 0.3, -0.01],
+             [-0.6, 0.2, 0.05, np.nan],
+             [0.9, 0.8, -0.7, 0.0]],
+            columns=['contribution_1', 'contribution_2', 'contribution_3', 'contribution_4']
+        )
+        output = filter_mask(var_dict, s_contrib)
+        assert output.to_numpy().all()
+        assert list(output.columns) == ['contrib_1', 'contrib_2', 'contrib_3', 'contrib_4']
+        for positive in [True, False]:
+            output = filter_mask(
+                var_dict, s_contrib, features_list=[1], threshold=0.1, positive=positive, max_contrib=1
+            )
+            expected_output = cutoff_contributions(combine_masks([
+                hide_contributions(var_dict, [1]),
+                cap_contributions(s_contrib, 0.1),
+                sign_contributions(s_contrib, positive)
+            ]), 1)
+            pd.testing.assert_frame_equal(output, expected_output)
@@ -2,8 +2,9 @@
 Unit test for select lines
 """
 import unittest
+import numpy as np
 import pandas as pd
-from shapash.manipulation.select_lines import select_lines
+from shapash.manipulation.select_lines import select_lines, keep_right_contributions
 
 DF = pd.DataFrame(
         [['A', 'A', -16.4, 12],
@@ -42,3 +43,38 @@ class TestSelectLines(unittest.TestCase):
         output = select_lines(dataframe, 'col3 < 0')
         expected = [('A', 'A'), ('C', 'B')]
         assert output == expected
+
+    def test_keep_right_contributions_1(self):
+        """
+        test of keep right contributions in multiclass classification
+        """
+        index = ['r1', 'r2', 'r3']
+        contributions = [
+            pd.DataFrame([[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]], columns=['x1', 'x2'], index=index),
+            pd.DataFrame([[1.1, 1.2], [1.3, 1.4], [1.5, 1.6]], columns=['x1', 'x2'], index=index),
+            pd.DataFrame([[2.1, 2.2], [2.3, 2.4], [2.5, 2.6]], columns=['x1', 'x2'], index=index)
+        ]
+        y_pred = pd.DataFrame(['c', 'a', 'b'], columns=['pred'], index=index)
+        proba_values = pd.DataFrame([[0.1, 0.2, 0.7], [0.5, 0.3, 0.2], [0.3, 0.4, 0.3]], index=index)
+        label_dict = {'a': 'A', 'b': 'B', 'c': 'C'}
+        y_pred, summary = keep_right_contributions(y_pred, contributions, 'classification',
+                                                   ['a', 'b', 'c'], label_dict, proba_values)
+        expected_summary = pd.DataFrame([[2.1, 2.2], [0.3, 0.4], [1.5, 1.6]], columns=['x1', 'x2'], index=index)
+        expected_y_pred = pd.DataFrame({'pred': ['C', 'A', 'B'], 'proba': [0.7, 0.5, 0.4]}, index=index)
+        pd.testing.assert_frame_equal(summary, expected_summary)
+        pd.testing.assert_frame_equal(y_pred, expected_y_pred)
+
+    def test_keep_right_contributions_2(self):
+        """
+        test of keep right contributions with summaries of different lengths
+        """
+        contributions = [
+            pd.DataFrame([['x1', 0.1], ['x2', 0.3]], columns=['feature_1', 'contribution_1']),
+            pd.DataFrame([['x2', 1.1, 'x1', 1.2], ['x1', 1.3, np.nan, np.nan]],
+                         columns=['feature_1', 'contribution_1', 'feature_2', 'contribution_2'])
+        ]
+        y_pred = pd.DataFrame([0, 1], columns=['pred'])
+        _, summary = keep_right_contributions(y_pred, contributions, 'classification', [0, 1], None)
+        expected = pd.DataFrame([['x1', 0.1, np.nan, np.nan], ['x1', 1.3, np.nan, np.nan]],
+                                columns=['feature_1', 'contribution_1', 'feature_2', 'contribution_2'])
+        pd.testing.assert_frame_equal(summary, expected)
@@ -34,7 +34,7 @@ class TestSummarize(unittest.TestCase):
         expected = pd.DataFrame(
             [[0.1, np.nan], [0.002, np.nan], [-0.008, 0.4]],
             columns=["feat1", "feat2"],
-            dtype=object
+            dtype=float
         )
         assert xmatr.shape[0] == output.shape[0]
         assert output.equals(expected)
@@ -60,7 +60,7 @@ class TestSummarize(unittest.TestCase):
         expected = pd.DataFrame(
             [[0.1], [0.002], [0.4]],
             columns=["feat1"],
-            dtype=object
+            dtype=float
         )
         assert xmatr.shape[0] == output.shape[0]
         assert output.equals(expected)
@@ -115,12 +115,43 @@ class TestSummarize(unittest.TestCase):
         expected = pd.DataFrame(
             [[0.1, np.nan], [0.002, np.nan], [-0.008, 0.4]],
             columns=["temp1", "temp2"],
-            dtype=object
+            dtype=float
         )
         expected.index = index_list
         assert xmatr.shape[0] == output.shape[0]
         assert output.equals(expected)
 
+    def test_summarize_el_5(self):
+        """
+        Test summarize el 5 : integer matrix and nan values kept by the mask
+        """
+        column_name = ['col1', 'col2', 'col3']
+        xmatr = pd.DataFrame(
+            [[2, 0, 1],
+             [1, 2, 0],
+             [0, 1, 2]],
+            columns=column_name
+        )
+        masktest = pd.DataFrame(
+            [[False, True, True],
+             [True, True, True],
+             [False, False, False]],
+            columns=column_name
+        )
+        output = summarize_el(xmatr, masktest, "temp")
+        expected = pd.DataFrame(
+            [[0, 1, np.nan], [1, 2, 0], [np.nan, np.nan, np.nan]],
+            columns=["temp1", "temp2", "temp3"],
+            dtype=float
+        )
+        assert output.equals(expected)
+
+        xmatr = xmatr.astype(float)
+        xmatr.iloc[0, 1] = np.nan
+        output = summarize_el(xmatr, masktest, "temp")
+        expected.iloc[0, 0] = np.nan
+        assert output.equals(expected)
+
     def test_compute_features_import_1(self):
         """
         Test compute features import 1
@@ -0,0 +1,103 @@
+"""
+Unit test of batcher
+"""
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from shapash import SmartExplainer
+from shapash.explainer.smart_predictor import SmartPredictor
+from shapash.utils.batcher import Batcher
+
+
+class TestBatcher(unittest.TestCase):
+    """
+    Unit test of Batcher class
+    """
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.x = pd.DataFrame({
+            'x1': rng.randint(0, 100, 30),
+            'x2': rng.normal(size=30),
+            'x3': rng.randint(0, 5, 30)
+        })
+        y = (self.x['x1'] > 50).astype(int)
+        model = RandomForestClassifier(n_estimators=5, random_state=0).fit(self.x, y)
+        xpl = SmartExplainer(model)
+        xpl.compile(x=self.x)
+        self.predictor = xpl.to_smartpredictor()
+        self.predictor.modify_mask(max_contrib=2)
+        self.records = [self.x.iloc[i].to_dict() for i in range(self.x.shape[0])]
+        for record in self.records:
+            record['x1'] = int(record['x1'])
+            record['x3'] = int(record['x3'])
+
+    def assert_same_summary(self, output, expected):
+        assert list(output.keys()) == list(expected.keys())
+        for key, value in expected.items():
+            assert output[key] == pytest.approx(value)
+
+    def test_explain_1(self):
+        """
+        Concurrent requests get the summary of their own record
+        """
+        with self.predictor.batcher(max_batch=8, max_wait_ms=20) as batcher:
+            with ThreadPoolExecutor(max_workers=10) as executor:
+                outputs = list(executor.map(batcher.explain, self.records))
+        for record, output in zip(self.records, outputs):
+            self.assert_same_summary(output, self.predictor.explain_one(record))
+
+    def test_explain_2(self):
+        """
+        Pending records are coalesced into batches
+        """
+        with patch.object(SmartPredictor, 'summarize', autospec=True,
+                          side_effect=SmartPredictor.summarize) as summarize:
+            batcher = Batcher(self.predictor, max_batch=10, max_wait_ms=500)
+            futures = [batcher.submit(record) for record in self.records]
+            outputs = [future.result() for future in futures]
+            batcher.close()
+        assert len(outputs) == len(self.records)
+        assert summarize.call_count < len(self.records)
+        assert all(call.kwargs['x'].shape[0] <= 10 for call in summarize.call_args_list)
+        assert not hasattr(self.predictor, 'data')
+
+    def test_aexplain(self):
+        """
+        Asyncio API
+        """
+        async def explain_all(batcher):
+            return await asyncio.gather(*[batcher.aexplain(record) for record in self.records[:5]])
+
+        with self.predictor.batcher(max_batch=5, max_wait_ms=20) as batcher:
+            outputs = asyncio.run(explain_all(batcher))
+        for record, output in zip(self.records[:5], outputs):
+            self.assert_same_summary(output, self.predictor.explain_one(record))
+
+    def test_errors(self):
+        """
+        Only the invalid records get an error
+        """
+        batcher = Batcher(self.predictor, max_batch=10, max_wait_ms=200)
+        futures = [batcher.submit(record) for record in self.records[:3]]
+        wrong_future = batcher.submit({'x1': 1, 'x4': 2.0})
+        assert futures[0].result()['ypred'] in [0, 1]
+        with self.assertRaises(ValueError):
+            wrong_future.result()
+        assert all(future.exception() is None for future in futures)
+        batcher.close()
+        with self.assertRaises(RuntimeError):
+            batcher.submit(self.records[0])
+        with self.assertRaises(ValueError):
+            Batcher(self.predictor, max_batch=0)
+        with self.assertRaises(ValueError):
+            Batcher(self.predictor, max_batch=2.5)
+        batcher = Batcher(self.predictor, max_batch=np.int64(2))
+        assert batcher.explain(self.records[0]) == self.predictor.explain_one(self.records[0])
+        batcher.close()
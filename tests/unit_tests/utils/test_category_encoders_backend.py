@@ -451,6 +451,62 @@ class TestInverseTransformCaterogyEncoder(unittest.TestCase):
 
         pd.testing.assert_frame_equal(expected, original)
 
+    def test_inverse_transform_27(self):
+        """
+        Test vectorized inverse transform against the default one
+        """
+        train = pd.DataFrame({'Onehot1': ['A', 'B', 'A', 'B'], 'Onehot2': ['C', 'D', 'C', np.nan],
+                              'Binary1': ['E', 'F', 'E', 'F'], 'Binary2': ['G', 'H', 'G', 'H'],
+                              'Ordinal1': ['I', 'J', 'I', 'J'], 'Ordinal2': ['K', 'L', 'K', 'L'],
+                              'BaseN1': ['M', 'N', 'M', 'N'], 'BaseN2': ['O', 'P', 'O', 'P'],
+                              'Target1': ['Q', 'R', 'Q', 'R'], 'Target2': ['S', 'T', 'S', 'T'],
+                              'other': [1, 2, 3, 4]})
+
+        test = pd.DataFrame({'Onehot1': ['A', 'B', 'A', 'B'], 'Onehot2': ['C', 'D', 'ZZ', np.nan],
+                             'Binary1': ['E', 'F', 'F', 'E'], 'Binary2': ['G', 'H', 'ZZ', 'G'],
+                             'Ordinal1': ['I', 'J', 'J', 'I'], 'Ordinal2': ['K', 'L', 'ZZ', np.nan],
+                             'BaseN1': ['M', 'N', 'N', 'M'], 'BaseN2': ['O', 'P', 'ZZ', 'O'],
+                             'Target1': ['Q', 'R', 'R', 'Q'], 'Target2': ['S', 'T', 'ZZ', 'T'],
+                             'other': [5, 6, 7, 8]},
+                            index=['index1', 'index2', 'index3', 'index4'])
+
+        y = pd.DataFrame(data=[0, 1, 0, 0], columns=['y'])
+
+        enc_onehot = ce.OneHotEncoder(cols=['Onehot1', 'Onehot2']).fit(train)
+        train_onehot = enc_onehot.transform(train)
+        enc_binary = ce.BinaryEncoder(cols=['Binary1', 'Binary2']).fit(train_onehot)
+        train_binary = enc_binary.transform(train_onehot)
+        enc_ordinal = ce.OrdinalEncoder(cols=['Ordinal1', 'Ordinal2']).fit(train_binary)
+        train_ordinal = enc_ordinal.transform(train_binary)
+        enc_basen = ce.BaseNEncoder(cols=['BaseN1', 'BaseN2'], base=3).fit(train_ordinal)
+        train_basen = enc_basen.transform(train_ordinal)
+        enc_target = ce.TargetEncoder(cols=['Target1', 'Target2']).fit(train_basen, y)
+
+        input_dict = dict()
+        input_dict['col'] = 'other'
+        input_dict['mapping'] = pd.Series(data=[10, 20, 30], index=[5, 6, 7])
+        input_dict['data_type'] = 'float'
+
+        encoded = enc_target.transform(enc_basen.transform(enc_ordinal.transform(
+            enc_binary.transform(enc_onehot.transform(test)))))
+        encoded_copy = encoded.copy()
+        preprocessing = [enc_onehot, enc_binary, enc_ordinal, enc_basen, enc_target, input_dict]
+
+        expected = inverse_transform(encoded, preprocessing)
+        original = inverse_transform(encoded, preprocessing, vectorized=True)
+        pd.testing.assert_frame_equal(original, expected)
+        pd.testing.assert_frame_equal(encoded, encoded_copy)
+
+        # Unknown ordinal codes and one-hot rows without any 1
+        encoded['Ordinal1'] = [1, 5, -1, -2]
+        encoded.iloc[0, :2] = 0
+        expected = inverse_transform(encoded, enc_ordinal)
+        original = inverse_transform(encoded, enc_ordinal, vectorized=True)
+        pd.testing.assert_frame_equal(original, expected)
+        expected = inverse_transform(encoded, enc_onehot)
+        original = inverse_transform(encoded, enc_onehot, vectorized=True)
+        pd.testing.assert_frame_equal(original, expected)
+
     def test_transform_ce_1(self):
         """
         Unit test for apply preprocessing on OneHotEncoder
@@ -717,6 +717,44 @@ class TestInverseTransformColumnsTransformer(unittest.TestCase):
         original = inverse_transform(result, enc)
         pd.testing.assert_frame_equal(original, expected)
 
+    def test_inv_transform_ct_24(self):
+        """
+        test vectorized inv_transform_ct against the default one
+        """
+        y = pd.DataFrame(data=[0, 1, 1], columns=['y'])
+
+        train = pd.DataFrame({'city': ['chicago', 'chicago', 'paris'],
+                              'state': ['US', 'FR', 'FR'],
+                              'num': [1.0, 2.0, 3.0],
+                              'other': ['A', 'B', 'C']})
+
+        enc = ColumnTransformer(
+            transformers=[
+                ('onehot_ce', ce.OneHotEncoder(), ['city', 'state']),
+                ('ordinal_ce', ce.OrdinalEncoder(), ['state']),
+                ('ordinal_skp', skp.OrdinalEncoder(), ['city']),
+                ('scaler', skp.StandardScaler(), ['num'])
+            ],
+            remainder='passthrough')
+        enc.fit(train, y)
+
+        test = pd.DataFrame({'city': ['chicago', 'chicago', 'paris'],
+                             'state': ['US', 'FR', 'FR'],
+                             'num': [3.0, 1.0, 2.0],
+                             'other': ['A', 'B', 'C']},
+                            index=['index1', 'index2', 'index3'])
+
+        input_dict = dict()
+        input_dict['col'] = 'ordinal_ce_state'
+        input_dict['mapping'] = pd.Series(data=['US', 'FR'], index=['United States', 'France'])
+        input_dict['data_type'] = 'object'
+
+        result = pd.DataFrame(enc.transform(test), index=test.index)
+        result.columns = ['col' + str(i) for i in range(result.shape[1])]
+        expected = inverse_transform(result, [enc, input_dict])
+        original = inverse_transform(result, [enc, input_dict], vectorized=True)
+        pd.testing.assert_frame_equal(original, expected)
+
     def test_transform_ct_1(self):
         """
         Unit test for apply_preprocessing on ColumnTransformer with drop option and sklearn encoder.
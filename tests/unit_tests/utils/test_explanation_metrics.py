@@ -4,7 +4,8 @@ import pandas as pd
 from sklearn.linear_model import LinearRegression
 from shapash.utils.explanation_metrics import _df_to_array, \
     _compute_distance, _compute_similarities, _get_radius, find_neighbors, \
-    shap_neighbors, get_min_nb_features, get_distance
+    shap_neighbors, get_min_nb_features, get_distance, _compute_pairwise_distances, \
+    build_neighbors_tree, batch_shap_neighbors
 
 
 class TestExplanationMetrics(unittest.TestCase):
@@ -33,11 +34,25 @@ class TestExplanationMetrics(unittest.TestCase):
         assert len(t) == expected_len
         assert t[0] == expected_dist
 
+    def test_compute_pairwise_distances(self):
+        df = pd.DataFrame(np.random.randint(0, 100, size=(5, 4)), columns=list('ABCD')).values
+        mean_vector = df.std(axis=0)
+        expected = np.array([[_compute_distance(x1, x2, mean_vector) for x2 in df] for x1 in df[:2]])
+        t = _compute_pairwise_distances(df[:2], df, mean_vector)
+        assert t.shape == (2, 5)
+        np.testing.assert_allclose(t, expected)
+
     def test_get_radius(self):
         df = pd.DataFrame(np.random.randint(0, 100, size=(5, 4)), columns=list('ABCD')).values
         t = _get_radius(df, n_neighbors=3)
         assert t > 0
 
+    def test_get_radius_random_state(self):
+        df = pd.DataFrame(np.random.randint(0, 100, size=(600, 4)), columns=list('ABCD')).values
+        t1 = _get_radius(df, n_neighbors=3, random_state=0)
+        t2 = _get_radius(df, n_neighbors=3, random_state=0)
+        assert t1 == t2
+
     def test_find_neighbors(self):
         df = pd.DataFrame(np.random.randint(0, 100, size=(15, 4)), columns=list('ABCD'))
         selection = [1, 3]
@@ -49,6 +64,26 @@ class TestExplanationMetrics(unittest.TestCase):
         assert len(t) == len(selection)
         assert t[0].shape[1] == X.shape[1] + 2
 
+        t, positions = find_neighbors(selection, X, model, mode, return_positions=True)
+        assert len(positions) == len(selection)
+        for neighbors, neighbors_positions in zip(t, positions):
+            np.testing.assert_array_equal(neighbors[:, :-2], X.values[neighbors_positions])
+        assert positions[0][0] == selection[0]
+
+    def test_find_neighbors_tree(self):
+        df = pd.DataFrame(np.random.rand(30, 4), columns=list('ABCD'))
+        selection = [1, 3]
+        X = df.iloc[:, :-1]
+        y = df.iloc[:, -1]
+        model = LinearRegression().fit(X, y)
+        mode = "regression"
+        np.random.seed(0)
+        expected = find_neighbors(selection, X, model, mode)
+        np.random.seed(0)
+        t = find_neighbors(selection, X, model, mode, tree=build_neighbors_tree(X.values))
+        for neighbors, expected_neighbors in zip(t, expected):
+            np.testing.assert_allclose(neighbors, expected_neighbors)
+
     def test_shap_neighbors(self):
         df = pd.DataFrame(np.random.randint(0, 100, size=(15, 4)), columns=list('ABCD'))
         contrib = pd.DataFrame(np.random.randint(10, size=(15, 4)), columns=list('EFGH'))
@@ -61,6 +96,35 @@ class TestExplanationMetrics(unittest.TestCase):
         assert t[1].shape == (len(df.columns),)
         assert t[2].shape == (len(df.columns),)
 
+    def test_shap_neighbors_positions(self):
+        df = pd.DataFrame(np.random.randint(0, 100, size=(15, 4)), columns=list('ABCD'))
+        contrib = pd.DataFrame(np.random.randint(1, 10, size=(15, 4)), columns=list('EFGH'))
+        positions = np.array([3, 0, 7])
+        instance = np.append(df.values[positions], np.zeros((3, 2)), axis=1)
+        mode = "regression"
+        t = shap_neighbors(instance, df, contrib, mode, positions=positions)
+        expected_amplitude = contrib.values[3] / contrib.values[3].sum()
+        assert t[0].shape == (3, 4)
+        np.testing.assert_allclose(t[2], expected_amplitude)
+
+    def test_batch_shap_neighbors(self):
+        df = pd.DataFrame(np.random.randint(0, 100, size=(15, 4)), columns=list('ABCD'))
+        contrib = pd.DataFrame(np.random.randn(15, 4), columns=list('EFGH'))
+        all_positions = [np.array([3, 0, 7]), np.array([5]), np.array([], dtype=int), np.array([1, 2])]
+        mode = "regression"
+        variability, amplitude = batch_shap_neighbors(all_positions, contrib, mode)
+        assert variability.shape == (4, 4)
+        assert amplitude.shape == (4, 4)
+        for i, positions in enumerate(all_positions):
+            if len(positions) == 0:
+                assert (variability[i] == 0).all() and (amplitude[i] == 0).all()
+                continue
+            instance = np.append(df.values[positions], np.zeros((len(positions), 2)), axis=1)
+            _, expected_variability, expected_amplitude = shap_neighbors(
+                instance, df, contrib, mode, positions=positions)
+            np.testing.assert_allclose(variability[i], expected_variability)
+            np.testing.assert_allclose(amplitude[i], expected_amplitude)
+
     def test_get_min_nb_features(self):
         contrib = pd.DataFrame(np.random.randint(10, size=(15, 4)), columns=list('ABCD'))
         selection = [1, 3]
@@ -80,3 +144,18 @@ class TestExplanationMetrics(unittest.TestCase):
         assert type(t) == np.ndarray
         assert all(isinstance(x, float) for x in t)
         assert len(t) == len(selection)
+
+    def test_get_min_nb_features_2(self):
+        contrib = pd.DataFrame([[4, -1, 0.5, 0.2], [1, 1, 1, 1], [0, 0, 3, -2]], columns=list('ABCD'))
+        selection = [0, 1, 2]
+        t = get_min_nb_features(selection, contrib, "regression", 0.1)
+        assert t == [1, 4, 2]
+        t = get_min_nb_features(selection, contrib, "regression", 0.1, chunk_size=np.int64(2))
+        assert t == [1, 4, 2]
+
+    def test_get_distance_2(self):
+        contrib = pd.DataFrame([[4, -1, 0.5, 0.5], [1, 1, 1, 1], [0, 0, 3, -2]], columns=list('ABCD'))
+        selection = [0, 1, 2]
+        expected = np.array([0, 3 / 4, 2])
+        np.testing.assert_allclose(get_distance(selection, contrib, "regression", 1), expected)
+        np.testing.assert_allclose(get_distance(selection, contrib, "regression", 1, chunk_size=2), expected)
@@ -1,12 +1,19 @@
 """
 Unit test of transform module.
 """
+import gc
 import unittest
+from unittest.mock import patch
+import numpy as np
 import pandas as pd
 from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LogisticRegression
 import sklearn.preprocessing as skp
 import category_encoders as ce
 from shapash.utils.transform import get_preprocessing_mapping, get_features_transform_mapping
+from shapash.utils.transform import apply_preprocessing, compile_preprocessing, apply_compiled_preprocessing
+from shapash.utils.transform import clear_preprocessing_mapping_cache
+import shapash.utils.transform as transform
 
 
 class TestInverseTransformCaterogyEncoder(unittest.TestCase):
@@ -211,3 +218,127 @@ class TestInverseTransformCaterogyEncoder(unittest.TestCase):
                             'other': ['other']}
 
         self.assertDictEqual(mapping, expected_mapping)
+
+    def test_apply_compiled_preprocessing_1(self):
+        """
+        test apply_compiled_preprocessing with category encoders and dictionary
+        """
+        train = pd.DataFrame({'city': ['chicago', 'paris', 'chicago'],
+                              'state': ['US', 'FR', 'FR'],
+                              'other': ['A', 'B', 'B']})
+        y = pd.DataFrame(data=[0, 1, 1], columns=['y'])
+
+        enc = ce.OneHotEncoder(cols=['state'], use_cat_names=True)
+        train_encoded = enc.fit_transform(train, y)
+        enc2 = ce.OrdinalEncoder(cols=['city'])
+        train_encoded = enc2.fit_transform(train_encoded, y)
+        input_dict = dict()
+        input_dict['col'] = 'other'
+        input_dict['mapping'] = pd.Series(data=[1, 2], index=['A', 'B'])
+        input_dict['data_type'] = 'int64'
+        preprocessing = [enc, enc2, input_dict]
+
+        plan = compile_preprocessing(preprocessing)
+        assert [step[0] for step in plan] == ['ce', 'ordinal', 'mapping']
+
+        test = pd.DataFrame({'city': ['chicago', 'london', np.nan, 'paris'],
+                             'state': ['US', 'FR', 'FR', 'US'],
+                             'other': ['A', 'B', 'B', 'A']},
+                            index=['a', 'b', 'c', 'd'])
+        expected = apply_preprocessing(test.copy(), None, preprocessing)
+        result = apply_compiled_preprocessing(test.copy(), None, plan)
+        pd.testing.assert_frame_equal(result, expected)
+
+        test['city'] = test['city'].astype('category')
+        expected = apply_preprocessing(test.copy(), None, preprocessing)
+        result = apply_compiled_preprocessing(test.copy(), None, plan)
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_apply_compiled_preprocessing_2(self):
+        """
+        test apply_compiled_preprocessing with ColumnTransformer and dictionary
+        """
+        train = pd.DataFrame({'city': ['chicago', 'paris', 'chicago'],
+                              'state': ['US', 'FR', 'FR'],
+                              'other': [1, 2, 3]})
+        y = pd.DataFrame(data=[0, 1, 1], columns=['y'])
+        enc = ColumnTransformer(
+            transformers=[
+                ('onehot_ce', ce.OneHotEncoder(), ['city', 'state']),
+                ('ordinal_skp', skp.OrdinalEncoder(), ['city'])
+            ],
+            remainder='passthrough')
+        train_encoded = pd.DataFrame(enc.fit_transform(train, y))
+        clf = LogisticRegression().fit(train_encoded, y.values.ravel())
+        input_dict = dict()
+        input_dict['col'] = 'col_0'
+        input_dict['mapping'] = pd.Series(data=[10, 20], index=[0, 1])
+        input_dict['data_type'] = 'int64'
+        preprocessing = [enc, input_dict]
+
+        plan = compile_preprocessing(preprocessing)
+        assert [step[0] for step in plan] == ['ct', 'mapping']
+        assert compile_preprocessing(None) is None
+
+        test = pd.DataFrame({'city': ['paris', 'chicago'],
+                             'state': ['US', 'FR'],
+                             'other': [4, 5]})
+        expected = apply_preprocessing(test, clf, preprocessing)
+        result = apply_compiled_preprocessing(test, clf, plan)
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_get_preprocessing_mapping_cache(self):
+        """
+        test the cache of get_preprocessing_mapping and its invalidation
+        """
+        train = pd.DataFrame({'city': ['chicago', 'paris', 'chicago'],
+                              'state': ['US', 'FR', 'FR'],
+                              'other': ['A', 'B', 'B']})
+        enc = ce.OneHotEncoder(cols=['state']).fit(train)
+        train_encoded = enc.transform(train)
+        enc2 = ce.OneHotEncoder(cols=['city']).fit(train)
+        expected_mapping = {'state': ['state_1', 'state_2']}
+
+        clear_preprocessing_mapping_cache()
+        with patch.object(transform, '_compute_preprocessing_mapping',
+                          side_effect=transform._compute_preprocessing_mapping) as compute:
+            mapping = get_preprocessing_mapping(train_encoded, enc)
+            mapping['state'].append('other')
+            self.assertDictEqual(get_preprocessing_mapping(train_encoded, enc), expected_mapping)
+            self.assertDictEqual(get_features_transform_mapping(train, train_encoded, enc),
+                                 {'state': ['state_1', 'state_2'], 'city': ['city'], 'other': ['other']})
+            assert compute.call_count == 1
+
+            # Another preprocessing or other encoded columns
+            get_preprocessing_mapping(train_encoded, enc2)
+            get_preprocessing_mapping(train_encoded[['state_1', 'state_2']], enc)
+            assert compute.call_count == 3
+
+            clear_preprocessing_mapping_cache(enc)
+            get_preprocessing_mapping(train_encoded, enc)
+            get_preprocessing_mapping(train_encoded, enc2)
+            assert compute.call_count == 4
+
+            clear_preprocessing_mapping_cache()
+            get_preprocessing_mapping(train_encoded, enc2)
+            assert compute.call_count == 5
+
+            # Refitted preprocessing
+            enc2.fit(train)
+            get_preprocessing_mapping(train_encoded, enc2)
+            get_preprocessing_mapping(train_encoded, enc2)
+            assert compute.call_count == 6
+
+            # A list of preprocessing is not cached
+            get_preprocessing_mapping(train_encoded, [enc])
+            get_preprocessing_mapping(train_encoded, [enc])
+            assert compute.call_count == 8
+
+        # The mappings are removed with the preprocessing
+        enc3 = ce.OneHotEncoder(cols=['other']).fit(train)
+        get_preprocessing_mapping(train_encoded, enc3)
+        n_cached = len(transform._preprocessing_mapping_cache)
+        assert enc3 in transform._preprocessing_mapping_cache
+        del enc3
+        gc.collect()
+        assert len(transform._preprocessing_mapping_cache) == n_cached - 1
@@ -0,0 +1,214 @@
+import json
+import os
+import tempfile
+import unittest
+from shapash import SmartExplainer
+from shapash.webapp import wsgi
+from sklearn.tree import DecisionTreeClassifier
+import pandas as pd
+import numpy as np
+
+DATATABLE_OUTPUTS = ['data', 'tooltip_data', 'columns', 'active_cell', 'page_current', 'page_count']
+
+
+class TestSmartApp(unittest.TestCase):
+    """
+    Unit tests of the callbacks of the webapp, called through the dash server
+    """
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        x = pd.DataFrame(rng.normal(size=(120, 3)), columns=['a', 'b', 'c'])
+        y = np.digitize(x['a'], [-0.5, 0.5])
+        model = DecisionTreeClassifier(max_depth=3).fit(x, y)
+        self.xpl = SmartExplainer(model=model)
+        self.xpl.compile(x=x, y_pred=pd.DataFrame(model.predict(x), columns=['pred'], index=x.index))
+        self.xpl.init_app({'rows': 120})
+        self.smartapp = self.xpl.smartapp
+        self.client = self.smartapp.server.test_client()
+        self.session_id = self.smartapp.serve_layout().children[0].data
+
+    def call_callback(self, outputs, inputs, state, changed):
+        """
+        Call a callback of the webapp
+
+        Parameters
+        ----------
+        outputs : list
+            (id, property) of the outputs of the callback
+        inputs : list
+            (id, property, value) of the inputs of the callback
+        state : list
+            (id, property, value) of the states of the callback
+        changed : str
+            Input triggering the callback
+
+        Returns
+        -------
+        int
+            Status code of the response (204 if no update)
+        dict
+            Outputs of the callback
+        """
+        output_key = '..' + '...'.join(f'{id}.{prop}' for id, prop in outputs) + '..'
+        body = {
+            'output': output_key,
+            'outputs': [{'id': id, 'property': prop} for id, prop in outputs],
+            'inputs': [{'id': id, 'property': prop, 'value': value} for id, prop, value in inputs],
+            'state': [{'id': id, 'property': prop, 'value': value} for id, prop, value in state],
+            'changedPropIds': [changed]
+        }
+        response = self.client.post('/_dash-update-component', json=body)
+        if response.status_code != 200:
+            return response.status_code, None
+        return response.status_code, json.loads(response.data)['response']
+
+    def update_datatable(self, changed, filter_query='', page_current=0, validation=None, index=None,
+                         session_id=None, rows=120):
+        status, response = self.call_callback(
+            [('dataset', prop) for prop in DATATABLE_OUTPUTS],
+            [('dataset', 'sort_by', [{'column_id': 'a', 'direction': 'asc'}]),
+             ('dataset', 'filter_query', filter_query),
+             ('dataset', 'page_current', page_current),
+             ('modal', 'is_open', False),
+             ('validation', 'n_clicks', validation)],
+            [('rows', 'value', rows),
+             ('name', 'value', []),
+             ('index_id', 'value', index),
+             ('session_id', 'data', session_id or self.session_id)],
+            changed
+        )
+        return status, response['dataset'] if response is not None else None
+
+    def update_feature_importance(self, changed, session_id, label=None, data=None, filter_query=''):
+        status, response = self.call_callback(
+            [('global_feature_importance', 'figure'), ('global_feature_importance', 'clickData')],
+            [('select_label', 'value', label),
+             ('dataset', 'data', data),
+             ('modal', 'is_open', False),
+             ('card_global_feature_importance', 'n_clicks', None),
+             ('bool_groups', 'on', False)],
+            [('global_feature_importance', 'clickData', None),
+             ('dataset', 'filter_query', filter_query),
+             ('dataset', 'sort_by', []),
+             ('features', 'value', 20),
+             ('session_id', 'data', session_id)],
+            changed
+        )
+        return status, response
+
+    def test_datatable_paging_filtering(self):
+        """
+        Test the datatable callback : paging, filtering and tooltips of the displayed page only
+        """
+        x = self.xpl.x_init
+        page_size = self.smartapp.page_size
+
+        status, output = self.update_datatable('dataset.sort_by')
+        assert status == 200
+        assert output['page_count'] == -(-120 // page_size)
+        assert len(output['data']) == page_size
+        assert len(output['tooltip_data']) == page_size
+        assert [row['_index_'] for row in output['data']] == x['a'].sort_values().index[:page_size].tolist()
+
+        status, output = self.update_datatable('dataset.page_current', page_current=2)
+        assert output['page_current'] == 2
+        assert len(output['data']) == 120 - 2 * page_size
+        assert len(output['tooltip_data']) == len(output['data'])
+
+        # A new filter goes back to the first page
+        status, output = self.update_datatable('dataset.filter_query', filter_query='{b} gt 0', page_current=2)
+        expected = x[x['b'] > 0]['a'].sort_values().index
+        assert output['page_current'] == 0
+        assert output['page_count'] == -(-len(expected) // page_size)
+        assert [row['_index_'] for row in output['data']] == expected[:page_size].tolist()
+        assert len(output['tooltip_data']) == len(output['data'])
+
+    def test_datatable_selected_index_page(self):
+        """
+        Test the datatable callback : the page containing the selected index is displayed
+        """
+        page_size = self.smartapp.page_size
+        self.update_datatable('dataset.sort_by')
+        order = self.xpl.x_init['a'].sort_values().index
+        index = order[page_size + 3]
+
+        status, output = self.update_datatable('validation.n_clicks', validation=1, index=str(index))
+        assert output['page_current'] == 1
+        assert output['data'][3]['_index_'] == index
+
+        status, output = self.call_callback(
+            [('dataset', 'style_data_conditional'), ('dataset', 'style_filter_conditional'),
+             ('dataset', 'style_header_conditional'), ('dataset', 'style_cell_conditional')],
+            [('validation', 'n_clicks', 1), ('dataset', 'data', output['data'])],
+            [('index_id', 'value', str(index))],
+            'dataset.data'
+        )
+        assert {'if': {'row_index': 3}, 'backgroundColor': self.smartapp.color[0]} \
+            in output['dataset']['style_data_conditional']
+
+        # Index already displayed or not in the filtered dataset
+        status, output = self.update_datatable('validation.n_clicks', validation=1, index=str(index), page_current=1)
+        assert status == 204
+        status, output = self.update_datatable('validation.n_clicks', validation=1, index='unknown')
+        assert status == 204
+
+    def test_sessions(self):
+        """
+        Test the state of two browser sessions, modified through the callbacks
+        """
+        session_1 = self.session_id
+        session_2 = self.smartapp.serve_layout().children[0].data
+        assert session_1 != session_2
+
+        # rows
+        self.update_datatable('modal.is_open', session_id=session_1, rows=60)
+        self.update_datatable('modal.is_open', session_id=session_2, rows=120)
+        status, output_1 = self.update_datatable('dataset.sort_by', session_id=session_1, rows=None)
+        status, output_2 = self.update_datatable('dataset.sort_by', session_id=session_2, rows=None)
+        assert output_1['page_count'] == -(-60 // self.smartapp.page_size)
+        assert output_2['page_count'] == -(-120 // self.smartapp.page_size)
+
+        # label
+        status, _ = self.update_feature_importance('select_label.value', session_1, label=0)
+        assert status == 200
+        status, _ = self.update_feature_importance('select_label.value', session_2, label=2)
+        assert status == 200
+        assert self.smartapp.get_state(session_1, 'label') == 0
+        assert self.smartapp.get_state(session_2, 'label') == 2
+
+        # selection of the datatable
+        status, _ = self.update_feature_importance(
+            'dataset.data', session_1, label=0, data=output_1['data'], filter_query='{a} gt 0'
+        )
+        assert status == 200
+        status, _ = self.update_feature_importance(
+            'dataset.data', session_2, label=2, data=output_2['data'], filter_query='{a} lt 0'
+        )
+        assert status == 200
+        selection_query_1 = self.smartapp.get_state(session_1, 'selection_query')
+        assert selection_query_1 == {'rows': 60, 'filter_query': '{a} gt 0', 'sort_by': []}
+        list_index_1 = self.smartapp.get_selection(selection_query_1)
+        list_index_2 = self.smartapp.get_selection(self.smartapp.get_state(session_2, 'selection_query'))
+        dataset_1 = self.smartapp.get_dataset(60)['dataframe']
+        assert sorted(list_index_1) == sorted(dataset_1[dataset_1['a'] > 0]['_index_'].tolist())
+        assert sorted(list_index_2) == sorted(self.xpl.x_init.index[self.xpl.x_init['a'] < 0].tolist())
+
+        # The same selection does not update the figure
+        status, _ = self.update_feature_importance(
+            'dataset.data', session_1, label=0, data=output_1['data'], filter_query='{a} gt 0'
+        )
+        assert status == 204
+
+    def test_wsgi_create_app(self):
+        """
+        Test the WSGI factory of the webapp
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'xpl.pkl')
+            self.xpl.save(path)
+            server = wsgi.create_app(path, settings={'rows': 50},
+                                     session_store=os.path.join(tmp_dir, 'sessions.sqlite'))
+            client = server.test_client()
+            response = client.get('/_dash-layout')
+            assert response.status_code == 200
+            assert 'session_id' in response.get_data(as_text=True)
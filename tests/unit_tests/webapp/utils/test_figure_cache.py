@@ -0,0 +1,40 @@
+import unittest
+import plotly.graph_objs as go
+from shapash.webapp.utils.figure_cache import FigureCache, hash_selection
+
+
+class TestFigureCache(unittest.TestCase):
+
+    def test_get_set(self):
+        cache = FigureCache()
+        figure = go.Figure(go.Bar(x=[1, 2], y=['a', 'b']))
+        assert cache.get(('key', 1)) is None
+        cache.set(('key', 1), figure)
+        output = cache.get(('key', 1))
+        assert output.to_dict() == figure.to_dict()
+        output.update_layout(title='modified')
+        assert cache.get(('key', 1)).layout.title.text is None
+
+    def test_max_bytes(self):
+        figures = [go.Figure(go.Bar(x=[i, 2], y=['a', 'b'])) for i in range(3)]
+        cache = FigureCache(max_bytes=2 * len(figures[0].to_json()) + 10)
+        cache.set(0, figures[0])
+        cache.set(1, figures[1])
+        cache.get(0)
+        cache.set(2, figures[2])
+        assert len(cache) == 2
+        assert cache.get(1) is None
+        assert cache.get(0) is not None and cache.get(2) is not None
+        assert cache.n_bytes <= cache.max_bytes
+        cache.clear()
+        assert len(cache) == 0 and cache.n_bytes == 0
+
+        small_cache = FigureCache(max_bytes=10)
+        small_cache.set(0, figures[0])
+        assert len(small_cache) == 0
+
+    def test_hash_selection(self):
+        assert hash_selection(None) is None
+        assert hash_selection([1, 2, 3]) == hash_selection([1, 2, 3])
+        assert hash_selection([1, 2, 3]) != hash_selection([1, 2])
+        assert hash_selection(['a', 'b']) != hash_selection(['b', 'a'])
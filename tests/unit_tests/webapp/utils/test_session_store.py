@@ -0,0 +1,86 @@
+import os
+import pickle
+import tempfile
+import unittest
+from unittest.mock import patch
+from shapash.webapp.utils.session_store import BaseSessionStore, MemorySessionStore, SQLiteSessionStore
+
+
+class TestSessionStore(unittest.TestCase):
+
+    def check_store(self, store):
+        assert store.get('session_1', 'label') is None
+        assert store.get('session_1', 'label', 1) == 1
+        store.set('session_1', 'label', 'class_0')
+        store.set('session_1', 'list_index', [1, 'a', 2.5])
+        store.set('session_2', 'label', 'class_1')
+        assert store.get('session_1', 'label') == 'class_0'
+        assert store.get('session_1', 'list_index') == [1, 'a', 2.5]
+        assert store.get('session_2', 'label') == 'class_1'
+        store.clear('session_1')
+        assert store.get('session_1', 'label') is None
+        assert store.get('session_2', 'label') == 'class_1'
+        store.clear()
+        assert store.get('session_2', 'label') is None
+
+    def test_base_session_store(self):
+        with self.assertRaises(TypeError):
+            BaseSessionStore()
+
+    def test_memory_session_store(self):
+        self.check_store(MemorySessionStore())
+        store = MemorySessionStore(max_sessions=2)
+        for i in range(3):
+            store.set(f'session_{i}', 'rows', i)
+        assert store.get('session_0', 'rows') is None
+        assert store.get('session_2', 'rows') == 2
+
+    def test_sqlite_session_store(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'sessions.sqlite')
+            self.check_store(SQLiteSessionStore(path))
+
+            store = SQLiteSessionStore(path)
+            store.set('session_1', 'rows', 10)
+            other_store = pickle.loads(pickle.dumps(store))
+            assert other_store.get('session_1', 'rows') == 10
+
+            expired_store = SQLiteSessionStore(path, max_age=0)
+            expired_store.set('session_2', 'rows', 5)
+            assert expired_store.get('session_1', 'rows') is None
+
+    def check_store_json(self, store):
+        click_data = {'points': [{'label': 'a', 'pointIndex': 1}]}
+        store.set('session_1', 'last_click_data', click_data)
+        store.set('session_1', 'subset', (1, 2))
+        store.set('session_1', 'label', None)
+        click_data['points'].append({'label': 'b'})
+        assert store.get('session_1', 'last_click_data') == {'points': [{'label': 'a', 'pointIndex': 1}]}
+        assert store.get('session_1', 'subset') == [1, 2]
+        assert store.get('session_1', 'label', 0) is None
+        with self.assertRaises(TypeError):
+            store.set('session_1', 'subset', {1, 2})
+
+    def test_memory_session_store_json(self):
+        self.check_store_json(MemorySessionStore())
+
+    def test_sqlite_session_store_json(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = SQLiteSessionStore(os.path.join(tmp_dir, 'sessions.sqlite'))
+            self.check_store_json(store)
+            value = store._connection().execute("SELECT value FROM session_state WHERE key = 'subset'").fetchone()[0]
+            assert value == '[1, 2]'
+
+    def test_sqlite_session_store_get_keeps_session(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with patch('shapash.webapp.utils.session_store.time.time') as mock_time:
+                mock_time.return_value = 1000
+                store = SQLiteSessionStore(os.path.join(tmp_dir, 'sessions.sqlite'), max_age=100)
+                store.set('session_1', 'rows', 10)
+                store.set('session_2', 'rows', 20)
+                mock_time.return_value = 1080
+                assert store.get('session_1', 'rows') == 10
+                mock_time.return_value = 1150
+                store.set('session_3', 'rows', 30)
+                assert store.get('session_1', 'rows') == 10
+                assert store.get('session_2', 'rows') is None
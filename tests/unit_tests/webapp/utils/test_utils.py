@@ -1,5 +1,8 @@
 import unittest
-from shapash.webapp.utils.utils import round_to_k
+import numpy as np
+import pandas as pd
+from shapash.webapp.utils.utils import apply_filter, apply_sort, compile_filter_query, get_index_page, get_page, \
+    round_to_k
 
 
 class TestUtils(unittest.TestCase):
@@ -33,3 +36,57 @@ class TestUtils(unittest.TestCase):
         x = 0.0000123456789
         expected_r_x = 0.0000123
         assert round_to_k(x, 3) == expected_r_x
+
+    def test_apply_sort(self):
+        df = pd.DataFrame({'a': [1, 2, 1], 'b': [3, 1, 2]})
+        assert apply_sort(df, []) is df
+        sort_by = [{'column_id': 'a', 'direction': 'asc'}, {'column_id': 'b', 'direction': 'desc'}]
+        assert apply_sort(df, sort_by).index.tolist() == [0, 2, 1]
+
+    def test_get_page(self):
+        df = pd.DataFrame({'a': range(7)})
+        page, page_current, page_count = get_page(df, 1, 3)
+        assert page['a'].tolist() == [3, 4, 5]
+        assert (page_current, page_count) == (1, 3)
+        page, page_current, page_count = get_page(df, 5, 3)
+        assert page['a'].tolist() == [6]
+        assert (page_current, page_count) == (2, 3)
+        page, page_current, page_count = get_page(df.iloc[:0], 0, 3)
+        assert page.shape[0] == 0
+        assert (page_current, page_count) == (0, 1)
+
+    def test_get_index_page(self):
+        df = pd.DataFrame({'_index_': [5, 3, 8, 1, 0, 7, 2]})
+        assert get_index_page(df, 5, 3) == 0
+        assert get_index_page(df, '7', 3) == 1
+        assert get_index_page(df, 2, 3) == 2
+        assert get_index_page(df, 4, 3) is None
+        assert get_index_page(df, 'a', 3) is None
+        assert get_index_page(df, None, 3) is None
+        assert get_index_page(pd.DataFrame({'_index_': ['x', 'y']}), 'y', 1) == 1
+
+    def test_compile_filter_query(self):
+        output = compile_filter_query('{a} ge 2 && {b} contains "x y" && {c} unknown 3')
+        assert output == (('a', 'ge', 2.0), ('b', 'contains', 'x y'))
+        assert compile_filter_query('{a} ge 2 && {b} contains "x y" && {c} unknown 3') is output
+
+    def test_apply_filter(self):
+        df = pd.DataFrame({
+            'a': [0.5, np.nan, 2.5, 1.5, 3.0, -1.0],
+            'b': [1, 5, 3, 4, 2, 6],
+            'c': ['foo', 'bar', 'baz', 'foo', 'bar', 'qux']
+        })
+        sorted_index = dict()
+        queries = {
+            '{a} gt 1': [2, 3, 4],
+            '{a} le 1.5 && {b} lt 5': [0, 3],
+            '{b} ge 2 && {b} le 4 && {c} contains ba': [2, 4],
+            '{c} eq foo && {a} lt 1': [0],
+            '{c} datestartswith q': [5],
+            '{b} ne 1 && {a} gt 10': [],
+        }
+        for query, expected in queries.items():
+            pd.testing.assert_frame_equal(apply_filter(df, query), df.iloc[expected])
+            pd.testing.assert_frame_equal(apply_filter(df, query, sorted_index), df.iloc[expected])
+        assert set(sorted_index.keys()) == {'a', 'b'}
+        assert apply_filter(df, '') is df